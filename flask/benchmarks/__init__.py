@@ -0,0 +1 @@
+"""Micro-benchmarks, run e.g. as `python -m benchmarks.row_mode` from this directory"""
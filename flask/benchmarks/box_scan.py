@@ -0,0 +1,135 @@
+"""Compares the latency of a box scan via GraphQL and via the REST fast path
+
+Both requests are served by the Flask test client from a temporary SQLite database
+holding one box. Token verification is skipped for both paths: the requests are
+authenticated with a fixed identity, as if the token were in the verified token
+cache. Reports the median latency of REQUEST_COUNT requests, the average number of
+SQL statements per request, and the response size.
+
+    python -m benchmarks.box_scan [REQUEST_COUNT]
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+from unittest.mock import patch
+
+from boxwise_flask import auth_helper
+from boxwise_flask.app import create_app
+from boxwise_flask.db import db
+from boxwise_flask.models.base import Base
+from boxwise_flask.models.box import Box
+from boxwise_flask.models.box_state import BoxState
+from boxwise_flask.models.location import Location
+from boxwise_flask.models.organisation import Organisation
+from boxwise_flask.models.product import Product
+from boxwise_flask.models.qr_code import QRCode
+from boxwise_flask.models.size import Size
+from boxwise_flask.models.size_range import SizeRange
+from boxwise_flask.models.user import User
+from peewee import SqliteDatabase
+
+MODELS = (
+    Base,
+    Box,
+    BoxState,
+    Location,
+    Organisation,
+    Product,
+    QRCode,
+    Size,
+    SizeRange,
+    User,
+)
+CODE = "e1fdfdd942db0e764c9bea06c03ba2b"
+GRAPHQL_QUERY = """query Box($code: String) {
+    box(qr_code: $code) {
+        id box_id product_id size_id items location_id comments qr_id created
+        box_state_id
+    }
+}"""
+
+
+class CountingSqliteDatabase(SqliteDatabase):
+    statement_count = 0
+
+    def execute_sql(self, *args, **kwargs):
+        self.statement_count += 1
+        return super().execute_sql(*args, **kwargs)
+
+
+class Identity:
+    payload = {}
+    email = "benchmark@example.org"
+    user_id = 1
+    base_ids = frozenset([1])
+
+
+def create_rows():
+    Organisation.create(id=1, label="organisation")
+    Base.create(id=1, name="base", organisation=1, seq=1)
+    BoxState.create(id=1, label="InStock")
+    Product.create(id=1, name="product", category=None, base=1)
+    Location.create(id=1, label="location", base=1)
+    QRCode.create(id=1, code=CODE)
+    Box.create(
+        box_id="X0000001Y", product=1, items=10, location=1, comments="", qr_code=1
+    )
+
+
+def measure(name, client, database, request_count, send):
+    latencies = []
+    database.statement_count = 0
+    for _ in range(request_count):
+        start = time.perf_counter()
+        response = send(client)
+        latencies.append(time.perf_counter() - start)
+        assert response.status_code == 200, response.get_data()
+    print(
+        "{:<16} {:>8.3f} ms {:>6.1f} statements {:>6d} bytes".format(
+            name,
+            statistics.median(latencies) * 1000,
+            database.statement_count / request_count,
+            len(response.get_data()),
+        )
+    )
+
+
+def main(request_count):
+    db_fd, db_filepath = tempfile.mkstemp(suffix=".sqlite3")
+    app = create_app()
+    database = CountingSqliteDatabase(db_filepath)
+    app.config["DATABASE"] = database
+    db.init_app(app)
+    with db.database.bind_ctx(MODELS):
+        db.database.create_tables(MODELS)
+        create_rows()
+    db.close_db(None)
+
+    with patch.object(auth_helper, "authenticate", Identity):
+        client = app.test_client()
+        print("{} requests each".format(request_count))
+        measure(
+            "GraphQL",
+            client,
+            database,
+            request_count,
+            lambda client: client.post(
+                "/graphql", json={"query": GRAPHQL_QUERY, "variables": {"code": CODE}},
+            ),
+        )
+        measure(
+            "REST",
+            client,
+            database,
+            request_count,
+            lambda client: client.get("/api/boxes/by-qr/{}".format(CODE)),
+        )
+
+    os.close(db_fd)
+    os.remove(db_filepath)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
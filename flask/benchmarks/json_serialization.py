@@ -0,0 +1,81 @@
+"""Compares the serialization of a large allUsers response
+
+The baseline mimics the former response path: the Datetime and Date scalars format
+each value with `isoformat()`, and `flask.jsonify` encodes the result. It is compared
+with the serializers of boxwise_flask/json_serializer.py, which format dates while
+encoding.
+
+    python -m benchmarks.json_serialization [USER_COUNT]
+"""
+import datetime
+import json
+import sys
+import timeit
+
+from boxwise_flask.json_serializer import SERIALIZERS
+
+REPEAT = 5
+
+
+def create_result(user_count):
+    last_login = datetime.datetime(2020, 11, 3, 14, 20, 31)
+    first_day = datetime.date(2020, 1, 1)
+    return {
+        "data": {
+            "allUsers": [
+                {
+                    "id": i,
+                    "organisation_id": 1,
+                    "name": "user {}".format(i),
+                    "email": "user{}@example.org".format(i),
+                    "usergroup_id": 2,
+                    "valid_firstday": first_day,
+                    "valid_lastday": first_day,
+                    "base_id": [1, 2, 3],
+                    "lastlogin": last_login,
+                    "lastaction": last_login,
+                }
+                for i in range(user_count)
+            ]
+        }
+    }
+
+
+def format_dates(result):
+    for user in result["data"]["allUsers"]:
+        for name in ["valid_firstday", "valid_lastday", "lastlogin", "lastaction"]:
+            user[name] = user[name].isoformat()
+    return result
+
+
+def dumps_baseline(result):
+    # Like flask.jsonify outside of debug mode
+    return json.dumps(
+        format_dates(result), separators=(",", ":"), sort_keys=True
+    ).encode("utf-8")
+
+
+def measure(name, dumps, user_count):
+    # Each run works on a fresh result since the baseline modifies it
+    seconds = min(
+        timeit.repeat(
+            "dumps(result)",
+            setup="result = create_result({})".format(user_count),
+            number=1,
+            repeat=REPEAT,
+            globals={"dumps": dumps, "create_result": create_result},
+        )
+    )
+    size = len(dumps(create_result(user_count)))
+    print("{:<32} {:>10.2f} ms {:>12d} bytes".format(name, seconds * 1000, size))
+
+
+def main(user_count):
+    print("{} users".format(user_count))
+    measure("isoformat in scalars + jsonify", dumps_baseline, user_count)
+    for name, dumps in SERIALIZERS.items():
+        measure(name, dumps, user_count)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
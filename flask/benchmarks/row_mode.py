@@ -0,0 +1,90 @@
+"""Compares fetching bases and users as model instances and as named tuples
+
+Reports latency and the number of memory blocks allocated for the result, for an
+in-memory SQLite database holding ROW_COUNT rows per table.
+
+    python -m benchmarks.row_mode [ROW_COUNT]
+"""
+import sys
+import timeit
+import tracemalloc
+
+from boxwise_flask.models.base import Base
+from boxwise_flask.models.organisation import Organisation
+from boxwise_flask.models.user import User
+from peewee import SqliteDatabase
+
+MODELS = (Base, Organisation, User)
+REPEAT = 5
+
+
+def create_rows(row_count):
+    Organisation.create(id=1, label="organisation")
+    Base.insert_many(
+        [
+            {"name": "base {}".format(i), "organisation": 1, "seq": i}
+            for i in range(row_count)
+        ]
+    ).execute()
+    User.insert_many(
+        [
+            {
+                "name": "user {}".format(i),
+                "email": "user{}@example.org".format(i),
+                "last_action": "2020-01-01 00:00:00",
+                "last_login": "2020-01-01 00:00:00",
+            }
+            for i in range(row_count)
+        ]
+    ).execute()
+
+
+def count_allocations(fetch):
+    tracemalloc.start()
+    result = fetch()
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    del result
+    return sum(stat.count for stat in snapshot.statistics("filename"))
+
+
+def measure(name, fetch):
+    seconds = min(timeit.repeat(fetch, number=1, repeat=REPEAT))
+    print(
+        "{:<32} {:>10.2f} ms {:>10d} blocks".format(
+            name, seconds * 1000, count_allocations(fetch)
+        )
+    )
+
+
+def main(row_count):
+    database = SqliteDatabase(":memory:")
+    with database.bind_ctx(MODELS):
+        database.create_tables(MODELS)
+        create_rows(row_count)
+
+        base_columns = (Base.id, Base.name, Base.currency_name)
+        user_columns = (User.id, User.name, User.email)
+        print("{} rows per table".format(row_count))
+        measure("bases: models, all columns", lambda: Base.get_all_bases())
+        measure(
+            "bases: models, 3 columns",
+            lambda: Base.get_all_bases(Base.select(*base_columns)),
+        )
+        measure(
+            "bases: rows, 3 columns",
+            lambda: Base.get_all_bases(Base.select(*base_columns).namedtuples()),
+        )
+        measure("users: models, all columns", lambda: User.get_all_users())
+        measure(
+            "users: models, 3 columns",
+            lambda: User.get_all_users(User.select(*user_columns)),
+        )
+        measure(
+            "users: rows, 3 columns",
+            lambda: User.get_all_users(User.select(*user_columns).namedtuples()),
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,85 @@
+"""Process-wide cache of the data needed for authorization checks"""
+import os
+import threading
+
+from boxwise_flask.cache import InvalidatesOnWrite, LRUCache
+from boxwise_flask.db_routing import db_router
+
+
+class AccessCache:
+    """Caches the mappings
+    - user email -> (user ID, usergroup ID)
+    - usergroup ID -> frozenset of IDs of the bases the usergroup may access
+
+    Entries expire after `ttl` seconds, which bounds how long changes written by
+    other processes stay invisible. Within this process, every write to the
+    underlying tables calls `invalidate()`, which bumps a version number and thereby
+    turns all existing entries into misses. Writes within a transaction invalidate
+    again once it has ended, see `CacheInvalidationMixin`.
+    """
+
+    def __init__(self, maxsize=1024, ttl=300):
+        self.users = LRUCache(maxsize=maxsize, ttl=ttl)
+        self.base_ids = LRUCache(maxsize=maxsize, ttl=ttl)
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        with self._lock:
+            self.version += 1
+
+    def get_user(self, email, loader):
+        return self._get(self.users, email, loader)
+
+    def get_base_ids(self, usergroup_id, loader):
+        return self._get(self.base_ids, usergroup_id, loader)
+
+    def clear(self):
+        self.users.clear()
+        self.base_ids.clear()
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        return {
+            "version": self.version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "users": self.users.stats(),
+            "base_ids": self.base_ids.stats(),
+        }
+
+    def _get(self, cache, key, loader):
+        # Capture the version before loading so that an invalidation happening
+        # meanwhile marks the loaded value as outdated
+        version = self.version
+        entry = cache.get(key)
+        if entry is not None and entry[0] == version:
+            with self._lock:
+                self.hits += 1
+            return entry[1]
+
+        with self._lock:
+            self.misses += 1
+        with db_router.use_primary():
+            value = loader(key)
+        cache.set(key, (version, value))
+        return value
+
+
+access_cache = AccessCache(
+    maxsize=int(os.getenv("ACCESS_CACHE_SIZE", 1024)),
+    ttl=int(os.getenv("ACCESS_CACHE_TTL", 300)),
+)
+
+
+class InvalidatesAccessCache(InvalidatesOnWrite):
+    """Mixin for models whose tables feed the access cache. Any write through the
+    model invalidates the cache."""
+
+    @classmethod
+    def invalidate_caches(cls):
+        access_cache.invalidate()
@@ -1,11 +1,17 @@
 """Utilities for handling authentication"""
-import json
+import hashlib
 import os
+import time
 from functools import wraps
 
-from boxwise_flask.models.user import get_user_from_email_with_base_ids
+from boxwise_flask.cache import LRUCache
+from boxwise_flask.jwks_store import jwks_store
+from boxwise_flask.models.user import (
+    get_base_ids_for_usergroup,
+    get_user_access,
+    get_user_from_email_with_base_ids,
+)
 from jose import jwt
-from six.moves.urllib.request import urlopen
 
 from flask import _request_ctx_stack, request
 
@@ -15,6 +21,12 @@ ALGORITHMS = ["RS256"]
 SUCCESS = True
 FAILURE = False
 
+# Payloads of successfully verified tokens, keyed by token digest. Each entry expires
+# with the token's `exp` claim
+verified_token_cache = LRUCache(
+    maxsize=int(os.getenv("AUTH0_TOKEN_CACHE_SIZE", 1024)), timer=time.time
+)
+
 
 # Error handler
 class AuthError(Exception):
@@ -67,23 +79,39 @@ def get_token_from_auth_header(header_string):
 
 
 def get_rsa_key(token):
-    jsonurl = urlopen("https://" + AUTH0_DOMAIN + "/.well-known/jwks.json")
-    jwks = json.loads(jsonurl.read())
     unverified_header = jwt.get_unverified_header(token)
-    rsa_key = {}
-    for key in jwks["keys"]:
-        if key["kid"] == unverified_header["kid"]:
-            rsa_key = {
-                "kty": key["kty"],
-                "kid": key["kid"],
-                "use": key["use"],
-                "n": key["n"],
-                "e": key["e"],
-            }
-            return rsa_key
+    key = jwks_store.get_key(unverified_header.get("kid"))
+    if key:
+        rsa_key = {
+            "kty": key["kty"],
+            "kid": key["kid"],
+            "use": key["use"],
+            "n": key["n"],
+            "e": key["e"],
+        }
+        return rsa_key
+
+
+def get_token_digest(token):
+    return hashlib.sha256(token.encode()).hexdigest()
 
 
 def decode_jwt(token, rsa_key):
+    """Verifies the token and returns its payload. Tokens that have been verified
+    before are served from the cache until they expire.
+    """
+    digest = get_token_digest(token)
+    payload = verified_token_cache.get(digest)
+    if payload is not None:
+        return payload
+
+    payload = verify_jwt(token, rsa_key)
+    if "exp" in payload:
+        verified_token_cache.set(digest, payload, expires_at=payload["exp"])
+    return payload
+
+
+def verify_jwt(token, rsa_key):
     try:
         payload = jwt.decode(
             token,
@@ -116,8 +144,75 @@ def decode_jwt(token, rsa_key):
     return payload
 
 
-def add_user_to_request_context(payload):
-    _request_ctx_stack.top.current_user = payload
+class Identity:
+    """Identity of the user sending the current request. It is built once per request
+    from the verified token payload. The IDs of the user and of the bases the user may
+    access are read from the access cache; the full user row is loaded on first use
+    and then kept.
+    """
+
+    def __init__(self, payload):
+        self.payload = payload
+        self._user = None
+        self._access = None
+
+    @property
+    def email(self):
+        # the user's email is in the auth token under the custom claim:
+        # 'https://www.boxtribute.com/email'
+        # note: this isn't a real website, and doesn't have to be,
+        # but it DOES have to be in this form to work with the Auth0 rule providing
+        # it. this part of the jwt is added by a rule in auth0
+        return self.payload["https://www.boxtribute.com/email"]
+
+    @property
+    def user(self):
+        if self._user is None:
+            self._user = get_user_from_email_with_base_ids(self.email)
+        return self._user
+
+    @property
+    def user_id(self):
+        return self._get_access()[0]
+
+    @property
+    def base_ids(self):
+        return get_base_ids_for_usergroup(self._get_access()[1])
+
+    def _get_access(self):
+        if self._access is None:
+            self._access = get_user_access(self.email)
+        return self._access
+
+
+def add_user_to_request_context(identity):
+    _request_ctx_stack.top.current_user = identity.payload
+    _request_ctx_stack.top.identity = identity
+
+
+def get_identity_from_request_context():
+    return getattr(_request_ctx_stack.top, "identity", None)
+
+
+def authenticate():
+    """Verifies the Access Token of the request and returns the Identity of the
+    requesting user
+    """
+    token = get_token_from_auth_header(get_auth_string_from_header())
+    rsa_key = get_rsa_key(token)
+    if rsa_key:
+        return Identity(decode_jwt(token, rsa_key))
+    raise AuthError(
+        {"code": "invalid_header", "description": "Unable to find appropriate key"},
+        401,
+    )
+
+
+def get_current_identity():
+    """Returns the Identity stored on the request context by `requires_auth`. Outside
+    of such a request, the Access Token is verified anew.
+    """
+    return get_identity_from_request_context() or authenticate()
 
 
 def requires_auth(f):
@@ -126,16 +221,8 @@ def requires_auth(f):
 
     @wraps(f)
     def decorated(*args, **kwargs):
-        token = get_token_from_auth_header(get_auth_string_from_header())
-        rsa_key = get_rsa_key(token)
-        if rsa_key:
-            payload = decode_jwt(token, rsa_key)
-            add_user_to_request_context(payload)
-            return f(*args, **kwargs)
-        raise AuthError(
-            {"code": "invalid_header", "description": "Unable to find appropriate key"},
-            401,
-        )
+        add_user_to_request_context(authenticate())
+        return f(*args, **kwargs)
 
     return decorated
 
@@ -146,40 +233,28 @@ def authorization_test(test_for, **kwargs):
     # and dict of the necessary params to check
     # ex) authorization_test("bases", {"base_id":123})
 
-    token = get_token_from_auth_header(get_auth_string_from_header())
-    rsa_key = get_rsa_key(token)
-    if rsa_key:
-        # the user's email is in the auth token under the custom claim:
-        # 'https://www.boxtribute.com/email'
-        # note: this isn't a real website, and doesn't have to be,
-        # but it DOES have to be in this form to work with the Auth0 rule providing it.
-        # this part of the jwt is added by a rule in auth0
-        payload = decode_jwt(token, rsa_key)
-        email = payload["https://www.boxtribute.com/email"]
-        requesting_user = get_user_from_email_with_base_ids(email)
-
-        if test_for == "bases":
-            allowed_access = user_can_access_base(requesting_user, kwargs["base_id"])
-        # add more test cases here
-        else:
-            raise AuthError(
-                {
-                    "code": "unknown resource",
-                    "description": "This resource is not known",
-                },
-                401,
-            )
-
-        if allowed_access:
-            return allowed_access
-        else:
-            raise AuthError(
-                {
-                    "code": "unauthorized_user",
-                    "description": "Your user does not have access to this resource",
-                },
-                401,
-            )
+    identity = get_current_identity()
+    requesting_user = {"id": identity.user_id, "base_ids": identity.base_ids}
+
+    if test_for == "bases":
+        allowed_access = user_can_access_base(requesting_user, kwargs["base_id"])
+    # add more test cases here
+    else:
+        raise AuthError(
+            {"code": "unknown resource", "description": "This resource is not known"},
+            401,
+        )
+
+    if allowed_access:
+        return allowed_access
+    else:
+        raise AuthError(
+            {
+                "code": "unauthorized_user",
+                "description": "Your user does not have access to this resource",
+            },
+            401,
+        )
 
 
 def user_can_access_base(requesting_user, base_id):
@@ -0,0 +1,123 @@
+"""Allocation of short, unique box IDs
+
+Box IDs are numbers from a shared sequence, written as "X" followed by seven digits
+in Crockford's base 32 and a Luhn mod 32 check character, e.g. "X0000001Y". The
+check character detects mistyped or swapped characters when a box ID is entered
+by hand. The prefix keeps the IDs apart from the numeric and hexadecimal IDs
+generated previously.
+
+Each process reserves blocks of BOX_ID_BLOCK_SIZE numbers with one UPDATE of the
+`box_id_sequence` table and hands them out from memory, hence IDs are unique across
+processes and threads without a database check per box. Numbers of a block that
+are not used before the process exits are skipped.
+"""
+import os
+import threading
+
+from boxwise_flask.models.box_id_sequence import BoxIdSequence
+from peewee import IntegrityError
+
+BOX_ID_PREFIX = "X"
+BOX_ID_DIGITS = 7
+ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+BASE = len(ALPHABET)
+MAX_NUMBER = BASE ** BOX_ID_DIGITS - 1
+
+
+def get_check_character(digits):
+    """Returns the Luhn mod 32 check character of the base-32 digits"""
+    total = 0
+    factor = 2
+    for character in reversed(digits):
+        addend = factor * ALPHABET.index(character)
+        total += addend // BASE + addend % BASE
+        factor = 1 if factor == 2 else 2
+    return ALPHABET[-total % BASE]
+
+
+def encode_box_id(number):
+    if not 0 <= number <= MAX_NUMBER:
+        raise ValueError("Box ID number {} out of range".format(number))
+    digits = ""
+    for _ in range(BOX_ID_DIGITS):
+        number, remainder = divmod(number, BASE)
+        digits = ALPHABET[remainder] + digits
+    return BOX_ID_PREFIX + digits + get_check_character(digits)
+
+
+def is_valid_box_id(box_id):
+    """Indicates whether the box ID has the format of allocated IDs and a matching
+    check character."""
+    prefix_length = len(BOX_ID_PREFIX)
+    digits = box_id[prefix_length:-1]
+    return (
+        len(box_id) == prefix_length + BOX_ID_DIGITS + 1
+        and box_id.startswith(BOX_ID_PREFIX)
+        and all(character in ALPHABET for character in digits)
+        and box_id[-1] == get_check_character(digits)
+    )
+
+
+def reserve_block(size):
+    """Reserves `size` numbers of the sequence and returns the first one. The UPDATE
+    locks the counter row until the transaction ends, hence concurrent reservations
+    never overlap."""
+    database = BoxIdSequence._meta.database
+    while True:
+        with database.atomic():
+            updated = (
+                BoxIdSequence.update(next_value=BoxIdSequence.next_value + size)
+                .where(BoxIdSequence.id == 1)
+                .execute()
+            )
+            if updated:
+                return BoxIdSequence.get_by_id(1).next_value - size
+        try:
+            with database.atomic():
+                # First reservation ever; number 0 is not used
+                BoxIdSequence.insert(id=1, next_value=size + 1).execute()
+            return 1
+        except IntegrityError:
+            # Another process created the row meanwhile
+            continue
+
+
+class BoxIdAllocator:
+    def __init__(self, block_size=100, reserve=reserve_block, getpid=os.getpid):
+        self.block_size = block_size
+        self._reserve = reserve
+        self._getpid = getpid
+        self._lock = threading.Lock()
+        self._next = 0
+        self._end = 0
+        self._pid = None
+
+    def clear(self):
+        """Discards the remaining numbers of the current block"""
+        with self._lock:
+            self._next = self._end = 0
+
+    def allocate(self):
+        return self.allocate_many(1)[0]
+
+    def allocate_many(self, count):
+        """Returns a list of `count` unique box IDs"""
+        numbers = []
+        with self._lock:
+            if self._pid != self._getpid():
+                # A block reserved before forking must not be shared with the child
+                # processes
+                self._next = self._end = 0
+                self._pid = self._getpid()
+            while len(numbers) < count:
+                if self._next == self._end:
+                    size = max(self.block_size, count - len(numbers))
+                    self._next = self._reserve(size)
+                    self._end = self._next + size
+                take = min(count - len(numbers), self._end - self._next)
+                numbers.extend(range(self._next, self._next + take))
+                self._next += take
+        return [encode_box_id(number) for number in numbers]
+
+
+box_id_allocator = BoxIdAllocator(block_size=int(os.getenv("BOX_ID_BLOCK_SIZE", 100)))
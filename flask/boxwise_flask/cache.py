@@ -0,0 +1,145 @@
+"""Bounded in-process caches"""
+import threading
+import time
+from collections import OrderedDict
+
+from peewee import ModelDelete, ModelInsert, ModelUpdate
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Thread-safe mapping that holds at most `maxsize` entries and evicts the least
+    recently used one when full.
+
+    Entries may expire: either after the cache-wide `ttl` (in seconds), or at the
+    `expires_at` timestamp passed to `set()`. Timestamps are measured by `timer`.
+    Hits, misses, evictions and expirations are counted and reported by `stats()`.
+    """
+
+    def __init__(self, maxsize=1024, ttl=None, timer=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.timer = timer
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+
+            value, expires_at = entry
+            if expires_at is not None and self.timer() >= expires_at:
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, expires_at=None):
+        if expires_at is None and self.ttl is not None:
+            expires_at = self.timer() + self.ttl
+
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, _MISSING)
+        return default if entry is _MISSING else entry[0]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class CacheInvalidationMixin:
+    """Mixin for peewee databases that calls `invalidate_caches()` of models with
+    `InvalidatesOnWrite` after a write query through the model has been executed, and
+    again once the transaction it is part of has been committed or rolled back.
+    Readers on other connections cannot load the old rows after that. `save()`,
+    `create()` and `delete_instance()` are covered because peewee implements them
+    with write queries; raw SQL is not."""
+
+    def __init__(self, *args, **kwargs):
+        # Per thread, the models written to in the current transaction
+        self._written_models = threading.local()
+        super().__init__(*args, **kwargs)
+
+    def execute(self, query, *args, **kwargs):
+        result = super().execute(query, *args, **kwargs)
+        if isinstance(query, (ModelInsert, ModelUpdate, ModelDelete)) and issubclass(
+            query.model, InvalidatesOnWrite
+        ):
+            # Invalidate right away for reads within the current transaction, and
+            # again at its end: until then, other connections may still load the
+            # old rows and cache them as current
+            query.model.invalidate_caches()
+            if self.in_transaction():
+                self._get_written_models().add(query.model)
+        return result
+
+    def commit(self):
+        try:
+            return super().commit()
+        finally:
+            self._invalidate_written_models()
+
+    def rollback(self):
+        try:
+            return super().rollback()
+        finally:
+            self._invalidate_written_models()
+
+    def _get_written_models(self):
+        models = getattr(self._written_models, "models", None)
+        if models is None:
+            models = self._written_models.models = set()
+        return models
+
+    def _invalidate_written_models(self):
+        models = self._get_written_models()
+        while models:
+            models.pop().invalidate_caches()
+
+
+class InvalidatesOnWrite:
+    """Mixin for peewee models whose writes invalidate in-process caches. The
+    invalidation is triggered by the `CacheInvalidationMixin` of the database."""
+
+    @classmethod
+    def invalidate_caches(cls):
+        """Drops the cached data derived from the table of the model. Subclasses
+        override this; the default does nothing."""
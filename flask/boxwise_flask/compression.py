@@ -0,0 +1,154 @@
+"""Compression of response bodies negotiated via the Accept-Encoding header
+
+Bodies of at least COMPRESSION_MIN_SIZE bytes are compressed with brotli (if the
+brotli package is installed) or gzip, whichever the client prefers. Larger bodies
+are compressed with lower levels to bound the CPU time per response. Streamed
+responses, and bodies that are already compressed or of compressed media types,
+are sent as they are.
+"""
+import gzip
+import os
+import threading
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+
+# Tuples of maximum body size in bytes, gzip level and brotli quality
+COMPRESSION_LEVELS = (
+    (64 * 1024, 6, 5),
+    (1024 * 1024, 5, 4),
+    (None, 3, 2),
+)
+
+# Media types whose content is compressed already
+COMPRESSED_MEDIA_TYPES = {
+    "application/gzip",
+    "application/pdf",
+    "application/zip",
+}
+COMPRESSED_MEDIA_TYPE_PREFIXES = ("audio/", "image/", "video/")
+
+
+def get_compression_levels(size):
+    for max_size, gzip_level, brotli_quality in COMPRESSION_LEVELS:
+        if max_size is None or size <= max_size:
+            return gzip_level, brotli_quality
+
+
+def compress_gzip(data, size):
+    return gzip.compress(data, compresslevel=get_compression_levels(size)[0], mtime=0)
+
+
+def compress_brotli(data, size):
+    return brotli.compress(data, quality=get_compression_levels(size)[1])
+
+
+COMPRESSORS = {"gzip": compress_gzip}
+if brotli is not None:
+    COMPRESSORS["br"] = compress_brotli
+
+
+def choose_encoding(accept_encodings):
+    """Returns the supported encoding with the highest quality in the parsed
+    Accept-Encoding header, preferring brotli on ties, or None."""
+    best_encoding, best_quality = None, 0
+    for encoding in sorted(COMPRESSORS):
+        quality = accept_encodings.quality(encoding)
+        if quality > best_quality:
+            best_encoding, best_quality = encoding, quality
+    return best_encoding
+
+
+def is_compressed_media_type(mimetype):
+    return mimetype in COMPRESSED_MEDIA_TYPES or (
+        mimetype.startswith(COMPRESSED_MEDIA_TYPE_PREFIXES)
+        and mimetype != "image/svg+xml"
+    )
+
+
+class CompressionStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def add(self, encoding, original_size, compressed_size):
+        with self._lock:
+            self.compressed += 1
+            self.original_bytes += original_size
+            self.compressed_bytes += compressed_size
+            self.encodings[encoding] = self.encodings.get(encoding, 0) + 1
+
+    def skip(self):
+        with self._lock:
+            self.skipped += 1
+
+    def clear(self):
+        self.compressed = 0
+        self.skipped = 0
+        self.original_bytes = 0
+        self.compressed_bytes = 0
+        self.encodings = {}
+
+    def stats(self):
+        return {
+            "compressed": self.compressed,
+            "skipped": self.skipped,
+            "encodings": dict(self.encodings),
+            "original_bytes": self.original_bytes,
+            "compressed_bytes": self.compressed_bytes,
+            # Compressed size relative to original size of compressed responses
+            "ratio": (
+                self.compressed_bytes / self.original_bytes
+                if self.original_bytes
+                else None
+            ),
+        }
+
+
+compression_stats = CompressionStats()
+
+
+def compress_response(response):
+    """Compresses the body of the response if the client accepts it, to be
+    registered as `after_request` handler."""
+    response.vary.add("Accept-Encoding")
+    if (
+        response.direct_passthrough
+        or response.is_streamed
+        or response.status_code < 200
+        or response.status_code in (204, 206, 304)
+        or "Content-Encoding" in response.headers
+        or is_compressed_media_type(response.mimetype or "")
+    ):
+        return response
+
+    encoding = choose_encoding(request.accept_encodings)
+    if encoding is None:
+        return response
+
+    data = response.get_data()
+    if len(data) < COMPRESSION_MIN_SIZE:
+        compression_stats.skip()
+        return response
+
+    compressed = COMPRESSORS[encoding](data, len(data))
+    if len(compressed) >= len(data):
+        compression_stats.skip()
+        return response
+
+    response.set_data(compressed)
+    response.headers["Content-Encoding"] = encoding
+    # The ETag identifies the uncompressed representation; keep it usable for
+    # conditional requests (which use weak comparison) without claiming
+    # byte-identity
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    compression_stats.add(encoding, len(data), len(compressed))
+    return response
@@ -1,3 +1,110 @@
+import threading
+import time
+
+from boxwise_flask.cache import CacheInvalidationMixin
+from boxwise_flask.db_routing import ReplicaRoutingMixin
+from boxwise_flask.sql_instrumentation import StatementRecordingMixin
 from playhouse.flask_utils import FlaskDB
+from playhouse.pool import MaxConnectionsExceeded, PooledMySQLDatabase
 
 db = FlaskDB()
+
+
+class PoolMetricsMixin:
+    """Mixin for pooled peewee databases that counts connection check-outs, and
+    measures the time spent blocked on a full pool. `exhausted` counts the
+    check-outs that found all connections in use, whether they obtained one after
+    waiting or timed out. The wait ends when the successful attempt starts, hence
+    it excludes opening a new connection."""
+
+    def __init__(self, *args, **kwargs):
+        self._metrics_lock = threading.Lock()
+        # Per thread, the times of the first failed attempt of the current check-out
+        # and of the start of the successful one
+        self._checkout = threading.local()
+        self.reset_pool_metrics()
+        super().__init__(*args, **kwargs)
+
+    def reset_pool_metrics(self):
+        self.checkouts = 0
+        self.exhausted = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def connect(self, reuse_if_open=False):
+        self._checkout.blocked_since = None
+        self._checkout.blocked_until = None
+        try:
+            opened = super().connect(reuse_if_open)
+        except MaxConnectionsExceeded:
+            with self._metrics_lock:
+                self.exhausted += 1
+                self.timeouts += 1
+            raise
+
+        blocked_since = self._checkout.blocked_since
+        wait_seconds = 0.0
+        if blocked_since is not None:
+            wait_seconds = self._checkout.blocked_until - blocked_since
+        if opened:
+            with self._metrics_lock:
+                self.checkouts += 1
+                if blocked_since is not None:
+                    self.exhausted += 1
+                self.wait_seconds_total += wait_seconds
+                self.wait_seconds_max = max(self.wait_seconds_max, wait_seconds)
+        return opened
+
+    def _connect(self):
+        # The pool calls this repeatedly while it waits for a free connection
+        attempt_start = time.perf_counter()
+        try:
+            connection = super()._connect()
+        except MaxConnectionsExceeded:
+            if getattr(self._checkout, "blocked_since", None) is None:
+                self._checkout.blocked_since = attempt_start
+            raise
+        self._checkout.blocked_until = attempt_start
+        return connection
+
+    def pool_stats(self):
+        return {
+            "max_connections": self._max_connections,
+            "in_use": len(self._in_use),
+            "idle": len(self._connections),
+            "checkouts": self.checkouts,
+            "exhausted": self.exhausted,
+            "timeouts": self.timeouts,
+            "wait_seconds_total": self.wait_seconds_total,
+            "wait_seconds_avg": (
+                self.wait_seconds_total / self.checkouts if self.checkouts else 0.0
+            ),
+            "wait_seconds_max": self.wait_seconds_max,
+        }
+
+
+class InstrumentedPooledMySQLDatabase(PoolMetricsMixin, PooledMySQLDatabase):
+    pass
+
+
+class PrimaryMySQLDatabase(
+    StatementRecordingMixin,
+    CacheInvalidationMixin,
+    ReplicaRoutingMixin,
+    InstrumentedPooledMySQLDatabase,
+):
+    """Pooled primary database that reads from a replica during GraphQL queries,
+    invalidates in-process caches on writes, and records the executed statements"""
+
+
+def get_pool_stats():
+    """Returns the metrics of the connection pool of the app database, or None if the
+    database is not pooled."""
+    database = db.database
+    if hasattr(database, "obj"):
+        # Resolve peewee Proxy
+        database = database.obj
+    if not isinstance(database, PoolMetricsMixin):
+        return None
+    return database.pool_stats()
@@ -0,0 +1,95 @@
+"""Routing of read statements to replica databases
+
+While a GraphQL query operation is executed, SELECT statements are sent to one of the
+configured replicas. Mutations, statements inside transactions and anything outside
+of GraphQL operations use the primary database. After a user ran a mutation, their
+queries are sent to the primary for a short window so that they read their own
+writes despite replication lag. In-process caches load from the primary as well,
+see `ReplicaRouter.use_primary()`.
+"""
+import itertools
+import threading
+from contextlib import contextmanager
+
+from boxwise_flask.cache import LRUCache
+
+QUERY = "query"
+
+
+def is_read_statement(sql):
+    return sql.lstrip()[:6].upper() == "SELECT"
+
+
+class ReplicaRouter:
+    def __init__(self, replicas=(), read_your_writes_window=5):
+        self._state = threading.local()
+        self._counter = itertools.count()
+        self.configure(replicas, read_your_writes_window)
+
+    def configure(self, replicas, read_your_writes_window=5):
+        self.replicas = list(replicas)
+        self.read_your_writes_window = read_your_writes_window
+        # Users that recently ran a mutation; entries expire after the window
+        self._recent_writers = LRUCache(maxsize=10000, ttl=read_your_writes_window)
+
+    @contextmanager
+    def route_operation(self, operation_type, user_key=None):
+        """Context manager that routes the statements of the GraphQL operation of the
+        given type ("query", "mutation", ...) that is executed by the given user."""
+        use_replica = (
+            operation_type == QUERY
+            and self.replicas
+            and (user_key is None or self._recent_writers.get(user_key) is None)
+        )
+        previous = getattr(self._state, "replica", None)
+        self._state.replica = self._choose_replica() if use_replica else None
+        try:
+            yield
+        finally:
+            self._state.replica = previous
+            if operation_type != QUERY and user_key is not None:
+                self._recent_writers.set(user_key, True)
+
+    @contextmanager
+    def use_primary(self):
+        """Context manager that sends the statements of the current thread to the
+        primary. Caches load their data this way: rows read from a replica lagging
+        behind a write that invalidated the cache would be kept until the next
+        invalidation."""
+        previous = getattr(self._state, "replica", None)
+        self._state.replica = None
+        try:
+            yield
+        finally:
+            self._state.replica = previous
+
+    def get_replica(self):
+        """Returns the replica that the current thread should read from, or None if
+        it should use the primary."""
+        return getattr(self._state, "replica", None)
+
+    def close_replicas(self):
+        """Closes the replica connections of the current thread"""
+        for replica in self.replicas:
+            if not replica.is_closed():
+                replica.close()
+
+    def _choose_replica(self):
+        return self.replicas[next(self._counter) % len(self.replicas)]
+
+
+db_router = ReplicaRouter()
+
+
+class ReplicaRoutingMixin:
+    """Mixin for the primary peewee database that sends read statements to the replica
+    chosen by the router."""
+
+    router = db_router
+
+    def execute_sql(self, sql, *args, **kwargs):
+        replica = self.router.get_replica()
+        if replica is not None and not self.in_transaction() and is_read_statement(sql):
+            replica.connect(reuse_if_open=True)
+            return replica.execute_sql(sql, *args, **kwargs)
+        return super().execute_sql(sql, *args, **kwargs)
@@ -0,0 +1,191 @@
+"""Static analysis of the cost and depth of GraphQL operations
+
+The cost of an operation is computed from its document before execution:
+- each field costs its weight: the value in FIELD_COSTS, or 1 for fields of object
+  type and 0 for scalar fields
+- the cost of the selection of a list field is multiplied by the expected number of
+  list items, i.e. the `first` argument if given, or DEFAULT_LIST_SIZE otherwise.
+  For connection fields, the `first` argument applies to the nested `edges` list.
+  `first` is limited to the range 0 to MAX_PAGE_SIZE: the resolvers reject other
+  values only after the analysis, so they must not lower the cost
+- fields in LIST_SIZE_ARGUMENTS return one list item per element of an input list
+  argument (or per unit of an integer argument), which gives the number of items
+  instead of `first`. Their weight grows by the value in ITEM_COSTS per item
+Operations exceeding MAX_QUERY_COST or MAX_QUERY_DEPTH are rejected.
+"""
+import logging
+import os
+
+from boxwise_flask.graph_ql.pagination import MAX_PAGE_SIZE
+from graphql import (
+    FieldNode,
+    FragmentDefinitionNode,
+    FragmentSpreadNode,
+    GraphQLError,
+    InlineFragmentNode,
+    OperationType,
+    get_named_type,
+    get_nullable_type,
+    is_leaf_type,
+    is_list_type,
+    value_from_ast_untyped,
+)
+from graphql.utilities import get_operation_ast
+
+logger = logging.getLogger(__name__)
+
+MAX_QUERY_COST = int(os.getenv("GRAPHQL_MAX_QUERY_COST", 5000))
+MAX_QUERY_DEPTH = int(os.getenv("GRAPHQL_MAX_QUERY_DEPTH", 10))
+DEFAULT_LIST_SIZE = int(os.getenv("GRAPHQL_DEFAULT_LIST_SIZE", 50))
+
+# Weights of fields that are more expensive to resolve than average, e.g. because
+# they run a query on a large table
+FIELD_COSTS = {
+    "Query.allBases": 5,
+    "Query.orgBases": 5,
+    "Query.allUsers": 10,
+    "Query.allBasesConnection": 5,
+    "Query.orgBasesConnection": 5,
+    "Query.allUsersConnection": 10,
+    "Query.boxes": 5,
+    "Query.changesSince": 20,
+    "Mutation.createBox": 10,
+    "Mutation.createBoxes": 50,
+    "Mutation.generateQrCodes": 50,
+}
+
+# Arguments whose size gives the number of list items returned by the field
+LIST_SIZE_ARGUMENTS = {
+    "Query.boxes": "qr_codes",
+    "Mutation.createBoxes": "inputs",
+    "Mutation.generateQrCodes": "count",
+}
+
+# Weights per list item of fields whose work grows with the number of items, e.g. one
+# inserted row per item
+ITEM_COSTS = {
+    "Query.boxes": 1,
+    "Mutation.createBoxes": 2,
+    "Mutation.generateQrCodes": 1,
+}
+
+
+class CostAnalysis:
+    def __init__(self, document, variables):
+        self.fragments = {
+            definition.name.value: definition
+            for definition in document.definitions
+            if isinstance(definition, FragmentDefinitionNode)
+        }
+        self.variables = variables or {}
+
+    def measure(self, parent_type, selection_set, depth=1, list_size=None):
+        """Returns cost and maximum depth of the selection set. `list_size` is the
+        `first` argument of the parent field, if any."""
+        total_cost = 0
+        max_depth = depth - 1
+        for field_node, field_parent_type in self.collect_fields(
+            parent_type, selection_set
+        ):
+            cost, field_depth = self.measure_field(
+                field_parent_type, field_node, depth, list_size
+            )
+            total_cost += cost
+            max_depth = max(max_depth, field_depth)
+        return total_cost, max_depth
+
+    def measure_field(self, parent_type, field_node, depth, parent_list_size=None):
+        name = field_node.name.value
+        if name.startswith("__"):
+            return 0, depth
+
+        field = parent_type.fields[name]
+        field_type = get_named_type(field.type)
+        key = "{}.{}".format(parent_type.name, name)
+        weight = FIELD_COSTS.get(key, 0 if is_leaf_type(field_type) else 1)
+        list_size = self.get_list_size(key, field_node)
+        weight += ITEM_COSTS.get(key, 0) * (list_size or 0)
+        if field_node.selection_set is None:
+            return weight, depth
+
+        if is_list_type(get_nullable_type(field.type)):
+            selection_cost, max_depth = self.measure(
+                field_type, field_node.selection_set, depth + 1
+            )
+            if list_size is None:
+                list_size = parent_list_size
+            if list_size is None:
+                list_size = DEFAULT_LIST_SIZE
+            return weight + list_size * selection_cost, max_depth
+
+        selection_cost, max_depth = self.measure(
+            field_type, field_node.selection_set, depth + 1, list_size
+        )
+        return weight + selection_cost, max_depth
+
+    def get_list_size(self, key, field_node):
+        """Returns the number of list items given by the arguments of the field, or
+        None if they do not limit it"""
+        argument_name = LIST_SIZE_ARGUMENTS.get(key, "first")
+        for argument in field_node.arguments:
+            if argument.name.value == argument_name:
+                size = value_from_ast_untyped(argument.value, self.variables)
+                if isinstance(size, list):
+                    size = len(size)
+                if not isinstance(size, int):
+                    return None
+                if argument_name == "first":
+                    size = min(size, MAX_PAGE_SIZE)
+                return max(0, size)
+        return None
+
+    def collect_fields(self, parent_type, selection_set):
+        """Yields the fields of the selection set, following fragments, along with
+        their parent type. The schema has no interfaces or unions, hence fragments
+        always apply to the parent type."""
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                yield selection, parent_type
+            elif isinstance(selection, FragmentSpreadNode):
+                fragment = self.fragments[selection.name.value]
+                yield from self.collect_fields(parent_type, fragment.selection_set)
+            elif isinstance(selection, InlineFragmentNode):
+                yield from self.collect_fields(parent_type, selection.selection_set)
+
+
+def analyze_cost(schema, document, operation_name=None, variables=None):
+    """Returns cost and depth of the operation. Raises GraphQLError if any of them
+    exceeds the configured maximum."""
+    operation = get_operation_ast(document, operation_name)
+    if operation is None:
+        return 0, 0
+
+    root_type = {
+        OperationType.QUERY: schema.query_type,
+        OperationType.MUTATION: schema.mutation_type,
+        OperationType.SUBSCRIPTION: schema.subscription_type,
+    }[operation.operation]
+    cost, depth = CostAnalysis(document, variables).measure(
+        root_type, operation.selection_set
+    )
+    logger.info(
+        "GraphQL operation %s: cost %d, depth %d",
+        operation.name.value if operation.name else "<anonymous>",
+        cost,
+        depth,
+    )
+
+    if cost > MAX_QUERY_COST or depth > MAX_QUERY_DEPTH:
+        raise GraphQLError(
+            "Operation exceeds the maximum cost of {} or depth of {}".format(
+                MAX_QUERY_COST, MAX_QUERY_DEPTH
+            ),
+            extensions={
+                "code": "OPERATION_TOO_COMPLEX",
+                "cost": cost,
+                "maxCost": MAX_QUERY_COST,
+                "depth": depth,
+                "maxDepth": MAX_QUERY_DEPTH,
+            },
+        )
+    return cost, depth
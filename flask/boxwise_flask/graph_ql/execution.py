@@ -0,0 +1,146 @@
+"""Execution of GraphQL operations, re-using parsed and validated documents"""
+import os
+
+from ariadne import format_error
+from ariadne.graphql import (
+    handle_graphql_errors,
+    handle_query_result,
+    parse_query,
+    validate_data,
+    validate_query,
+)
+from boxwise_flask.cache import LRUCache
+from boxwise_flask.db_routing import db_router
+from boxwise_flask.graph_ql.cost_analysis import analyze_cost
+from boxwise_flask.graph_ql.persisted_queries import (
+    get_query_hash,
+    resolve_persisted_query,
+)
+from boxwise_flask.sql_instrumentation import record_statements, report_statements
+from graphql import GraphQLError, OperationType, execute
+from graphql.utilities import get_operation_ast
+
+
+class DocumentCache:
+    """LRU cache of documents that were parsed and successfully validated against
+    the schema, keyed by the SHA-256 hash of the query text. Documents with
+    validation errors are not stored.
+    """
+
+    def __init__(self, maxsize=256):
+        self._cache = LRUCache(maxsize=maxsize)
+
+    def get_document(self, schema, query):
+        """Returns a tuple of the document parsed from `query` and the list of
+        validation errors. Raises GraphQLError if the query can't be parsed.
+        """
+        query_hash = get_query_hash(query)
+        document = self._cache.get(query_hash)
+        if document is not None:
+            return document, []
+
+        document = parse_query(query)
+        errors = validate_query(schema, document)
+        if not errors:
+            self._cache.set(query_hash, document)
+        return document, errors
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self):
+        return self._cache.stats()
+
+
+document_cache = DocumentCache(
+    maxsize=int(os.getenv("GRAPHQL_DOCUMENT_CACHE_SIZE", 256))
+)
+
+
+def validate_read_only(document, operation_name):
+    operation = get_operation_ast(document, operation_name)
+    if operation is not None and operation.operation != OperationType.QUERY:
+        raise GraphQLError(
+            "Only query operations can be sent via GET",
+            extensions={"code": "OPERATION_NOT_ALLOWED"},
+        )
+
+
+def execute_graphql(
+    schema,
+    data,
+    *,
+    context_value=None,
+    debug=False,
+    logger=None,
+    error_formatter=format_error,
+    read_only=False,
+    user_key=None,
+):
+    """Executes the operation sent as `data` and returns a tuple of success flag and
+    result dict, like `ariadne.graphql_sync`. Parsing and validation are skipped for
+    operations found in the document cache. Persisted queries are resolved from
+    their hash. If `read_only` is set, only query operations are executed.
+    Operations exceeding the maximum cost or depth are rejected before execution.
+    Query operations read from a replica database, unless the user identified by
+    `user_key` recently ran a mutation.
+    The executed SQL statements are reported in the result extensions if `debug` is
+    set, and logged otherwise.
+    """
+    with record_statements() as recording:
+        success, result = _execute_graphql(
+            schema,
+            data,
+            context_value=context_value,
+            debug=debug,
+            logger=logger,
+            error_formatter=error_formatter,
+            read_only=read_only,
+            user_key=user_key,
+        )
+    report_statements(
+        recording,
+        result,
+        debug=debug,
+        operation_name=data.get("operationName") if isinstance(data, dict) else None,
+    )
+    return success, result
+
+
+def _execute_graphql(
+    schema, data, *, context_value, debug, logger, error_formatter, read_only, user_key,
+):
+    try:
+        data = resolve_persisted_query(data)
+        validate_data(data)
+        document, validation_errors = document_cache.get_document(schema, data["query"])
+        if validation_errors:
+            return handle_graphql_errors(
+                validation_errors,
+                logger=logger,
+                error_formatter=error_formatter,
+                debug=debug,
+            )
+
+        if read_only:
+            validate_read_only(document, data.get("operationName"))
+        analyze_cost(schema, document, data.get("operationName"), data.get("variables"))
+
+        operation = get_operation_ast(document, data.get("operationName"))
+        with db_router.route_operation(
+            operation.operation.value if operation else None, user_key
+        ):
+            result = execute(
+                schema,
+                document,
+                context_value=context_value,
+                variable_values=data.get("variables"),
+                operation_name=data.get("operationName"),
+            )
+    except GraphQLError as error:
+        return handle_graphql_errors(
+            [error], logger=logger, error_formatter=error_formatter, debug=debug
+        )
+    return handle_query_result(
+        result, logger=logger, error_formatter=error_formatter, debug=debug
+    )
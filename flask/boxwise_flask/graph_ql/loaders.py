@@ -0,0 +1,127 @@
+"""Per-request loaders that batch the resolution of foreign keys
+
+Resolvers returning model instances register the foreign keys of all returned
+instances with the loaders (`prime_relations`). The first resolver that asks a loader
+for an object then fetches all registered keys of that model with a single
+`SELECT ... WHERE id IN (...)` query. Hence resolving a relation for a list of N
+objects costs one query instead of N. Relations to reference tables are served from
+the in-memory registry without any query.
+"""
+from boxwise_flask.models.base import Base
+from boxwise_flask.models.box import Box
+from boxwise_flask.models.box_state import BoxState
+from boxwise_flask.models.location import Location
+from boxwise_flask.models.organisation import Organisation
+from boxwise_flask.models.product import Product
+from boxwise_flask.models.size import Size
+from boxwise_flask.reference_data import reference_data
+
+# For each model, the attributes holding foreign keys, and the names of the loaders
+# resolving them
+RELATIONS = {
+    Base: (("organisation_id", "organisations"),),
+    Box: (
+        ("product_id", "products"),
+        ("location_id", "locations"),
+        ("size_id", "sizes"),
+        ("box_state_id", "box_states"),
+    ),
+    Location: (("base_id", "bases"),),
+}
+
+
+class ModelLoader:
+    """Loads instances of a model by primary key, batching all pending keys into one
+    query and caching the results for the lifetime of the loader."""
+
+    def __init__(self, loaders, model):
+        self.loaders = loaders
+        self.model = model
+        self._cache = {}
+        self._pending = set()
+        self.query_count = 0
+
+    def prime(self, keys):
+        """Registers keys to be fetched with the next query"""
+        self._pending.update(
+            key for key in keys if key is not None and key not in self._cache
+        )
+
+    def load(self, key):
+        if key is None:
+            return None
+        if key not in self._cache:
+            self._pending.add(key)
+            self._fetch_pending()
+        return self._cache.get(key)
+
+    def load_many(self, keys):
+        self.prime(keys)
+        return [self.load(key) for key in keys]
+
+    def _fetch_pending(self):
+        keys = self._pending
+        self._pending = set()
+        self.query_count += 1
+        instances = list(
+            self.model.select().where(self.model._meta.primary_key.in_(list(keys)))
+        )
+        for key in keys:
+            self._cache[key] = None
+        for instance in instances:
+            self._cache[instance.get_id()] = instance
+        self.loaders.prime_relations(instances)
+
+
+class ReferenceLoader:
+    """Loader with the interface of ModelLoader that serves the instances of a
+    reference model from the registry."""
+
+    def __init__(self, model):
+        self.model = model
+
+    def prime(self, keys):
+        pass
+
+    def load(self, key):
+        return reference_data.get(self.model, key)
+
+    def load_many(self, keys):
+        return [self.load(key) for key in keys]
+
+
+class Loaders:
+    """Collection of the loaders used while executing one GraphQL request"""
+
+    def __init__(self):
+        self.bases = ModelLoader(self, Base)
+        self.box_states = ReferenceLoader(BoxState)
+        self.locations = ModelLoader(self, Location)
+        self.organisations = ModelLoader(self, Organisation)
+        self.products = ModelLoader(self, Product)
+        self.sizes = ReferenceLoader(Size)
+
+    def prime_relations(self, instances, model=None):
+        """Registers the foreign keys of the given model instances with the loaders
+        of the related models. `model` must be given for rows that are not model
+        instances, e.g. named tuples, which lack the attributes of unselected
+        columns."""
+        instances = [instance for instance in instances if instance is not None]
+        if not instances:
+            return
+
+        model = model or type(instances[0])
+        for attribute, loader_name in RELATIONS.get(model, ()):
+            getattr(self, loader_name).prime(
+                getattr(instance, attribute, None) for instance in instances
+            )
+
+
+def get_loaders(context):
+    """Returns the loaders of the request passed as GraphQL context, creating them on
+    first use."""
+    loaders = getattr(context, "loaders", None)
+    if loaders is None:
+        loaders = Loaders()
+        context.loaders = loaders
+    return loaders
@@ -5,6 +5,9 @@ mutation_defs = gql(
     """
     type Mutation {
         createBox(box_creation_input:CreateBoxInput):Box
+        createBoxes(inputs: [CreateBoxInput!]!): [CreateBoxResult!]!
+        "Issues new QR codes; label images are rendered by POST /api/qr-codes"
+        generateQrCodes(count: Int!): [QrCode!]!
     }
     """
 )
@@ -0,0 +1,69 @@
+"""Cursor-based pagination following the Relay connection specification
+
+Pages are fetched by keyset pagination on the primary key: the cursor encodes the ID
+of the last object of the previous page, and the next page starts with the first
+object having a larger ID. Hence fetching a page costs the same regardless of its
+position, and never loads more than one page into memory.
+"""
+import base64
+import binascii
+import os
+
+from graphql import GraphQLError
+
+DEFAULT_PAGE_SIZE = int(os.getenv("GRAPHQL_DEFAULT_PAGE_SIZE", 50))
+MAX_PAGE_SIZE = int(os.getenv("GRAPHQL_MAX_PAGE_SIZE", 100))
+
+
+def encode_cursor(model, key):
+    return base64.urlsafe_b64encode(
+        "{}:{}".format(model.__name__, key).encode()
+    ).decode()
+
+
+def decode_cursor(model, cursor):
+    try:
+        name, key = base64.urlsafe_b64decode(cursor.encode()).decode().split(":")
+        if name != model.__name__:
+            raise ValueError
+        return int(key)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise GraphQLError(
+            "Invalid cursor '{}'".format(cursor), extensions={"code": "INVALID_CURSOR"},
+        )
+
+
+def get_page_size(first):
+    if first is None:
+        return DEFAULT_PAGE_SIZE
+    if first < 0 or first > MAX_PAGE_SIZE:
+        raise GraphQLError(
+            "Argument 'first' must be between 0 and {}".format(MAX_PAGE_SIZE),
+            extensions={"code": "INVALID_PAGE_SIZE"},
+        )
+    return first
+
+
+def paginate(query, model, first=None, after=None):
+    """Returns a page of the objects selected by `query` as connection dict. The
+    query must select the primary key of the model."""
+    page_size = get_page_size(first)
+    primary_key = model._meta.primary_key
+    if after is not None:
+        query = query.where(primary_key > decode_cursor(model, after))
+
+    # Fetch one more object than requested to find out whether there is a next page
+    objects = list(query.order_by(primary_key).limit(page_size + 1))
+    has_next_page = len(objects) > page_size
+    objects = objects[:page_size]
+
+    edges = [
+        {"cursor": encode_cursor(model, obj.get_id()), "node": obj} for obj in objects
+    ]
+    return {
+        "edges": edges,
+        "page_info": {
+            "has_next_page": has_next_page,
+            "end_cursor": edges[-1]["cursor"] if edges else None,
+        },
+    }
@@ -0,0 +1,88 @@
+"""Support for the automatic persisted queries (APQ) protocol of Apollo
+
+Instead of the full query text, a client sends the SHA-256 hash of the query in
+`extensions.persistedQuery.sha256Hash`. If the hash is not known yet, the server
+responds with a `PERSISTED_QUERY_NOT_FOUND` error, and the client repeats the request
+with both query text and hash, which registers the query.
+"""
+import hashlib
+import os
+
+from boxwise_flask.cache import LRUCache
+from graphql import GraphQLError
+
+PERSISTED_QUERY_VERSION = 1
+
+
+def get_query_hash(query):
+    return hashlib.sha256(query.encode()).hexdigest()
+
+
+class PersistedQueryStore:
+    """Bounded mapping of query hashes to query texts"""
+
+    def __init__(self, maxsize=1024):
+        self._cache = LRUCache(maxsize=maxsize)
+
+    def get(self, query_hash):
+        return self._cache.get(query_hash)
+
+    def register(self, query_hash, query):
+        self._cache.set(query_hash, query)
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self):
+        return self._cache.stats()
+
+
+persisted_query_store = PersistedQueryStore(
+    maxsize=int(os.getenv("GRAPHQL_PERSISTED_QUERY_CACHE_SIZE", 1024))
+)
+
+
+def get_persisted_query_hash(data):
+    """Returns the query hash sent in the `persistedQuery` extension of the request
+    data, or None if the extension is absent."""
+    extensions = data.get("extensions") if isinstance(data, dict) else None
+    if not isinstance(extensions, dict):
+        return None
+    persisted_query = extensions.get("persistedQuery")
+    if not isinstance(persisted_query, dict):
+        return None
+
+    if persisted_query.get("version") != PERSISTED_QUERY_VERSION:
+        raise GraphQLError(
+            "Unsupported persisted query version",
+            extensions={"code": "PERSISTED_QUERY_NOT_SUPPORTED"},
+        )
+    return persisted_query.get("sha256Hash")
+
+
+def resolve_persisted_query(data):
+    """Returns the request data with the query text filled in from the store if the
+    request only contains a query hash. If it contains both query text and hash, the
+    query is registered in the store.
+    """
+    query_hash = get_persisted_query_hash(data)
+    if query_hash is None:
+        return data
+
+    query = data.get("query")
+    if query is None:
+        query = persisted_query_store.get(query_hash)
+        if query is None:
+            raise GraphQLError(
+                "PersistedQueryNotFound",
+                extensions={"code": "PERSISTED_QUERY_NOT_FOUND"},
+            )
+        return dict(data, query=query)
+
+    if not isinstance(query, str) or get_query_hash(query) != query_hash:
+        raise GraphQLError(
+            "provided sha does not match query",
+            extensions={"code": "PERSISTED_QUERY_HASH_MISMATCH"},
+        )
+    persisted_query_store.register(query_hash, query)
+    return data
@@ -6,11 +6,18 @@ query_defs = gql(
     type Query {
         hello: String!
         allBases: [Base]
+        allBasesConnection(first: Int, after: String): BaseConnection
         orgBases(org_id: Int): [Base]
+        orgBasesConnection(org_id: Int, first: Int, after: String): BaseConnection
         base(id: Int!): Base
         allUsers: [User]
+        allUsersConnection(first: Int, after: String): UserConnection
         user(email: String): User
         box(qr_code: String): Box
+        "Boxes of the given QR codes, in the same order; null for codes without box"
+        boxes(qr_codes: [String!]!): [Box]!
+        "Changes of the data of a base since the previous page; start without cursor"
+        changesSince(base_id: Int!, cursor: String, first: Int): Changes!
     }
     """
 )
@@ -0,0 +1,135 @@
+"""Compilation of GraphQL selection sets into peewee queries
+
+Instead of `SELECT *`, root resolvers may build their query from the fields that the
+client actually requested: only the columns of selected fields are fetched, and
+selected relations (e.g. `organisation { label }` of a Base) are fetched via a join
+in the same statement. Read-only resolvers may fetch plain rows instead of model
+instances (`select_rows`), which avoids the cost of constructing model objects.
+"""
+from ariadne.utils import convert_camel_case_to_snake
+from boxwise_flask.reference_data import ReferenceModel
+from graphql import FieldNode, FragmentSpreadNode, InlineFragmentNode
+from peewee import JOIN, ForeignKeyField
+
+
+def collect_selections(info, selection_sets):
+    """Returns a dict mapping the name of each field selected in the given selection
+    sets (following fragments) to the list of its own selection sets."""
+    fields = {}
+    for selection_set in selection_sets:
+        if selection_set is None:
+            continue
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                sub_selections = fields.setdefault(selection.name.value, [])
+                if selection.selection_set is not None:
+                    sub_selections.append(selection.selection_set)
+            elif isinstance(selection, FragmentSpreadNode):
+                fragment = info.fragments[selection.name.value]
+                merge_selections(
+                    fields, collect_selections(info, [fragment.selection_set])
+                )
+            elif isinstance(selection, InlineFragmentNode):
+                merge_selections(
+                    fields, collect_selections(info, [selection.selection_set])
+                )
+    return fields
+
+
+def merge_selections(fields, other_fields):
+    for name, sub_selections in other_fields.items():
+        fields.setdefault(name, []).extend(sub_selections)
+
+
+def get_model_field(model, graphql_field_name):
+    """Returns the model field backing the GraphQL field, or None. The GraphQL name
+    is matched in snake case against the field names, including the `<name>_id`
+    form of foreign keys."""
+    name = convert_camel_case_to_snake(graphql_field_name)
+    fields = model._meta.fields
+    if name in fields:
+        return fields[name]
+    if name.endswith("_id") and isinstance(fields.get(name[:-3]), ForeignKeyField):
+        return fields[name[:-3]]
+    return None
+
+
+def plan_columns(info, model, selection_sets, join=True):
+    """Returns the list of columns to select for the given selection sets of a model,
+    and the list of (foreign key field, columns) to join. Only one level of relations
+    is joined; deeper relations, relations to models that are already part of the
+    query, and relations to reference tables are left to the resolvers."""
+    columns = [model._meta.primary_key]
+    column_names = {model._meta.primary_key.name}
+    joins = []
+    joined_models = {model}
+    for name, sub_selections in collect_selections(info, selection_sets).items():
+        field = get_model_field(model, name)
+        if field is None or field.name in column_names:
+            continue
+        columns.append(field)
+        column_names.add(field.name)
+        if (
+            join
+            and sub_selections
+            and isinstance(field, ForeignKeyField)
+            and field.rel_model not in joined_models
+            and not issubclass(field.rel_model, ReferenceModel)
+        ):
+            related_columns, _ = plan_columns(
+                info, field.rel_model, sub_selections, join=False
+            )
+            joins.append((field, related_columns))
+            joined_models.add(field.rel_model)
+    return columns, joins
+
+
+def get_selection_sets(info, path=()):
+    selection_sets = [field_node.selection_set for field_node in info.field_nodes]
+    for name in path:
+        selection_sets = collect_selections(info, selection_sets).get(name, [])
+    return selection_sets
+
+
+def select_requested(model, info, path=()):
+    """Returns a query for `model` that selects only the columns of the fields
+    requested by the client in the current field, joining selected relations. If
+    the model objects are nested in the result of the current field, `path` holds
+    the names of the fields leading to them, e.g. ("edges", "node") for connections.
+    """
+    columns, joins = plan_columns(info, model, get_selection_sets(info, path))
+
+    query = model.select(*columns)
+    for foreign_key, related_columns in joins:
+        query = query.select_extend(*related_columns).join_from(
+            model, foreign_key.rel_model, JOIN.LEFT_OUTER, on=foreign_key
+        )
+    return query
+
+
+def select_rows(model, info, path=()):
+    """Read-only variant of `select_requested` that returns the requested columns as
+    named tuples instead of model instances. Foreign keys are named like the ID
+    attributes of model instances, e.g. `organisation_id`. If relations are selected
+    that can be joined, the query of `select_requested` is returned instead, since
+    one joined statement is cheaper than constructing the rows.
+    """
+    columns, joins = plan_columns(info, model, get_selection_sets(info, path))
+    if joins:
+        return select_requested(model, info, path)
+    return model.select(
+        *[
+            column.alias(
+                column.object_id_name
+                if isinstance(column, ForeignKeyField)
+                else column.name
+            )
+            for column in columns
+        ]
+    ).namedtuples()
+
+
+def is_joined(instance, foreign_key_name):
+    """Indicates whether the related object of the foreign key was fetched along with
+    the instance by a join. Rows from `select_rows` never have joined objects."""
+    return foreign_key_name in getattr(instance, "__rel__", ())
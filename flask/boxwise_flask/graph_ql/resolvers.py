@@ -8,16 +8,27 @@ from ariadne import (
     snake_case_fallback_resolvers,
 )
 from boxwise_flask.auth_helper import authorization_test
+from boxwise_flask.graph_ql.loaders import get_loaders
 from boxwise_flask.graph_ql.mutation_defs import mutation_defs
+from boxwise_flask.graph_ql.pagination import paginate
 from boxwise_flask.graph_ql.query_defs import query_defs
+from boxwise_flask.graph_ql.query_planner import (
+    is_joined,
+    select_requested,
+    select_rows,
+)
+from boxwise_flask.graph_ql.sync import SYNC_TABLES, get_changes
 from boxwise_flask.graph_ql.type_defs import type_defs
 from boxwise_flask.models.base import Base
 from boxwise_flask.models.box import Box
 from boxwise_flask.models.qr_code import QRCode
-from boxwise_flask.models.user import User, get_user_from_email_with_base_ids
+from boxwise_flask.models.user import User, get_user_row_with_base_ids
 
 query = ObjectType("Query")
 mutation = MutationType()
+base = ObjectType("Base")
+box = ObjectType("Box")
+location = ObjectType("Location")
 
 datetime_scalar = ScalarType("Datetime")
 date_scalar = ScalarType("Date")
@@ -39,17 +50,42 @@ def serialize_date(value):
 def resolve_all_bases(_, info):
     # discard the first input because it belongs to a root type (Query, Mutation,
     # Subscription). Otherwise it would be a value returned by a parent resolver.
-    return Base.get_all_bases()
+    bases = Base.get_all_bases(select_rows(Base, info))
+    get_loaders(info.context).prime_relations(bases, Base)
+    return bases
+
+
+@query.field("allBasesConnection")
+def resolve_all_bases_connection(_, info, first=None, after=None):
+    query = select_requested(Base, info, path=("edges", "node"))
+    connection = paginate(query, Base, first=first, after=after)
+    get_loaders(info.context).prime_relations(
+        [edge["node"] for edge in connection["edges"]]
+    )
+    return connection
 
 
 # not everyone can see all the bases
 # see the comment in https://github.com/boxwise/boxwise-flask/pull/19
 @query.field("orgBases")
 def resolve_org_bases(_, info, org_id):
-    response = Base.get_for_organisation(org_id)
+    response = Base.get_for_organisation(org_id, select_rows(Base, info))
+    get_loaders(info.context).prime_relations(response, Base)
     return response
 
 
+@query.field("orgBasesConnection")
+def resolve_org_bases_connection(_, info, org_id, first=None, after=None):
+    query = select_requested(Base, info, path=("edges", "node")).where(
+        Base.organisation_id == org_id
+    )
+    connection = paginate(query, Base, first=first, after=after)
+    get_loaders(info.context).prime_relations(
+        [edge["node"] for edge in connection["edges"]]
+    )
+    return connection
+
+
 @query.field("base")
 def resolve_base(_, info, id):
     authorization_test("bases", base_id=id)
@@ -59,20 +95,45 @@ def resolve_base(_, info, id):
 
 @query.field("allUsers")
 def resolve_all_users(_, info):
-    response = User.get_all_users()
+    response = User.get_all_users(select_rows(User, info))
     return response
 
 
+@query.field("allUsersConnection")
+def resolve_all_users_connection(_, info, first=None, after=None):
+    query = select_requested(User, info, path=("edges", "node"))
+    return paginate(query, User, first=first, after=after)
+
+
 # TODO get currrent user based on email in token
 @query.field("user")
 def resolve_user(_, info, email):
-    return get_user_from_email_with_base_ids(email)
+    return get_user_row_with_base_ids(email, select_rows(User, info))
 
 
 @query.field("box")
 def resolve_box(_, info, qr_code):
-    qr_id = QRCode.get_id_from_code(qr_code)
-    return Box.get_box_from_qr(qr_id)
+    response = Box.get_box_from_qr_code(qr_code)
+    get_loaders(info.context).prime_relations([response])
+    return response
+
+
+@query.field("boxes")
+def resolve_boxes(_, info, qr_codes):
+    boxes = Box.get_boxes_from_qr_codes(qr_codes)
+    response = [boxes.get(qr_code) for qr_code in qr_codes]
+    get_loaders(info.context).prime_relations(response, Box)
+    return response
+
+
+@query.field("changesSince")
+def resolve_changes_since(_, info, base_id, cursor=None, first=None):
+    authorization_test("bases", base_id=base_id)
+    changes = get_changes(info, base_id, cursor=cursor, first=first)
+    loaders = get_loaders(info.context)
+    for name, model, _ in SYNC_TABLES:
+        loaders.prime_relations(changes[name], model)
+    return changes
 
 
 @mutation.field("createBox")
@@ -81,8 +142,53 @@ def create_box(_, info, box_creation_input):
     return response
 
 
+@mutation.field("createBoxes")
+def create_boxes(_, info, inputs):
+    results = Box.create_boxes(inputs)
+    get_loaders(info.context).prime_relations([result["box"] for result in results])
+    return results
+
+
+@mutation.field("generateQrCodes")
+def generate_qr_codes(_, info, count):
+    return QRCode.create_codes(count)
+
+
+# Relations are resolved via the per-request loaders, see loaders.py
+@base.field("organisation")
+def resolve_base_organisation(base_obj, info):
+    if is_joined(base_obj, "organisation"):
+        return base_obj.organisation
+    return get_loaders(info.context).organisations.load(base_obj.organisation_id)
+
+
+@box.field("product")
+def resolve_box_product(box_obj, info):
+    return get_loaders(info.context).products.load(box_obj.product_id)
+
+
+@box.field("location")
+def resolve_box_location(box_obj, info):
+    return get_loaders(info.context).locations.load(box_obj.location_id)
+
+
+@box.field("size")
+def resolve_box_size(box_obj, info):
+    return get_loaders(info.context).sizes.load(box_obj.size_id)
+
+
+@box.field("state")
+def resolve_box_state(box_obj, info):
+    return get_loaders(info.context).box_states.load(box_obj.box_state_id)
+
+
+@location.field("base")
+def resolve_location_base(location_obj, info):
+    return get_loaders(info.context).bases.load(location_obj.base_id)
+
+
 schema = make_executable_schema(
     gql(type_defs + query_defs + mutation_defs),
-    [query, mutation],
+    [query, mutation, base, box, location, datetime_scalar, date_scalar],
     snake_case_fallback_resolvers,
 )
@@ -0,0 +1,119 @@
+"""Incremental sync of the data visible to a base
+
+Offline clients fetch the rows created, modified or soft-deleted since their last
+sync by keyset pagination on (modified, id) of each table, backed by an index on
+these columns. The opaque cursor holds the position of the last row returned per
+table. Rows whose `modified` timestamp is not set sort first, hence they are part of
+the first sync only; writers must set `modified` whenever they create, update or
+soft-delete a row, as the box creation mutations do.
+
+Rows modified in the last SYNC_LAG seconds are left to the next sync: a transaction
+committing after a page has been fetched may still write an earlier timestamp, which
+would otherwise be skipped.
+"""
+import base64
+import binascii
+import json
+import os
+from datetime import datetime, timedelta
+
+from boxwise_flask.graph_ql.pagination import get_page_size
+from boxwise_flask.graph_ql.query_planner import select_requested
+from boxwise_flask.models.base import Base
+from boxwise_flask.models.box import Box
+from boxwise_flask.models.location import Location
+from boxwise_flask.models.product import Product
+from graphql import GraphQLError
+
+SYNC_LAG = int(os.getenv("SYNC_LAG", 5))
+
+
+def get_visible_boxes_condition(base_id):
+    return Box.location.in_(
+        Location.select(Location.id).where(Location.base == base_id)
+    )
+
+
+# Tuples of the field name in the Changes type, the model, and the function returning
+# the condition for the rows visible to a base
+SYNC_TABLES = (
+    ("bases", Base, lambda base_id: Base.id == base_id),
+    ("locations", Location, lambda base_id: Location.base == base_id),
+    ("products", Product, lambda base_id: Product.base == base_id),
+    ("boxes", Box, get_visible_boxes_condition),
+)
+
+
+def encode_sync_cursor(base_id, positions):
+    data = {
+        "base_id": base_id,
+        "positions": {
+            name: [modified.isoformat() if modified else None, key]
+            for name, (modified, key) in positions.items()
+        },
+    }
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).decode()
+
+
+def decode_sync_cursor(base_id, cursor):
+    """Returns a dict of (modified, id) of the last row returned per table"""
+    if cursor is None:
+        return {}
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+        if data["base_id"] != base_id:
+            raise ValueError
+        return {
+            name: (datetime.fromisoformat(modified) if modified else None, int(key))
+            for name, (modified, key) in data["positions"].items()
+        }
+    except (binascii.Error, UnicodeDecodeError, ValueError, KeyError, TypeError):
+        raise GraphQLError(
+            "Invalid cursor '{}'".format(cursor), extensions={"code": "INVALID_CURSOR"},
+        )
+
+
+def get_changed_after_condition(model, position):
+    """Returns the condition for the rows following the (modified, id) position in
+    the order of the keyset"""
+    modified, key = position
+    if modified is None:
+        return (model.modified.is_null() & (model.id > key)) | model.modified.is_null(
+            False
+        )
+    return (model.modified > modified) | (
+        (model.modified == modified) & (model.id > key)
+    )
+
+
+def get_changes(info, base_id, cursor=None, first=None):
+    """Returns the next page of changes of the tables visible to the base as dict with
+    a list of model instances per table, the cursor for the following page, and
+    whether more changes are available. Every table contributes at most `first`
+    rows."""
+    page_size = get_page_size(first)
+    positions = decode_sync_cursor(base_id, cursor)
+    until = datetime.now() - timedelta(seconds=SYNC_LAG)
+
+    changes = {"has_more": False}
+    for name, model, get_visible_condition in SYNC_TABLES:
+        query = (
+            select_requested(model, info, path=(name,))
+            .select_extend(model.modified)
+            .where(get_visible_condition(base_id))
+            .where(model.modified.is_null() | (model.modified <= until))
+        )
+        if name in positions:
+            query = query.where(get_changed_after_condition(model, positions[name]))
+
+        # Fetch one more row than requested to find out whether there are more
+        rows = list(query.order_by(model.modified, model.id).limit(page_size + 1))
+        if len(rows) > page_size:
+            changes["has_more"] = True
+            rows = rows[:page_size]
+        if rows:
+            positions[name] = (rows[-1].modified, rows[-1].id)
+        changes[name] = rows
+
+    changes["cursor"] = encode_sync_cursor(base_id, positions)
+    return changes
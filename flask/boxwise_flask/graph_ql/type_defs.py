@@ -8,6 +8,14 @@ type_defs = gql(
         name: String
         currencyName: String
         organisationId: Int
+        organisation: Organisation
+        modified: Datetime
+        deleted: Datetime
+    }
+
+    type Organisation {
+        id: Int
+        label: String
     }
 
     type User {
@@ -35,6 +43,89 @@ type_defs = gql(
         created: Datetime
         created_by: String
         box_state_id: Int
+        product: Product
+        location: Location
+        size: Size
+        state: BoxState
+        modified: Datetime
+        deleted: Datetime
+    }
+
+    type Product {
+        id: Int
+        name: String
+        value: Int
+        comments: String
+        modified: Datetime
+        deleted: Datetime
+    }
+
+    type Location {
+        id: Int
+        label: String
+        base: Base
+        modified: Datetime
+        deleted: Datetime
+    }
+
+    type Size {
+        id: Int
+        label: String
+    }
+
+    type BoxState {
+        id: Int
+        label: String
+    }
+
+    type PageInfo {
+        hasNextPage: Boolean!
+        endCursor: String
+    }
+
+    type BaseEdge {
+        cursor: String!
+        node: Base
+    }
+
+    type BaseConnection {
+        edges: [BaseEdge!]!
+        pageInfo: PageInfo!
+    }
+
+    type UserEdge {
+        cursor: String!
+        node: User
+    }
+
+    type UserConnection {
+        edges: [UserEdge!]!
+        pageInfo: PageInfo!
+    }
+
+    # Result of one input of the createBoxes mutation: either the created box, or an
+    # error message
+    type CreateBoxResult {
+        box: Box
+        error: String
+    }
+
+    # Page of the rows visible to a base that were created, modified or soft-deleted
+    # after the cursor; deleted rows have the `deleted` field set
+    type Changes {
+        bases: [Base!]!
+        locations: [Location!]!
+        products: [Product!]!
+        boxes: [Box!]!
+        "Cursor of the next page, to be passed to the next call of changesSince"
+        cursor: String!
+        hasMore: Boolean!
+    }
+
+    type QrCode {
+        id: Int!
+        code: String!
+        created: Datetime
     }
 
     input CreateBoxInput {
@@ -0,0 +1,68 @@
+"""Serialization of GraphQL responses to compact JSON
+
+Two serializers are available:
+- "orjson" uses the orjson package if it is installed
+- "json" uses the standard library encoder
+The Date and Datetime scalars format their values in ISO 8601 themselves, so that
+GraphQL results can be encoded by any JSON encoder; both serializers format other
+date and datetime values the same way. The serializer is selected by the
+`JSON_SERIALIZER` environment variable; by default orjson is used if available.
+"""
+import datetime
+import json
+import os
+
+from flask import current_app
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+def encode_default(value):
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    raise TypeError(
+        "Object of type {} is not JSON serializable".format(type(value).__name__)
+    )
+
+
+def dumps_stdlib(data):
+    return json.dumps(
+        data, separators=(",", ":"), ensure_ascii=False, default=encode_default
+    ).encode("utf-8")
+
+
+def dumps_orjson(data):
+    return orjson.dumps(data)
+
+
+SERIALIZERS = {"json": dumps_stdlib}
+if orjson is not None:
+    SERIALIZERS["orjson"] = dumps_orjson
+
+
+def get_serializer(name=None):
+    """Returns the function that serializes data to JSON bytes. Raises ValueError if
+    the serializer with the given name is unknown or not installed."""
+    if not name:
+        name = "orjson" if orjson is not None else "json"
+    try:
+        return SERIALIZERS[name]
+    except KeyError:
+        raise ValueError(
+            "JSON serializer '{}' is unknown or not installed; available: {}".format(
+                name, ", ".join(SERIALIZERS)
+            )
+        )
+
+
+dumps = get_serializer(os.getenv("JSON_SERIALIZER"))
+
+
+def json_response(data, status=200):
+    """Returns a response with the data serialized by the configured serializer"""
+    return current_app.response_class(
+        dumps(data), status=status, mimetype="application/json"
+    )
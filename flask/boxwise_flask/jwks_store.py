@@ -0,0 +1,117 @@
+"""In-process store for the JSON Web Key Set used to verify Auth0 access tokens"""
+import json
+import os
+import threading
+import time
+
+from six.moves.urllib.request import urlopen
+
+AUTH0_DOMAIN = os.getenv("AUTH0_DOMAIN")
+
+
+def default_jwks_url():
+    """Returns the URL of the key set to load. `AUTH0_JWKS_URL` may point to a local
+    `file://` URL or a plain file path, e.g. for offline testing.
+    """
+    return os.getenv(
+        "AUTH0_JWKS_URL", "https://{}/.well-known/jwks.json".format(AUTH0_DOMAIN)
+    )
+
+
+def load_jwks(url):
+    """Reads a key set from a http(s)/file URL or from a local file path."""
+    if "://" not in url:
+        with open(url) as jwks_file:
+            return json.load(jwks_file)
+    response = urlopen(url)
+    try:
+        return json.loads(response.read())
+    finally:
+        response.close()
+
+
+class JwksStore:
+    """Keeps the keys of a JWKS in memory, indexed by their `kid`.
+
+    The key set is loaded once on first use and kept for `ttl` seconds. Afterwards
+    lookups are still served from the stale key set while a background thread
+    fetches a fresh copy. A lookup for an unknown `kid` (e.g. after a key rotation)
+    triggers a synchronous re-fetch, at most once every `min_refresh_interval`
+    seconds. If fetching fails, the previously loaded keys are kept.
+    """
+
+    def __init__(self, url=None, ttl=3600, min_refresh_interval=60, loader=load_jwks):
+        self.url = url or default_jwks_url()
+        self.ttl = ttl
+        self.min_refresh_interval = min_refresh_interval
+        self._loader = loader
+        self._keys = None
+        self._loaded_at = None
+        self._last_fetch_attempt = None
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    def get_key(self, kid):
+        """Returns the key with the given `kid`, or None if it is not in the set."""
+        keys = self._keys
+        if keys is None:
+            keys = self.refresh()
+        elif self._is_stale():
+            self._refresh_in_background()
+
+        key = keys.get(kid)
+        if key is None and self._may_refetch():
+            key = self.refresh().get(kid)
+        return key
+
+    def refresh(self):
+        """Fetches the key set synchronously and returns the `kid`-to-key mapping.
+        Fetch errors are only raised if no keys were loaded before.
+        """
+        with self._lock:
+            self._last_fetch_attempt = time.monotonic()
+            try:
+                jwks = self._loader(self.url)
+            except Exception:
+                if self._keys is None:
+                    raise
+                return self._keys
+            self._keys = {key["kid"]: key for key in jwks.get("keys", [])}
+            self._loaded_at = time.monotonic()
+            return self._keys
+
+    def clear(self):
+        with self._lock:
+            self._keys = None
+            self._loaded_at = None
+            self._last_fetch_attempt = None
+
+    def _is_stale(self):
+        return time.monotonic() - self._loaded_at >= self.ttl
+
+    def _may_refetch(self):
+        last_attempt = self._last_fetch_attempt
+        return (
+            last_attempt is None
+            or time.monotonic() - last_attempt >= self.min_refresh_interval
+        )
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing or not self._may_refetch():
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                self.refresh()
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=run, daemon=True).start()
+
+
+jwks_store = JwksStore(
+    ttl=int(os.getenv("AUTH0_JWKS_TTL", 3600)),
+    min_refresh_interval=int(os.getenv("AUTH0_JWKS_MIN_REFRESH_INTERVAL", 60)),
+)
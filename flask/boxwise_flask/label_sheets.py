@@ -0,0 +1,232 @@
+"""Printable A4 sheets of QR code labels as PDF
+
+Each label shows the QR code of QR_CODE_URL (see qr_labels.py) with the code printed
+below. The QR code is embedded as a 1-bit image with one pixel per module, which
+the PDF viewer scales up without interpolation, so that each label adds only a few
+hundred bytes to the document.
+
+The document is written page by page, and each page is yielded as soon as it is
+complete; apart from the compressed label images, memory use does not grow with the
+number of pages. Images are rendered in worker processes, see
+`render_in_processes()`, and cached by code.
+"""
+import os
+import zlib
+
+from boxwise_flask.cache import LRUCache
+from boxwise_flask.qr_labels import QR_CODE_URL, qrcode, render_in_processes
+
+# A4 in points
+PAGE_WIDTH = 595.28
+PAGE_HEIGHT = 841.89
+PAGE_MARGIN = 28.35  # 1 cm
+FONT_SIZE = 8
+# Average width of digits and lowercase letters of Helvetica, relative to the font
+# size
+CHARACTER_WIDTH = 0.55
+
+SHEET_COLUMNS = int(os.getenv("QR_LABEL_SHEET_COLUMNS", 3))
+SHEET_ROWS = int(os.getenv("QR_LABEL_SHEET_ROWS", 7))
+# Maximum number of labels of one document
+SHEET_MAX_LABELS = int(os.getenv("QR_LABEL_SHEET_MAX_LABELS", 10000))
+
+# Rendered QR code images by code
+label_image_cache = LRUCache(maxsize=int(os.getenv("QR_LABEL_CACHE_SIZE", 10000)))
+
+# Object numbers of the objects written at the start or the end of the document
+CATALOG = 1
+PAGES = 2
+FONT = 3
+FIRST_PAGE_OBJECT = 4
+
+
+def render_label_image(code, url=QR_CODE_URL):
+    """Returns the QR code of the code as tuple of the number of modules per side and
+    the compressed 1-bit pixel rows, where 0 is black"""
+    qr_code = qrcode.QRCode(border=2)
+    qr_code.add_data(url.format(code=code))
+    matrix = qr_code.get_matrix()
+    rows = bytearray()
+    for modules in matrix:
+        # Rows are padded to full bytes
+        bits = "".join("0" if module else "1" for module in modules)
+        bits += "0" * (-len(bits) % 8)
+        rows.extend(int(bits, 2).to_bytes(len(bits) // 8, "big"))
+    return len(matrix), zlib.compress(bytes(rows))
+
+
+def get_label_images(codes, processes=None):
+    """Returns an iterator of the images of the given codes, in order. Images that
+    are not cached are rendered in worker processes and cached."""
+    codes = list(codes)
+    cached_images = {}
+    for code in codes:
+        image = label_image_cache.get(code)
+        if image is not None:
+            cached_images[code] = image
+    rendered_images = render_in_processes(
+        render_label_image,
+        [code for code in codes if code not in cached_images],
+        QR_CODE_URL,
+        processes,
+    )
+    for code in codes:
+        image = cached_images.get(code)
+        if image is None:
+            image = next(rendered_images)
+            label_image_cache.set(code, image)
+        yield image
+
+
+def escape_text(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+class PdfWriter:
+    """Writes the objects of a PDF document and records their byte offsets for the
+    cross-reference table"""
+
+    def __init__(self):
+        self.offset = 0
+        self.object_offsets = {}
+
+    def write(self, data):
+        self.offset += len(data)
+        return data
+
+    def header(self):
+        return self.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def object(self, number, body):
+        self.object_offsets[number] = self.offset
+        return self.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+
+    def stream(self, number, data, dictionary=b""):
+        """Writes the Flate-compressed data as stream object, with the additional
+        entries of its dictionary"""
+        body = b"<< /Length %d /Filter /FlateDecode %s>>\nstream\n%s\nendstream" % (
+            len(data),
+            dictionary,
+            data,
+        )
+        return self.object(number, body)
+
+    def trailer(self):
+        """Writes the cross-reference table and the trailer"""
+        xref_offset = self.offset
+        size = max(self.object_offsets) + 1
+        lines = [b"xref\n0 %d\n" % size, b"0000000000 65535 f \n"]
+        for number in range(1, size):
+            lines.append(b"%010d 00000 n \n" % self.object_offsets[number])
+        lines.append(
+            b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+            % (size, CATALOG, xref_offset)
+        )
+        return self.write(b"".join(lines))
+
+
+def iter_label_sheets(codes, columns=None, rows=None, processes=None):
+    """Returns an iterator of the chunks of a PDF document with A4 pages of
+    `columns` x `rows` labels of the given codes. Every chunk holds one page. Raises
+    ValueError for invalid layouts, and RuntimeError if qrcode is not installed."""
+    columns = SHEET_COLUMNS if columns is None else columns
+    rows = SHEET_ROWS if rows is None else rows
+    if not (0 < columns <= 10 and 0 < rows <= 20):
+        raise ValueError("Sheets have 1 to 10 columns and 1 to 20 rows of labels")
+    if qrcode is None:
+        raise RuntimeError("Rendering QR code labels requires the qrcode package")
+    codes = list(codes)
+    return _iter_label_sheets(codes, columns, rows, processes)
+
+
+def _iter_label_sheets(codes, columns, rows, processes):
+    writer = PdfWriter()
+    yield writer.header() + writer.object(
+        FONT,
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica "
+        b"/Encoding /WinAnsiEncoding >>",
+    )
+
+    cell_width = (PAGE_WIDTH - 2 * PAGE_MARGIN) / columns
+    cell_height = (PAGE_HEIGHT - 2 * PAGE_MARGIN) / rows
+    image_size = min(cell_width, cell_height - 2 * FONT_SIZE) * 0.9
+    labels_per_page = columns * rows
+    images = get_label_images(codes, processes)
+
+    page_numbers = []
+    next_number = FIRST_PAGE_OBJECT
+    for page_start in range(0, len(codes), labels_per_page):
+        page_end = page_start + labels_per_page
+        page_codes = codes[page_start:page_end]
+        page_number, content_number = next_number, next_number + 1
+        next_number += 2
+        chunks = []
+        commands = []
+        image_resources = []
+        for index, code in enumerate(page_codes):
+            modules, pixels = next(images)
+            image_number = next_number
+            next_number += 1
+            chunks.append(
+                writer.stream(
+                    image_number,
+                    pixels,
+                    b"/Type /XObject /Subtype /Image /Width %d /Height %d "
+                    b"/ColorSpace /DeviceGray /BitsPerComponent 1 "
+                    % (modules, modules),
+                )
+            )
+            name = b"Im%d" % index
+            image_resources.append(b"/%s %d 0 R" % (name, image_number))
+
+            column, row = index % columns, index // columns
+            left = PAGE_MARGIN + column * cell_width
+            top = PAGE_HEIGHT - PAGE_MARGIN - row * cell_height
+            image_left = left + (cell_width - image_size) / 2
+            image_bottom = top - (cell_height - 2 * FONT_SIZE + image_size) / 2
+            text_left = (
+                left + (cell_width - len(code) * CHARACTER_WIDTH * FONT_SIZE) / 2
+            )
+            text_bottom = image_bottom - 1.5 * FONT_SIZE
+            commands.append(
+                b"q %.2f 0 0 %.2f %.2f %.2f cm /%s Do Q"
+                % (image_size, image_size, image_left, image_bottom, name)
+            )
+            commands.append(
+                b"BT /F1 %d Tf %.2f %.2f Td (%s) Tj ET"
+                % (
+                    FONT_SIZE,
+                    text_left,
+                    text_bottom,
+                    escape_text(code).encode("latin-1", "replace"),
+                )
+            )
+
+        chunks.append(
+            writer.stream(content_number, zlib.compress(b"\n".join(commands)))
+        )
+        chunks.append(
+            writer.object(
+                page_number,
+                b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %.2f %.2f] "
+                b"/Contents %d 0 R /Resources << /Font << /F1 %d 0 R >> "
+                b"/XObject << %s >> >> >>"
+                % (
+                    PAGES,
+                    PAGE_WIDTH,
+                    PAGE_HEIGHT,
+                    content_number,
+                    FONT,
+                    b" ".join(image_resources),
+                ),
+            )
+        )
+        page_numbers.append(page_number)
+        yield b"".join(chunks)
+
+    kids = b" ".join(b"%d 0 R" % number for number in page_numbers)
+    yield writer.object(
+        PAGES, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_numbers))
+    ) + writer.object(
+        CATALOG, b"<< /Type /Catalog /Pages %d 0 R >>" % PAGES
+    ) + writer.trailer()
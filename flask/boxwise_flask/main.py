@@ -2,7 +2,11 @@
 import os
 
 from boxwise_flask.app import create_app
-from boxwise_flask.db import db
+from boxwise_flask.db import InstrumentedPooledMySQLDatabase, PrimaryMySQLDatabase, db
+from boxwise_flask.db_routing import db_router
+from boxwise_flask.models.qr_code import QRCode
+from boxwise_flask.reference_data import reference_data
+from playhouse.db_url import parse
 
 app = create_app()
 
@@ -11,8 +15,7 @@ mysql_host = os.getenv("MYSQL_HOST", "") + (
     ":" + os.getenv("MYSQL_PORT") if os.getenv("MYSQL_PORT", False) else ""
 )
 
-# establish database connection
-app.config["DATABASE"] = "mysql://{}:{}@{}/{}{}".format(
+mysql_url = "mysql://{}:{}@{}/{}{}".format(
     os.getenv("MYSQL_USER"),
     os.getenv("MYSQL_PASSWORD"),
     mysql_host,
@@ -20,4 +23,52 @@ app.config["DATABASE"] = "mysql://{}:{}@{}/{}{}".format(
     os.getenv("MYSQL_SOCKET", ""),
 )
 
+# establish database connection. Connections are returned to a pool at the end of
+# each request, and re-used by later requests
+pool_kwargs = dict(
+    # maximum number of open connections per process
+    max_connections=int(os.getenv("MYSQL_POOL_MAX_CONNECTIONS", 8)),
+    # number of seconds after which an idle connection is closed
+    stale_timeout=int(os.getenv("MYSQL_POOL_STALE_TIMEOUT", 300)),
+    # number of seconds to wait for a free connection if all are in use
+    timeout=int(os.getenv("MYSQL_POOL_WAIT_TIMEOUT", 10)),
+)
+connect_kwargs = parse(mysql_url)
+database_name = connect_kwargs.pop("database")
+app.config["DATABASE"] = PrimaryMySQLDatabase(
+    database_name, **pool_kwargs, **connect_kwargs
+)
+
+# Optional read replicas, given as comma-separated host[:port] list. They share
+# user, password, and database name with the primary
+replicas = []
+for replica_host in filter(None, os.getenv("MYSQL_REPLICA_HOSTS", "").split(",")):
+    host, _, port = replica_host.strip().partition(":")
+    replica_kwargs = dict(connect_kwargs, host=host)
+    if port:
+        replica_kwargs["port"] = int(port)
+    replicas.append(
+        InstrumentedPooledMySQLDatabase(database_name, **pool_kwargs, **replica_kwargs)
+    )
+db_router.configure(
+    replicas,
+    # number of seconds after a mutation during which the user reads from the primary
+    read_your_writes_window=int(os.getenv("MYSQL_READ_YOUR_WRITES_WINDOW", 5)),
+)
+
 db.init_app(app)
+
+
+# Reference tables are served from memory
+app.before_first_request(reference_data.load)
+
+
+@app.before_first_request
+def warm_up_qr_code_cache():
+    # IDs of the most recently issued QR codes, i.e. of the labels most likely scanned
+    QRCode.warm_up_cache(int(os.getenv("QR_CODE_CACHE_WARM_UP", 1000)))
+
+
+@app.teardown_request
+def close_replica_connections(exc):
+    db_router.close_replicas()
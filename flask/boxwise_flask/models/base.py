@@ -76,6 +76,8 @@ class Base(db.Model):
 
     class Meta:
         table_name = "camps"
+        # Keyset of the changes of incremental sync, see graph_ql/sync.py
+        indexes = ((("modified", "id"), False),)
 
     def __str__(self):
         return (
@@ -88,13 +90,17 @@ class Base(db.Model):
             + self.currency_name
         )
 
+    # The optional query argument allows selecting a subset of columns, or fetching
+    # rows instead of model instances, see graph_ql/query_planner.py
     @staticmethod
-    def get_all_bases():
-        return list(Base.select().order_by(Base.name))
+    def get_all_bases(query=None):
+        query = Base.select() if query is None else query
+        return list(query.order_by(Base.name))
 
     @staticmethod
-    def get_for_organisation(org_id):
-        return list(Base.select().where(Base.organisation_id == org_id))
+    def get_for_organisation(org_id, query=None):
+        query = Base.select() if query is None else query
+        return list(query.where(Base.organisation_id == org_id))
 
     @staticmethod
     def get_from_id(base_id):
@@ -1,13 +1,17 @@
-import uuid
+import os
 from datetime import datetime
 
+from boxwise_flask.box_id_allocator import box_id_allocator
 from boxwise_flask.db import db
 from boxwise_flask.models.box_state import BoxState
+from boxwise_flask.models.fields import ZeroDateTimeField
 from boxwise_flask.models.location import Location
 from boxwise_flask.models.product import Product
 from boxwise_flask.models.size import Size
 from boxwise_flask.models.user import User
+from boxwise_flask.qr_code_cache import qr_code_cache
 from peewee import (
+    JOIN,
     SQL,
     CharField,
     DateTimeField,
@@ -18,6 +22,35 @@ from peewee import (
 
 from .qr_code import QRCode
 
+# Maximum number of rows per INSERT statement of `Box.create_boxes`
+BOX_INSERT_CHUNK_SIZE = int(os.getenv("BOX_INSERT_CHUNK_SIZE", 100))
+
+# SQL of `Box.get_scanned_box` by quote character and parameter placeholder of the
+# database
+_scanned_box_sql = {}
+
+
+def get_box_row(box_creation_input, box_id, qr_id, created):
+    return dict(
+        # surprisingly not primary key, unique non-sequential identifier for a box
+        box_id=box_id,
+        # will become a fancy dropdown on the FE
+        product=box_creation_input.get("product_id", None),
+        # will be tied to the product_id lookup somehow
+        size=box_creation_input.get("size_id", None),
+        items=box_creation_input.get("items", None),
+        # based on the user's allowed bases
+        location=box_creation_input.get("location_id", None),
+        comments=box_creation_input.get("comments", None),
+        qr_code=qr_id,
+        created=created,
+        # New boxes are changes for the incremental sync, see graph_ql/sync.py
+        modified=created,
+        # this is consistently NULL in the table, do we want to change that?
+        created_by=box_creation_input.get("created_by", None),
+        box_state=1,  # always 1 for create?
+    )
+
 
 class Box(db.Model):
     box_id = CharField(constraints=[SQL("DEFAULT ''")], index=True)
@@ -32,7 +65,7 @@ class Box(db.Model):
     created_by = ForeignKeyField(
         column_name="created_by", field="id", model=User, null=True
     )
-    deleted = DateTimeField(null=True, default=None)
+    deleted = ZeroDateTimeField(null=True, default=None)
     items = IntegerField()
     location = ForeignKeyField(column_name="location_id", field="id", model=Location)
     modified = DateTimeField(null=True)
@@ -53,42 +86,80 @@ class Box(db.Model):
 
     class Meta:
         table_name = "stock"
+        # Keyset of the changes of incremental sync, see graph_ql/sync.py
+        indexes = ((("modified", "id"), False),)
 
     def __unicode__(self):
         return self.box_id
 
     @staticmethod
     def create_box(box_creation_input):
-
         today = datetime.now()
         barcode = box_creation_input.get("qr_barcode", None)
         qr_id_from_table = QRCode.get_id_from_code(barcode)
-        box_uuid = uuid.uuid4()
-        box_short_uuid = str(box_uuid)[
-            :11
-        ]  # the table is truncating a full uuid to 11 chars, so do it preemptively
-
-        new_box = Box.create(
-            # surprisingly not primary key, unique non-sequential identifier for a box
-            box_id=box_short_uuid,
-            product_id=box_creation_input.get(
-                "product_id", None
-            ),  # will become a fancy dropdown on the FE
-            size_id=box_creation_input.get(
-                "size_id", None
-            ),  # will be tied to the product_id lookup somehow
-            items=box_creation_input.get("items", None),
-            location_id=box_creation_input.get(
-                "location_id", None
-            ),  # based on the user's allowed bases
-            comments=box_creation_input.get("comments", None),
-            qr_id=qr_id_from_table,
-            created=today,
-            # this is consistently NULL in the table, do we want to change that?
-            created_by=box_creation_input.get("created_by", None),
-            box_state_id=1,  # always 1 for create?
+        return Box.create(
+            **get_box_row(
+                box_creation_input,
+                box_id_allocator.allocate(),
+                qr_id_from_table,
+                today,
+            )
         )
-        return new_box
+
+    @staticmethod
+    def create_boxes(box_creation_inputs):
+        """Creates a box for each of the inputs, looking up all QR codes with one
+        query and inserting the rows in chunks within one transaction. Returns a list
+        with a dict of `box` and `error` for each input, in input order; inputs with
+        unknown or repeated QR codes are not created and carry an error message.
+        """
+        today = datetime.now()
+        qr_ids = QRCode.get_ids_from_codes(
+            box_creation_input.get("qr_barcode")
+            for box_creation_input in box_creation_inputs
+        )
+        errors = []
+        used_qr_codes = set()
+        for box_creation_input in box_creation_inputs:
+            barcode = box_creation_input.get("qr_barcode")
+            error = None
+            if barcode not in qr_ids:
+                error = "Unknown QR code"
+            elif barcode in used_qr_codes:
+                error = "QR code used more than once"
+            used_qr_codes.add(barcode)
+            errors.append(error)
+
+        new_box_ids = iter(box_id_allocator.allocate_many(errors.count(None)))
+        # For each input, the allocated box ID, or None if the input has an error
+        box_ids = [next(new_box_ids) if error is None else None for error in errors]
+        rows = [
+            get_box_row(
+                box_creation_input,
+                box_id,
+                qr_ids[box_creation_input.get("qr_barcode")],
+                today,
+            )
+            for box_creation_input, box_id in zip(box_creation_inputs, box_ids)
+            if box_id is not None
+        ]
+
+        boxes = {}
+        if rows:
+            with Box._meta.database.atomic():
+                for start in range(0, len(rows), BOX_INSERT_CHUNK_SIZE):
+                    end = start + BOX_INSERT_CHUNK_SIZE
+                    Box.insert_many(rows[start:end]).execute()
+                boxes = {
+                    box.box_id: box
+                    for box in Box.select().where(
+                        Box.box_id.in_([row["box_id"] for row in rows])
+                    )
+                }
+        return [
+            {"box": boxes.get(box_id), "error": error}
+            for box_id, error in zip(box_ids, errors)
+        ]
 
     @staticmethod
     def get_box(box_id):
@@ -97,3 +168,109 @@ class Box(db.Model):
     @staticmethod
     def get_box_from_qr(qr_id):
         return Box.get(Box.qr_id == qr_id)
+
+    @staticmethod
+    def get_boxes_from_qr_codes(codes):
+        """Returns a dict mapping each of the given QR codes to its box, or to None if
+        no box is associated with the code. Unknown codes are missing from the dict.
+
+        Boxes of codes with cached IDs are selected by QR code ID; the remaining codes
+        are looked up with a single joined query, whose result is cached. Codes cached
+        as unknown need no query at all.
+        """
+        version = qr_code_cache.version
+        ids, uncached_codes = qr_code_cache.lookup(codes)
+        boxes = dict.fromkeys(ids)
+        if ids:
+            codes_by_id = {code_id: code for code, code_id in ids.items()}
+            for box in Box.select().where(Box.qr_code.in_(list(codes_by_id))):
+                boxes[codes_by_id[box.qr_id]] = box
+        if uncached_codes:
+            query = (
+                QRCode.select(QRCode.code, QRCode.id, Box)
+                .join(Box, JOIN.LEFT_OUTER, on=(Box.qr_code == QRCode.id), attr="box")
+                .where(QRCode.code.in_(uncached_codes))
+            )
+            qr_codes = list(query)
+            qr_code_cache.add(
+                uncached_codes,
+                {qr_code.code: qr_code.id for qr_code in qr_codes},
+                version,
+            )
+            # peewee leaves out the attribute if the outer join found no box
+            boxes.update(
+                (qr_code.code, getattr(qr_code, "box", None)) for qr_code in qr_codes
+            )
+        return boxes
+
+    @staticmethod
+    def get_scanned_box(code):
+        """Returns a dict of the scalar fields of the box associated with the QR code,
+        and the ID of the box's base, or None if there is no such box. This is the
+        lookup of the box scan endpoint; it runs a single joined query whose SQL is
+        built once, and none for codes cached as unknown."""
+        version = qr_code_cache.version
+        ids, uncached_codes = qr_code_cache.lookup([code])
+        if not ids and not uncached_codes:
+            return None
+
+        fields = Box.get_scanned_box_fields()
+        database = Box._meta.database
+        key = (database.quote, database.param)
+        sql = _scanned_box_sql.get(key)
+        if sql is None:
+            query = (
+                QRCode.select(QRCode.id, *fields)
+                .join(Box, JOIN.LEFT_OUTER, on=(Box.qr_code == QRCode.id))
+                .join(Location, JOIN.LEFT_OUTER, on=(Box.location == Location.id))
+                .where(QRCode.code == code)
+            )
+            sql, _ = query.sql()
+            _scanned_box_sql[key] = sql
+
+        row = database.execute_sql(sql, (code,)).fetchone()
+        if uncached_codes:
+            qr_code_cache.add(uncached_codes, {code: row[0]} if row else {}, version)
+        # The outer join leaves the box columns empty for codes without box
+        if row is None or row[1] is None:
+            return None
+        return {
+            getattr(field, "object_id_name", field.name): field.python_value(value)
+            for field, value in zip(fields, row[1:])
+        }
+
+    @staticmethod
+    def get_scanned_box_fields():
+        return (
+            Box.id,
+            Box.box_id,
+            Box.product,
+            Box.size,
+            Box.items,
+            Box.location,
+            Box.comments,
+            Box.qr_code,
+            Box.box_state,
+            Box.created,
+            Box.modified,
+            Location.base,
+        )
+
+    @staticmethod
+    def get_box_from_qr_code(code):
+        """Returns the box associated with the QR code. Raises QRCode.DoesNotExist
+        for unknown codes, and Box.DoesNotExist if no box is associated."""
+        boxes = Box.get_boxes_from_qr_codes([code])
+        if code not in boxes:
+            raise QRCode.DoesNotExist(
+                "{} instance matching query does not exist: code {}".format(
+                    QRCode, code
+                )
+            )
+        if boxes[code] is None:
+            raise Box.DoesNotExist(
+                "{} instance matching query does not exist: QR code {}".format(
+                    Box, code
+                )
+            )
+        return boxes[code]
@@ -0,0 +1,12 @@
+from boxwise_flask.db import db
+from peewee import BigIntegerField
+
+
+class BoxIdSequence(db.Model):
+    """Single-row counter from which blocks of box IDs are reserved, see
+    box_id_allocator.py"""
+
+    next_value = BigIntegerField()
+
+    class Meta:
+        table_name = "box_id_sequence"
@@ -1,8 +1,9 @@
 from boxwise_flask.db import db
+from boxwise_flask.reference_data import ReferenceModel
 from peewee import CharField
 
 
-class BoxState(db.Model):
+class BoxState(ReferenceModel, db.Model):
     label = CharField(unique=True)
 
     class Meta:
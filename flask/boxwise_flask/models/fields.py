@@ -0,0 +1,12 @@
+from peewee import DateTimeField
+
+
+class ZeroDateTimeField(DateTimeField):
+    """DateTimeField of a column that holds the MySQL zero date instead of NULL, e.g.
+    `stock.deleted`. The zero date, which the MySQL driver returns as string, is read
+    as None."""
+
+    def python_value(self, value):
+        if isinstance(value, str) and value.startswith("0000-00-00"):
+            return None
+        return super().python_value(value)
@@ -1,8 +1,9 @@
 from boxwise_flask.db import db
+from boxwise_flask.reference_data import ReferenceModel
 from peewee import SQL, CharField, IntegerField
 
 
-class Language(db.Model):
+class Language(ReferenceModel, db.Model):
     code = CharField(null=True)
     locale = CharField(null=True)
     name = CharField(null=True)
@@ -34,3 +34,5 @@ class Location(db.Model):
 
     class Meta:
         table_name = "locations"
+        # Keyset of the changes of incremental sync, see graph_ql/sync.py
+        indexes = ((("modified", "id"), False),)
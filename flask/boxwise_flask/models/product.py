@@ -36,3 +36,5 @@ class Product(db.Model):
 
     class Meta:
         table_name = "products"
+        # Keyset of the changes of incremental sync, see graph_ql/sync.py
+        indexes = ((("modified", "id"), False),)
@@ -1,13 +1,16 @@
 from boxwise_flask.db import db
+from boxwise_flask.reference_data import ReferenceModel
 from peewee import SQL, CharField, ForeignKeyField, IntegerField
 
 
-class ProductCategory(db.Model):
+class ProductCategory(ReferenceModel, db.Model):
     label = CharField(null=True)
     parent = ForeignKeyField(
         column_name="parent_id", field="id", model="self", null=True
     )
     seq = IntegerField(constraints=[SQL("DEFAULT 0")])
 
+    reference_group_by = "parent"
+
     class Meta:
         table_name = "product_categories"
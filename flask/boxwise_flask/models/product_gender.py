@@ -1,9 +1,10 @@
 from boxwise_flask.db import db
 from boxwise_flask.models.user import User
+from boxwise_flask.reference_data import ReferenceModel
 from peewee import SQL, CharField, DateTimeField, ForeignKeyField, IntegerField
 
 
-class ProductGender(db.Model):
+class ProductGender(ReferenceModel, db.Model):
     adult = IntegerField(constraints=[SQL("DEFAULT 0")])
     baby = IntegerField(constraints=[SQL("DEFAULT 0")])
     child = IntegerField(constraints=[SQL("DEFAULT 0")])
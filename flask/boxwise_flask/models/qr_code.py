@@ -1,8 +1,25 @@
+import os
+import secrets
+from datetime import datetime
+
 from boxwise_flask.db import db
-from peewee import SQL, CharField, DateTimeField, IntegerField
+from boxwise_flask.qr_code_cache import InvalidatesQRCodeCache, qr_code_cache
+from peewee import SQL, CharField, DateTimeField, IntegerField, IntegrityError
+
+# Maximum number of codes issued by one call of `QRCode.create_codes`
+QR_CODE_MAX_COUNT = int(os.getenv("QR_CODE_MAX_COUNT", 10000))
+# Maximum number of rows per INSERT statement of `QRCode.create_codes`
+QR_CODE_INSERT_CHUNK_SIZE = int(os.getenv("QR_CODE_INSERT_CHUNK_SIZE", 1000))
+# Number of attempts of `QRCode.create_codes` to issue codes that do not exist yet
+QR_CODE_CREATE_ATTEMPTS = 3
+
+
+def generate_code():
+    """Returns a random code of 31 hexadecimal digits, like the existing codes"""
+    return secrets.token_hex(16)[:31]
 
 
-class QRCode(db.Model):
+class QRCode(InvalidatesQRCodeCache, db.Model):
     code = CharField(null=True)
     created = DateTimeField(null=True)
     legacy = IntegerField(constraints=[SQL("DEFAULT 0")])
@@ -16,4 +33,87 @@ class QRCode(db.Model):
 
     @staticmethod
     def get_id_from_code(code):
-        return QRCode.get(QRCode.code == code).id
+        ids = QRCode.get_ids_from_codes([code])
+        if code not in ids:
+            raise QRCode.DoesNotExist(
+                "{} instance matching query does not exist: code {}".format(
+                    QRCode, code
+                )
+            )
+        return ids[code]
+
+    @staticmethod
+    def get_ids_from_codes(codes):
+        """Returns a dict mapping the given codes to their IDs, served from the QR code
+        cache or else using one query. Unknown codes are missing from the dict."""
+        return qr_code_cache.get_ids(codes, QRCode.load_ids_from_codes)
+
+    @staticmethod
+    def load_ids_from_codes(codes):
+        codes = list(set(codes))
+        if not codes:
+            return {}
+        return dict(
+            QRCode.select(QRCode.code, QRCode.id).where(QRCode.code.in_(codes)).tuples()
+        )
+
+    @staticmethod
+    def get_codes_in_id_range(first_id, last_id):
+        """Returns the codes with IDs from `first_id` to `last_id`, in order of ID"""
+        query = (
+            QRCode.select(QRCode.code)
+            .where(QRCode.id.between(first_id, last_id))
+            .order_by(QRCode.id)
+            .tuples()
+        )
+        return [code for (code,) in query]
+
+    @staticmethod
+    def warm_up_cache(limit):
+        """Loads the IDs of the `limit` most recently issued codes into the QR code
+        cache, using one query"""
+        query = (
+            QRCode.select(QRCode.code, QRCode.id)
+            .order_by(QRCode.id.desc())
+            .limit(limit)
+            .tuples()
+        )
+        # The most recent codes are added last so that they are evicted last
+        qr_code_cache.set_many(reversed(list(query)))
+
+    @staticmethod
+    def create_codes(count):
+        """Issues `count` new random codes, inserting them in chunks within one
+        transaction, and returns the QRCode instances in order of issuance. The IDs
+        of the new codes are added to the QR code cache."""
+        if not 0 < count <= QR_CODE_MAX_COUNT:
+            raise ValueError(
+                "Number of QR codes must be between 1 and {}".format(QR_CODE_MAX_COUNT)
+            )
+        database = QRCode._meta.database
+        for attempt in range(QR_CODE_CREATE_ATTEMPTS):
+            codes = set()
+            while len(codes) < count:
+                codes.add(generate_code())
+            created = datetime.now()
+            rows = [{"code": code, "created": created} for code in codes]
+            qr_codes = []
+            try:
+                with database.atomic():
+                    for start in range(0, len(rows), QR_CODE_INSERT_CHUNK_SIZE):
+                        end = start + QR_CODE_INSERT_CHUNK_SIZE
+                        chunk = rows[start:end]
+                        QRCode.insert_many(chunk).execute()
+                        qr_codes.extend(
+                            QRCode.select().where(
+                                QRCode.code.in_([row["code"] for row in chunk])
+                            )
+                        )
+                break
+            except IntegrityError:
+                # One of the random codes had been issued before
+                if attempt + 1 == QR_CODE_CREATE_ATTEMPTS:
+                    raise
+        qr_codes.sort(key=lambda qr_code: qr_code.id)
+        qr_code_cache.set_many((qr_code.code, qr_code.id) for qr_code in qr_codes)
+        return qr_codes
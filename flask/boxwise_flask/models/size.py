@@ -1,10 +1,11 @@
 from boxwise_flask.db import db
 from boxwise_flask.models.size_range import SizeRange
 from boxwise_flask.models.user import User
+from boxwise_flask.reference_data import ReferenceModel
 from peewee import CharField, DateTimeField, ForeignKeyField, IntegerField
 
 
-class Size(db.Model):
+class Size(ReferenceModel, db.Model):
     created = DateTimeField(null=True)
     created_by = ForeignKeyField(
         column_name="created_by", field="id", model=User, null=True
@@ -19,6 +20,8 @@ class Size(db.Model):
         column_name="sizegroup_id", field="id", model=SizeRange, null=True
     )
 
+    reference_group_by = "size_range"
+
     class Meta:
         table_name = "sizes"
 
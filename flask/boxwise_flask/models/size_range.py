@@ -1,8 +1,9 @@
 from boxwise_flask.db import db
+from boxwise_flask.reference_data import ReferenceModel
 from peewee import CharField, IntegerField
 
 
-class SizeRange(db.Model):
+class SizeRange(ReferenceModel, db.Model):
     label = CharField(null=True)
     seq = IntegerField(null=True)
 
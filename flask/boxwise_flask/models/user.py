@@ -1,3 +1,4 @@
+from boxwise_flask.access_cache import InvalidatesAccessCache, access_cache
 from boxwise_flask.db import db
 from boxwise_flask.models.language import Language
 from boxwise_flask.models.usergroup import Usergroup
@@ -13,7 +14,7 @@ from peewee import (
 from playhouse.shortcuts import model_to_dict
 
 
-class User(db.Model):
+class User(InvalidatesAccessCache, db.Model):
     usergroup = ForeignKeyField(
         column_name="cms_usergroups_id", field="id", model=Usergroup, null=True
     )
@@ -43,9 +44,12 @@ class User(db.Model):
     def __str__(self):
         return self.name
 
+    # The optional query argument allows selecting a subset of columns, or fetching
+    # rows instead of model instances, see graph_ql/query_planner.py
     @staticmethod
-    def get_all_users():
-        return list(User.select().order_by(User.name))
+    def get_all_users(query=None):
+        query = User.select() if query is None else query
+        return list(query.order_by(User.name))
 
     @staticmethod
     def get_from_email(email):
@@ -56,18 +60,47 @@ class User(db.Model):
         )
 
 
+def load_user_access(email):
+    return (
+        User.select(User.id, User.usergroup).where(User.email == email).tuples().get()
+    )
+
+
+def load_base_ids(usergroup_id):
+    return frozenset(UsergroupBaseAccess.get_all_base_id_for_usergroup_id(usergroup_id))
+
+
+def get_user_access(email):
+    """Returns the ID and the usergroup ID of the user with given email. Served from
+    the access cache."""
+    return access_cache.get_user(email, load_user_access)
+
+
+def get_base_ids_for_usergroup(usergroup_id):
+    """Returns the frozenset of IDs of the bases that the usergroup may access. Served
+    from the access cache."""
+    if usergroup_id is None:
+        return frozenset()
+    return access_cache.get_base_ids(usergroup_id, load_base_ids)
+
+
 def get_user_from_email_with_base_ids(email):
     user = User.get_from_email(email)
     user_dict = model_to_dict(user)
     base_ids = []
     if user.usergroup:
-        base_ids = UsergroupBaseAccess.get_all_base_id_for_usergroup_id(
-            user.usergroup.id
-        )
-
-    # base_ids is a peewee ModelSelect (so, many objects).
-    # convert to dict 1 at a time,
-    # and pull the base_id from that dict, and put in a list
+        base_ids = sorted(get_base_ids_for_usergroup(user.usergroup.id))
 
     user_dict["base_ids"] = base_ids
     return user_dict
+
+
+def get_user_row_with_base_ids(email, query=None):
+    """Lightweight variant of `get_user_from_email_with_base_ids` that returns a dict
+    of the columns selected by `query` instead of building model instances of the
+    user and the related tables."""
+    query = User.select() if query is None else query
+    user = query.where(User.email == email).dicts().get()
+    _, usergroup_id = get_user_access(email)
+    user["base_ids"] = sorted(get_base_ids_for_usergroup(usergroup_id))
+    return user
@@ -1,8 +1,9 @@
+from boxwise_flask.access_cache import InvalidatesAccessCache
 from boxwise_flask.db import db
 from peewee import CompositeKey, IntegerField
 
 
-class UsergroupBaseAccess(db.Model):
+class UsergroupBaseAccess(InvalidatesAccessCache, db.Model):
     base_id = IntegerField(column_name="camp_id")
     usergroup_id = IntegerField(column_name="cms_usergroups_id")
 
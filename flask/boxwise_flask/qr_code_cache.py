@@ -0,0 +1,99 @@
+"""Process-wide cache of QR code IDs"""
+import os
+import threading
+
+from boxwise_flask.cache import InvalidatesOnWrite, LRUCache
+from boxwise_flask.db_routing import db_router
+
+
+class QRCodeCache:
+    """Caches the mapping QR code -> ID of the `qr` table.
+
+    The ID of an issued code never changes, hence known codes are kept until they
+    expire after `ttl` seconds or are evicted. Unknown codes are cached as well, so
+    that repeated scans of a wrong label do not hit the database, but only for
+    `unknown_ttl` seconds, since another process may issue the code meanwhile.
+    Within this process, every write to the `qr` table calls `invalidate()`, which
+    drops the unknown codes and bumps a version number. Lookups capture the version
+    before querying the database, so that codes found unknown by a query overlapping
+    an invalidation are not cached. Neither are codes found unknown on a replica,
+    which may lag behind the primary that issued them.
+    """
+
+    def __init__(self, maxsize=10000, ttl=3600, unknown_ttl=10):
+        self.ids = LRUCache(maxsize=maxsize, ttl=ttl)
+        self.unknown_codes = LRUCache(maxsize=maxsize, ttl=unknown_ttl)
+        self.version = 0
+        self._lock = threading.Lock()
+
+    def lookup(self, codes):
+        """Returns a dict of the cached IDs of the given codes, and a list of the codes
+        that are not cached. Codes cached as unknown are in neither."""
+        ids = {}
+        uncached_codes = []
+        for code in set(codes):
+            code_id = self.ids.get(code)
+            if code_id is not None:
+                ids[code] = code_id
+            elif self.unknown_codes.get(code) is None:
+                uncached_codes.append(code)
+        return ids, uncached_codes
+
+    def add(self, codes, ids, version):
+        """Caches the result of looking up `codes` in the database: the IDs in the
+        `ids` dict, and the remaining codes as unknown, unless the cache has been
+        invalidated since `version` was read before the lookup, or the lookup read
+        from a replica"""
+        self.set_many(ids.items())
+        if version != self.version or db_router.get_replica() is not None:
+            return
+        for code in codes:
+            if code not in ids:
+                self.unknown_codes.set(code, True)
+
+    def get_ids(self, codes, loader):
+        """Returns a dict mapping the given codes to their IDs. Codes that are not
+        cached are passed to `loader` in one call, which has to return a dict of the
+        IDs of the existing ones. Unknown codes are missing from the result."""
+        version = self.version
+        ids, uncached_codes = self.lookup(codes)
+        if uncached_codes:
+            with db_router.use_primary():
+                loaded_ids = loader(uncached_codes)
+            self.add(uncached_codes, loaded_ids, version)
+            ids.update(loaded_ids)
+        return ids
+
+    def set_many(self, ids):
+        """Caches the given pairs of code and ID"""
+        for code, code_id in ids:
+            self.ids.set(code, code_id)
+            self.unknown_codes.pop(code)
+
+    def invalidate(self):
+        with self._lock:
+            self.version += 1
+        self.unknown_codes.clear()
+
+    def clear(self):
+        self.ids.clear()
+        self.unknown_codes.clear()
+
+    def stats(self):
+        return {"ids": self.ids.stats(), "unknown_codes": self.unknown_codes.stats()}
+
+
+qr_code_cache = QRCodeCache(
+    maxsize=int(os.getenv("QR_CODE_CACHE_SIZE", 10000)),
+    ttl=int(os.getenv("QR_CODE_CACHE_TTL", 3600)),
+    unknown_ttl=int(os.getenv("QR_CODE_CACHE_UNKNOWN_TTL", 10)),
+)
+
+
+class InvalidatesQRCodeCache(InvalidatesOnWrite):
+    """Mixin for the QRCode model. Any write through the model drops the cached
+    unknown codes, since it may issue them."""
+
+    @classmethod
+    def invalidate_caches(cls):
+        qr_code_cache.invalidate()
@@ -0,0 +1,132 @@
+"""Rendering of QR code label images
+
+Each QR code encodes the URL QR_CODE_URL with the code filled in, which the box
+scanner of the front-end parses. Images are rendered as PNG or SVG by the qrcode
+package, which is optional; without it, `render_labels()` raises RuntimeError.
+Larger batches are rendered in a pool of worker processes, and returned as a zip
+archive that is written while the images are rendered.
+"""
+import io
+import multiprocessing
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import qrcode
+    from qrcode.image.pure import PyPNGImage
+    from qrcode.image.svg import SvgPathImage
+except ImportError:  # pragma: no cover
+    qrcode = None
+    PyPNGImage = SvgPathImage = None
+
+QR_CODE_URL = os.getenv(
+    "QR_CODE_URL", "https://app.boxwise.co/mobile.php?barcode={code}"
+)
+# Number of worker processes rendering label images
+RENDER_PROCESSES = int(os.getenv("QR_LABEL_RENDER_PROCESSES", os.cpu_count() or 1))
+# Smaller batches are rendered in the serving process, which is faster than
+# starting the worker processes
+PARALLEL_RENDER_MIN_COUNT = int(os.getenv("QR_LABEL_PARALLEL_RENDER_MIN_COUNT", 50))
+
+# Tuples of qrcode image factory and zip compression of the image formats. PNG
+# images are compressed already
+IMAGE_FORMATS = {
+    "png": (PyPNGImage, zipfile.ZIP_STORED),
+    "svg": (SvgPathImage, zipfile.ZIP_DEFLATED),
+}
+
+
+def render_label(code, image_format="png"):
+    """Returns the image of the QR code as bytes"""
+    image = qrcode.make(
+        QR_CODE_URL.format(code=code), image_factory=IMAGE_FORMATS[image_format][0]
+    )
+    output = io.BytesIO()
+    image.save(output)
+    return output.getvalue()
+
+
+def check_image_format(image_format):
+    """Raises ValueError for unknown formats, and RuntimeError if qrcode is not
+    installed"""
+    if image_format not in IMAGE_FORMATS:
+        raise ValueError(
+            "Unknown image format '{}'; available: {}".format(
+                image_format, ", ".join(IMAGE_FORMATS)
+            )
+        )
+    if qrcode is None:
+        raise RuntimeError("Rendering QR code labels requires the qrcode package")
+
+
+def render_labels(codes, image_format="png", processes=None):
+    """Returns an iterator of tuples of code and image bytes for the given codes, in
+    order. Raises like `check_image_format()`."""
+    check_image_format(image_format)
+    codes = list(codes)
+    return zip(codes, render_in_processes(render_label, codes, image_format, processes))
+
+
+def render_in_processes(render, codes, argument, processes=None):
+    """Returns an iterator of `render(code, argument)` for each of the given codes, in
+    order. Unless the batch is small, the results are computed in a pool of worker
+    processes."""
+    codes = list(codes)
+    processes = RENDER_PROCESSES if processes is None else processes
+    if processes <= 1 or len(codes) < PARALLEL_RENDER_MIN_COUNT:
+        return (render(code, argument) for code in codes)
+    return _render_in_pool(render, codes, argument, processes)
+
+
+def _render_in_pool(render, codes, argument, processes):
+    # Workers are spawned rather than forked, so that they do not inherit the
+    # database connections and locks of the serving process
+    with ProcessPoolExecutor(
+        processes, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        yield from executor.map(
+            render,
+            codes,
+            [argument] * len(codes),
+            chunksize=max(1, len(codes) // (4 * processes)),
+        )
+
+
+class _ZipOutput(io.RawIOBase):
+    """Write-only stream that collects the bytes written by ZipFile until they are
+    taken by `pop()`"""
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._buffer.extend(data)
+        return len(data)
+
+    def pop(self):
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+def iter_label_zip(codes, image_format="png", processes=None):
+    """Returns an iterator of the chunks of a zip archive holding the label image
+    `<code>.<format>` of each of the given codes. Every chunk holds one image, so
+    that the archive can be streamed while the remaining images are rendered. Raises
+    like `check_image_format()`."""
+    labels = render_labels(codes, image_format, processes)
+    return _iter_zip(labels, image_format)
+
+
+def _iter_zip(labels, image_format):
+    compression = IMAGE_FORMATS[image_format][1]
+    output = _ZipOutput()
+    with zipfile.ZipFile(output, "w", compression=compression) as archive:
+        for code, image in labels:
+            archive.writestr("{}.{}".format(code, image_format), image)
+            yield output.pop()
+    yield output.pop()
@@ -0,0 +1,136 @@
+"""In-memory registry of small reference tables, e.g. box states and sizes
+
+The tables are read completely and served from dicts: by primary key, and grouped by
+a foreign key where the model defines `reference_group_by` (e.g. sizes by size
+range). Each table is reloaded on access once it is older than `ttl` seconds, which
+bounds how long changes written by other processes stay invisible. Within this
+process, every write through a reference model invalidates its table. A lookup for
+an unknown key (e.g. a row that was just added by another process) reloads the
+table, at most once every `min_refresh_interval` seconds.
+"""
+import os
+import threading
+import time
+
+from boxwise_flask.cache import InvalidatesOnWrite
+from boxwise_flask.db_routing import db_router
+
+
+class ReferenceTable:
+    def __init__(self, model, instances, version, loaded_at):
+        self.version = version
+        self.loaded_at = loaded_at
+        self.by_id = {instance.get_id(): instance for instance in instances}
+        self.groups = {}
+        if model.reference_group_by is not None:
+            attribute = model._meta.fields[model.reference_group_by].object_id_name
+            for instance in instances:
+                self.groups.setdefault(getattr(instance, attribute), []).append(
+                    instance
+                )
+
+
+class ReferenceDataRegistry:
+    def __init__(self, ttl=300, min_refresh_interval=10, timer=time.monotonic):
+        self.ttl = ttl
+        self.min_refresh_interval = min_refresh_interval
+        self.timer = timer
+        self.models = []
+        self.loads = 0
+        self._tables = {}
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def register(self, model):
+        self.models.append(model)
+
+    def load(self):
+        """Loads all registered tables, e.g. at startup"""
+        for model in self.models:
+            self._load_table(model)
+
+    def get(self, model, key):
+        """Returns the instance of `model` with the given primary key, or None"""
+        if key is None:
+            return None
+        table = self._get_table(model)
+        instance = table.by_id.get(key)
+        if instance is None and self.timer() - table.loaded_at > (
+            self.min_refresh_interval
+        ):
+            instance = self._load_table(model).by_id.get(key)
+        return instance
+
+    def get_all(self, model):
+        return list(self._get_table(model).by_id.values())
+
+    def get_group(self, model, key):
+        """Returns the instances of `model` whose `reference_group_by` foreign key
+        equals `key`, e.g. the sizes of a size range."""
+        return list(self._get_table(model).groups.get(key, ()))
+
+    def invalidate(self, model):
+        with self._lock:
+            self._versions[model] = self._versions.get(model, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._tables = {}
+            self.loads = 0
+
+    def stats(self):
+        now = self.timer()
+        return {
+            "loads": self.loads,
+            "tables": {
+                model._meta.table_name: {
+                    "rows": len(table.by_id),
+                    "age_seconds": now - table.loaded_at,
+                }
+                for model, table in self._tables.items()
+            },
+        }
+
+    def _get_table(self, model):
+        table = self._tables.get(model)
+        if (
+            table is None
+            or table.version != self._versions.get(model, 0)
+            or self.timer() - table.loaded_at > self.ttl
+        ):
+            table = self._load_table(model)
+        return table
+
+    def _load_table(self, model):
+        # Capture the version before loading so that an invalidation happening
+        # meanwhile marks the loaded table as outdated
+        version = self._versions.get(model, 0)
+        with db_router.use_primary():
+            instances = list(model.select().order_by(model._meta.primary_key))
+        table = ReferenceTable(model, instances, version, self.timer())
+        with self._lock:
+            self._tables[model] = table
+            self.loads += 1
+        return table
+
+
+reference_data = ReferenceDataRegistry(
+    ttl=int(os.getenv("REFERENCE_DATA_TTL", 300)),
+    min_refresh_interval=int(os.getenv("REFERENCE_DATA_MIN_REFRESH_INTERVAL", 10)),
+)
+
+
+class ReferenceModel(InvalidatesOnWrite):
+    """Mixin for models of reference tables. The model is registered with the
+    registry, and any write through the model invalidates its table."""
+
+    # Name of the foreign key field by which instances are grouped, if any
+    reference_group_by = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        reference_data.register(cls)
+
+    @classmethod
+    def invalidate_caches(cls):
+        reference_data.invalidate(cls)
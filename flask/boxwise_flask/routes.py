@@ -1,17 +1,47 @@
 """Construction of routes for flask app"""
+import json
 import os
 
-from ariadne import graphql_sync
 from ariadne.constants import PLAYGROUND_HTML
-from boxwise_flask.auth_helper import AuthError, requires_auth
+from boxwise_flask.access_cache import access_cache
+from boxwise_flask.auth_helper import (
+    AuthError,
+    get_current_identity,
+    get_identity_from_request_context,
+    requires_auth,
+    user_can_access_base,
+    verified_token_cache,
+)
+from boxwise_flask.compression import compress_response, compression_stats
+from boxwise_flask.db import get_pool_stats
+from boxwise_flask.graph_ql.execution import document_cache, execute_graphql
+from boxwise_flask.graph_ql.persisted_queries import persisted_query_store
 from boxwise_flask.graph_ql.resolvers import schema
+from boxwise_flask.json_serializer import json_response
+from boxwise_flask.label_sheets import (
+    SHEET_MAX_LABELS,
+    iter_label_sheets,
+    label_image_cache,
+)
+from boxwise_flask.models.box import Box
+from boxwise_flask.models.qr_code import QRCode
+from boxwise_flask.qr_code_cache import qr_code_cache
+from boxwise_flask.qr_labels import check_image_format, iter_label_zip
+from boxwise_flask.reference_data import reference_data
 from flask_cors import cross_origin
+from werkzeug.exceptions import BadRequest, NotFound
 
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, abort, jsonify, request
 
 # Blueprint for API
 api_bp = Blueprint("api_bp", __name__, url_prefix=os.getenv("FLASK_URL_PREFIX", ""),)
 
+# Responses are compressed if the client accepts it, see compression.py
+api_bp.after_request(compress_response)
+
+# Number of seconds for which browsers may re-use responses to GET operations
+GRAPHQL_GET_MAX_AGE = int(os.getenv("GRAPHQL_GET_MAX_AGE", 60))
+
 
 @api_bp.errorhandler(AuthError)
 def handle_auth_error(ex):
@@ -41,8 +71,131 @@ def private():
     return jsonify(message=response)
 
 
+# Metrics of the worker process serving the request
+@api_bp.route("/api/metrics", methods=["GET"])
+@cross_origin(origin="localhost", headers=["Content-Type", "Authorization"])
+@requires_auth
+def metrics():
+    return jsonify(
+        database_pool=get_pool_stats(),
+        compression=compression_stats.stats(),
+        caches={
+            "verified_tokens": verified_token_cache.stats(),
+            "access": access_cache.stats(),
+            "graphql_documents": document_cache.stats(),
+            "persisted_queries": persisted_query_store.stats(),
+            "reference_data": reference_data.stats(),
+            "qr_codes": qr_code_cache.stats(),
+            "qr_label_images": label_image_cache.stats(),
+        },
+    )
+
+
+# Issues new QR codes and returns their label images as zip archive, which is
+# streamed while the images are rendered
+@api_bp.route("/api/qr-codes", methods=["POST"])
+@cross_origin(origin="localhost", headers=["Content-Type", "Authorization"])
+@requires_auth
+def generate_qr_codes():
+    data = request.get_json(silent=True) or {}
+    count = data.get("count")
+    image_format = data.get("format", "png")
+    if not isinstance(count, int):
+        raise BadRequest("Parameter 'count' must be an integer")
+    try:
+        check_image_format(image_format)
+        qr_codes = QRCode.create_codes(count)
+    except ValueError as e:
+        raise BadRequest(str(e))
+    except RuntimeError as e:
+        abort(501, description=str(e))
+
+    return Response(
+        iter_label_zip([qr_code.code for qr_code in qr_codes], image_format),
+        mimetype="application/zip",
+        headers={"Content-Disposition": "attachment; filename=qr-codes.zip"},
+    )
+
+
+# Fast path of box scans: the box of the QR code as compact JSON, without GraphQL
+# processing. Clients revalidate with If-None-Match; the ETag changes whenever the box
+# is modified
+@api_bp.route("/api/boxes/by-qr/<code>", methods=["GET"])
+@cross_origin(origin="localhost", headers=["Content-Type", "Authorization"])
+@requires_auth
+def box_by_qr_code(code):
+    # Boxes of bases that the user may not access are reported like unknown codes, so
+    # that the response does not reveal which codes belong to a box
+    requesting_user = {"base_ids": get_current_identity().base_ids}
+    box = Box.get_scanned_box(code)
+    if box is None or not user_can_access_base(requesting_user, box.pop("base_id")):
+        raise NotFound("No box is associated with QR code {}".format(code))
+
+    version = box["modified"] or box["created"]
+    etag = "{}-{}".format(box["id"], version.timestamp() if version else 0)
+    if etag in request.if_none_match:
+        response = Response(status=304)
+    else:
+        response = json_response(box)
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "private, no-cache"
+    response.vary.add("Authorization")
+    return response
+
+
+# Printable A4 sheets of the labels of either the given codes, or the codes with IDs
+# in the given range. The PDF is streamed page by page
+@api_bp.route("/api/qr-codes/label-sheets", methods=["POST"])
+@cross_origin(origin="localhost", headers=["Content-Type", "Authorization"])
+@requires_auth
+def qr_code_label_sheets():
+    data = request.get_json(silent=True) or {}
+    if "codes" in data:
+        codes = data["codes"]
+        if not isinstance(codes, list) or not all(
+            isinstance(code, str) for code in codes
+        ):
+            raise BadRequest("Parameter 'codes' must be a list of strings")
+        label_count = len(codes)
+    elif isinstance(data.get("from_id"), int) and isinstance(data.get("to_id"), int):
+        label_count = data["to_id"] - data["from_id"] + 1
+    else:
+        raise BadRequest("Either 'codes' or integers 'from_id' and 'to_id' required")
+    # Checked before querying, so that requests for too many labels load no rows
+    if not 0 < label_count <= SHEET_MAX_LABELS:
+        raise BadRequest(
+            "Number of labels must be between 1 and {}".format(SHEET_MAX_LABELS)
+        )
+
+    if "codes" in data:
+        unknown_codes = set(codes) - set(QRCode.get_ids_from_codes(codes))
+        if unknown_codes:
+            raise BadRequest("Unknown QR codes: {}".format(", ".join(unknown_codes)))
+    else:
+        codes = QRCode.get_codes_in_id_range(data["from_id"], data["to_id"])
+        if not codes:
+            raise BadRequest("No QR codes with IDs in the given range")
+
+    try:
+        sheets = iter_label_sheets(codes, data.get("columns"), data.get("rows"))
+    except (TypeError, ValueError) as e:
+        raise BadRequest(str(e))
+    except RuntimeError as e:
+        abort(501, description=str(e))
+    return Response(
+        sheets,
+        mimetype="application/pdf",
+        headers={"Content-Disposition": "attachment; filename=qr-labels.pdf"},
+    )
+
+
 @api_bp.route("/graphql", methods=["GET"])
+@cross_origin(origin="localhost", headers=["Content-Type", "Authorization"])
 def graphql_playgroud():
+    # GET requests with operation parameters are executed, e.g. persisted queries
+    if request.args:
+        return graphql_get_server()
+
     # On GET request serve GraphQL Playground
     # You don't need to provide Playground if you don't want to
     # but keep on mind this will not prohibit clients from
@@ -50,20 +203,74 @@ def graphql_playgroud():
     return PLAYGROUND_HTML, 200
 
 
+def get_user_key():
+    """Returns the key identifying the requesting user for read-your-writes routing"""
+    identity = get_identity_from_request_context()
+    return identity.email if identity is not None else None
+
+
+def parse_json_argument(name):
+    value = request.args.get(name)
+    if value is None:
+        return None
+    try:
+        return json.loads(value)
+    except ValueError:
+        raise BadRequest("Parameter '{}' must be JSON-encoded".format(name))
+
+
+@requires_auth
+def graphql_get_server():
+    # Only query operations are executed; their responses may be cached by the
+    # browser. The response depends on the user's token, hence it must not be stored
+    # in shared caches
+    data = {
+        "query": request.args.get("query"),
+        "variables": parse_json_argument("variables"),
+        "operationName": request.args.get("operationName"),
+        "extensions": parse_json_argument("extensions"),
+    }
+
+    debug_graphql = bool(os.getenv("DEBUG_GRAPHQL", False))
+    success, result = execute_graphql(
+        schema,
+        data,
+        context_value=request,
+        debug=debug_graphql,
+        read_only=True,
+        user_key=get_user_key(),
+    )
+
+    if not success:
+        return json_response(result, status=400)
+
+    response = json_response(result)
+
+    response.headers["Cache-Control"] = "private, max-age={}".format(
+        GRAPHQL_GET_MAX_AGE
+    )
+    response.vary.add("Authorization")
+    response.add_etag()
+    return response.make_conditional(request)
+
+
 @api_bp.route("/graphql", methods=["POST"])
 @cross_origin(origin="localhost", headers=["Content-Type", "Authorization"])
 @requires_auth
 def graphql_server():
-    # GraphQL queries are always sent as POST
+    # GraphQL mutations are always sent as POST
     data = request.get_json()
 
     # Note: Passing the request to the context is optional.
     # In Flask, the current request is always accessible as flask.request
 
     debug_graphql = bool(os.getenv("DEBUG_GRAPHQL", False))
-    success, result = graphql_sync(
-        schema, data, context_value=request, debug=debug_graphql
+    success, result = execute_graphql(
+        schema,
+        data,
+        context_value=request,
+        debug=debug_graphql,
+        user_key=get_user_key(),
     )
 
-    status_code = 200 if success else 400
-    return jsonify(result), status_code
+    return json_response(result, status=200 if success else 400)
@@ -0,0 +1,115 @@
+"""Recording of the SQL statements executed while serving a request
+
+Statements are recorded by the StatementRecordingMixin of the database while a
+`record_statements()` block is active in the current thread. The report of a
+recording contains the number of statements, the total time spent executing them,
+the slowest statements, and the parameterized statements that were executed more
+often than REPEATED_STATEMENT_THRESHOLD, which usually indicates an N+1 pattern,
+i.e. a query that is run once per item of a list instead of once for all items.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+SLOWEST_STATEMENTS_LIMIT = int(os.getenv("SQL_SLOWEST_STATEMENTS_LIMIT", 5))
+REPEATED_STATEMENT_THRESHOLD = int(os.getenv("SQL_REPEATED_STATEMENT_THRESHOLD", 10))
+
+_state = threading.local()
+
+
+class StatementRecording:
+    def __init__(self):
+        # List of tuples of parameterized SQL and execution time in seconds
+        self.statements = []
+
+    def add(self, sql, seconds):
+        self.statements.append((sql, seconds))
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    @property
+    def total_seconds(self):
+        return sum(seconds for _, seconds in self.statements)
+
+    def slowest(self, limit=None):
+        if limit is None:
+            limit = SLOWEST_STATEMENTS_LIMIT
+        return sorted(self.statements, key=lambda s: s[1], reverse=True)[:limit]
+
+    def repeated(self, threshold=None):
+        """Returns a list of tuples of SQL and count of the statements executed more
+        than `threshold` times, most frequent first."""
+        if threshold is None:
+            threshold = REPEATED_STATEMENT_THRESHOLD
+        counts = Counter(sql for sql, _ in self.statements)
+        return [
+            (sql, count) for sql, count in counts.most_common() if count > threshold
+        ]
+
+    def report(self):
+        return {
+            "count": self.count,
+            "totalMs": to_milliseconds(self.total_seconds),
+            "slowest": [
+                {"sql": sql, "ms": to_milliseconds(seconds)}
+                for sql, seconds in self.slowest()
+            ],
+            "repeated": [
+                {"sql": sql, "count": count} for sql, count in self.repeated()
+            ],
+        }
+
+
+def to_milliseconds(seconds):
+    return round(seconds * 1000, 3)
+
+
+@contextmanager
+def record_statements():
+    """Context manager that records the statements executed in the current thread"""
+    recording = StatementRecording()
+    previous = getattr(_state, "recording", None)
+    _state.recording = recording
+    try:
+        yield recording
+    finally:
+        _state.recording = previous
+
+
+def report_statements(recording, result, *, debug=False, operation_name=None):
+    """Adds the report of the recording to the extensions of the GraphQL result in
+    debug mode, and logs it otherwise. Repeated statements are logged as warning."""
+    report = recording.report()
+    if debug:
+        result.setdefault("extensions", {})["sql"] = report
+        return
+
+    level = logging.WARNING if report["repeated"] else logging.INFO
+    logger.log(
+        level,
+        json.dumps({"event": "sql_statements", "operation": operation_name, **report}),
+    )
+
+
+class StatementRecordingMixin:
+    """Mixin for peewee databases that records the executed statements in the active
+    recording of the current thread."""
+
+    def execute_sql(self, sql, *args, **kwargs):
+        recording = getattr(_state, "recording", None)
+        if recording is None:
+            return super().execute_sql(sql, *args, **kwargs)
+
+        start = time.perf_counter()
+        try:
+            return super().execute_sql(sql, *args, **kwargs)
+        finally:
+            recording.add(sql, time.perf_counter() - start)
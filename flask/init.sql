@@ -147,6 +147,30 @@ LOCK TABLES `borrow_transactions` WRITE;
 /*!40000 ALTER TABLE `borrow_transactions` ENABLE KEYS */;
 UNLOCK TABLES;
 
+--
+-- Table structure for table `box_id_sequence`
+--
+
+DROP TABLE IF EXISTS `box_id_sequence`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!40101 SET character_set_client = utf8 */;
+CREATE TABLE `box_id_sequence` (
+  `id` int(11) unsigned NOT NULL AUTO_INCREMENT,
+  `next_value` bigint(20) NOT NULL,
+  PRIMARY KEY (`id`)
+) ENGINE=InnoDB AUTO_INCREMENT=2 DEFAULT CHARSET=utf8;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
+--
+-- Dumping data for table `box_id_sequence`
+--
+
+LOCK TABLES `box_id_sequence` WRITE;
+/*!40000 ALTER TABLE `box_id_sequence` DISABLE KEYS */;
+INSERT INTO `box_id_sequence` (`id`, `next_value`) VALUES (1,1);
+/*!40000 ALTER TABLE `box_id_sequence` ENABLE KEYS */;
+UNLOCK TABLES;
+
 --
 -- Table structure for table `box_state`
 --
@@ -220,6 +244,7 @@ CREATE TABLE `camps` (
   `food` tinyint(4) NOT NULL DEFAULT '0',
   `resettokens` tinyint(1) DEFAULT '0',
   PRIMARY KEY (`id`),
+  KEY `modified_id` (`modified`,`id`),
   KEY `organisation_id` (`organisation_id`),
   KEY `modified_by` (`modified_by`),
   KEY `created_by` (`created_by`),
@@ -940,6 +965,7 @@ CREATE TABLE `locations` (
   `is_scrap` tinyint(1) NOT NULL DEFAULT '0',
   `box_state_id` int(11) DEFAULT '1',
   PRIMARY KEY (`id`),
+  KEY `modified_id` (`modified`,`id`),
   KEY `camp_id` (`camp_id`),
   KEY `modified_by` (`modified_by`),
   KEY `created_by` (`created_by`),
@@ -1195,6 +1221,7 @@ CREATE TABLE `products` (
   `comments` varchar(255) DEFAULT NULL,
   `deleted` datetime DEFAULT NULL,
   PRIMARY KEY (`id`),
+  KEY `modified_id` (`modified`,`id`),
   KEY `category_id` (`category_id`),
   KEY `gender_id` (`gender_id`),
   KEY `sizegroup_id` (`sizegroup_id`),
@@ -1339,6 +1366,7 @@ CREATE TABLE `stock` (
   `deleted` datetime NOT NULL DEFAULT '0000-00-00 00:00:00',
   `box_state_id` int(11) NOT NULL DEFAULT '1',
   PRIMARY KEY (`id`),
+  KEY `modified_id` (`modified`,`id`),
   UNIQUE KEY `box_id_unique` (`box_id`),
   KEY `box_id` (`box_id`),
   KEY `location_id` (`location_id`),
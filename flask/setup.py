@@ -12,6 +12,6 @@ setup(
     author="boxwise.co",
     author_email="hello@boxwise.co",
     license="Apache 2.0",
-    packages=find_packages(exclude=["test"]),
+    packages=find_packages(exclude=["test", "benchmarks"]),
     install_requires=REQUIREMENTS,
 )
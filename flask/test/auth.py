@@ -1,6 +1,13 @@
 import os
+import time
 
 import requests
+import rsa
+from jose import jwk, jwt
+
+TEST_KEY_ID = "test-key"
+TEST_AUDIENCE = "boxtribute-test-api"
+TEST_DOMAIN = "boxtribute-test.auth0.com"
 
 
 def memoize(function):
@@ -62,3 +69,46 @@ def get_user_token_header():
 @memoize
 def get_user_token_string():
     return "Bearer " + get_user_token()
+
+
+@memoize
+def get_test_key_pair():
+    """Generates an RSA key pair for signing tokens without Auth0. The key size is
+    small to keep the test suite fast."""
+    return rsa.newkeys(1024)
+
+
+def get_test_jwks():
+    """Returns the public test key in the JWKS format published by Auth0"""
+    public_key, _ = get_test_key_pair()
+    key = jwk.construct(public_key.save_pkcs1().decode(), "RS256").to_dict()
+    return {
+        "keys": [
+            {
+                "kty": key["kty"],
+                "kid": TEST_KEY_ID,
+                "use": "sig",
+                "n": key["n"].decode(),
+                "e": key["e"].decode(),
+            }
+        ]
+    }
+
+
+def create_test_token(claims=None, expires_in=3600):
+    """Creates an access token signed with the test key"""
+    _, private_key = get_test_key_pair()
+    payload = {
+        "sub": "auth0|1",
+        "aud": TEST_AUDIENCE,
+        "iss": "https://" + TEST_DOMAIN + "/",
+        "exp": int(time.time()) + expires_in,
+        "https://www.boxtribute.com/email": "a@b.com",
+    }
+    payload.update(claims or {})
+    return jwt.encode(
+        payload,
+        private_key.save_pkcs1().decode(),
+        algorithm="RS256",
+        headers={"kid": TEST_KEY_ID},
+    )
@@ -10,6 +10,11 @@ https://docs.pytest.org/en/stable/fixture.html#pytest-fixtures-explicit-modular-
 """
 
 import pytest
+from auth import TEST_AUDIENCE, TEST_DOMAIN, get_test_jwks
+from boxwise_flask import auth_helper
+from boxwise_flask.access_cache import access_cache
+from boxwise_flask.cache import CacheInvalidationMixin
+from boxwise_flask.jwks_store import jwks_store
 from boxwise_flask.models.base import Base
 from boxwise_flask.models.base_module import BaseModule
 from boxwise_flask.models.box import Box
@@ -69,12 +74,31 @@ MODELS = (
 )
 
 
+class CacheInvalidatingSqliteDatabase(CacheInvalidationMixin, SqliteDatabase):
+    pass
+
+
 @pytest.fixture(autouse=True)
 def setup_db_before_test():
     """Sets up database automatically before each test"""
-    _db = SqliteDatabase(":memory:")
+    access_cache.clear()
+    _db = CacheInvalidatingSqliteDatabase(":memory:")
     with _db.bind_ctx(MODELS):
         _db.create_tables(MODELS)
         setup_tables()
         yield _db
         _db.drop_tables(MODELS)
+
+
+@pytest.fixture()
+def test_auth0_config(monkeypatch):
+    """Configures the auth helpers to verify tokens signed with the local test key
+    instead of Auth0, and provides that key"""
+    monkeypatch.setattr(auth_helper, "API_AUDIENCE", TEST_AUDIENCE)
+    monkeypatch.setattr(auth_helper, "AUTH0_DOMAIN", TEST_DOMAIN)
+    monkeypatch.setattr(jwks_store, "_loader", lambda url: get_test_jwks())
+    jwks_store.clear()
+    auth_helper.verified_token_cache.clear()
+    yield get_test_jwks()["keys"][0]
+    jwks_store.clear()
+    auth_helper.verified_token_cache.clear()
@@ -0,0 +1,65 @@
+import pytest
+from auth import create_test_token
+from boxwise_flask import auth_helper
+from boxwise_flask.app import create_app
+from boxwise_flask.auth_helper import (
+    AuthError,
+    Identity,
+    authenticate,
+    authorization_test,
+)
+
+from flask import _request_ctx_stack
+
+
+@pytest.fixture()
+def request_with_token(test_auth0_config, mocker):
+    token = create_test_token()
+    mocker.patch(
+        "boxwise_flask.auth_helper.get_auth_string_from_header",
+        return_value="Bearer " + token,
+    )
+    with create_app().test_request_context():
+        yield token
+
+
+def test_authenticate_returns_identity(request_with_token):
+    identity = authenticate()
+    assert identity.email == "a@b.com"
+    assert identity.payload["sub"] == "auth0|1"
+
+
+def test_identity_loads_user_access_once(mocker):
+    get_user_access = mocker.patch(
+        "boxwise_flask.auth_helper.get_user_access", return_value=(1, 5)
+    )
+    mocker.patch(
+        "boxwise_flask.auth_helper.get_base_ids_for_usergroup",
+        return_value=frozenset([1, 2]),
+    )
+    identity = Identity({"https://www.boxtribute.com/email": "a@b.com"})
+
+    assert identity.base_ids == {1, 2}
+    assert identity.user_id == 1
+    get_user_access.assert_called_once_with("a@b.com")
+
+
+def test_authorization_test_reads_identity_from_request_context(
+    request_with_token, mocker
+):
+    identity = authenticate()
+    _request_ctx_stack.top.identity = identity
+    get_user_access = mocker.patch(
+        "boxwise_flask.auth_helper.get_user_access", return_value=(1, 5)
+    )
+    mocker.patch(
+        "boxwise_flask.auth_helper.get_base_ids_for_usergroup",
+        return_value=frozenset([1]),
+    )
+    get_rsa_key = mocker.spy(auth_helper, "get_rsa_key")
+
+    assert authorization_test("bases", base_id=1)
+    with pytest.raises(AuthError):
+        authorization_test("bases", base_id=2)
+    assert get_user_access.call_count == 1
+    assert get_rsa_key.call_count == 0
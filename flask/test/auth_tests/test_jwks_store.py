@@ -0,0 +1,82 @@
+import json
+
+import pytest
+from boxwise_flask.jwks_store import JwksStore
+
+
+def jwks_data(*kids):
+    return {
+        "keys": [
+            {"kty": "RSA", "kid": kid, "use": "sig", "n": "n-" + kid, "e": "AQAB"}
+            for kid in kids
+        ]
+    }
+
+
+class CountingLoader:
+    """Fake key set source that counts how often it is fetched"""
+
+    def __init__(self, *kids):
+        self.jwks = jwks_data(*kids)
+        self.calls = 0
+
+    def __call__(self, url):
+        self.calls += 1
+        return self.jwks
+
+
+def test_load_from_file(tmp_path):
+    jwks_file = tmp_path / "jwks.json"
+    jwks_file.write_text(json.dumps(jwks_data("a")))
+
+    assert JwksStore(url=str(jwks_file)).get_key("a")["n"] == "n-a"
+    assert JwksStore(url=jwks_file.as_uri()).get_key("a")["n"] == "n-a"
+
+
+def test_keys_are_fetched_once():
+    loader = CountingLoader("a", "b")
+    store = JwksStore(url="test", loader=loader)
+
+    assert store.get_key("a")["kid"] == "a"
+    assert store.get_key("b")["kid"] == "b"
+    assert loader.calls == 1
+
+
+def test_unknown_kid_refetch_is_rate_limited():
+    loader = CountingLoader("a")
+    store = JwksStore(url="test", min_refresh_interval=3600, loader=loader)
+
+    assert store.get_key("rotated") is None
+    assert store.get_key("rotated") is None
+    assert loader.calls == 1
+
+
+def test_unknown_kid_triggers_refetch():
+    loader = CountingLoader("a")
+    store = JwksStore(url="test", min_refresh_interval=0, loader=loader)
+    store.get_key("a")
+
+    loader.jwks = jwks_data("a", "rotated")
+    assert store.get_key("rotated")["kid"] == "rotated"
+    assert loader.calls == 2
+
+
+def test_stale_keys_are_kept_if_refresh_fails():
+    loader = CountingLoader("a")
+    store = JwksStore(url="test", ttl=0, min_refresh_interval=0, loader=loader)
+    store.get_key("a")
+
+    def failing_loader(url):
+        raise OSError("Auth0 is down")
+
+    store._loader = failing_loader
+    assert store.refresh()["a"]["kid"] == "a"
+    assert store.get_key("a")["kid"] == "a"
+
+
+def test_initial_load_failure_is_raised():
+    def failing_loader(url):
+        raise OSError("Auth0 is down")
+
+    with pytest.raises(OSError):
+        JwksStore(url="test", loader=failing_loader).get_key("a")
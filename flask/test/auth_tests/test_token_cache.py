@@ -0,0 +1,57 @@
+import pytest
+from auth import create_test_token
+from boxwise_flask import auth_helper
+from boxwise_flask.auth_helper import AuthError, decode_jwt, verified_token_cache
+from boxwise_flask.cache import LRUCache
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert "b" not in cache
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_lru_cache_expires_entries():
+    now = [100]
+    cache = LRUCache(maxsize=2, ttl=10, timer=lambda: now[0])
+    cache.set("a", 1)
+    cache.set("b", 2, expires_at=200)
+
+    now[0] = 110
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    stats = cache.stats()
+    assert stats["expirations"] == 1
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_verified_token_is_cached(test_auth0_config, mocker):
+    token = create_test_token()
+    verify = mocker.spy(auth_helper, "verify_jwt")
+
+    payload = decode_jwt(token, test_auth0_config)
+    assert decode_jwt(token, test_auth0_config) == payload
+    assert verify.call_count == 1
+    assert verified_token_cache.stats()["hits"] == 1
+
+
+def test_expired_token_is_not_served_from_cache(test_auth0_config):
+    token = create_test_token(expires_in=-10)
+    with pytest.raises(AuthError):
+        decode_jwt(token, test_auth0_config)
+    assert len(verified_token_cache) == 0
+
+
+def test_token_with_wrong_audience_is_rejected(test_auth0_config):
+    token = create_test_token({"aud": "another-api"})
+    with pytest.raises(AuthError):
+        decode_jwt(token, test_auth0_config)
+    assert len(verified_token_cache) == 0
@@ -13,11 +13,16 @@ import os
 import tempfile
 
 import pytest
+from boxwise_flask.access_cache import access_cache
 from boxwise_flask.app import create_app
+from boxwise_flask.box_id_allocator import box_id_allocator
+from boxwise_flask.cache import CacheInvalidationMixin
 from boxwise_flask.db import db
+from boxwise_flask.label_sheets import label_image_cache
 from boxwise_flask.models.base import Base
 from boxwise_flask.models.base_module import BaseModule
 from boxwise_flask.models.box import Box
+from boxwise_flask.models.box_id_sequence import BoxIdSequence
 from boxwise_flask.models.box_state import BoxState
 from boxwise_flask.models.language import Language
 from boxwise_flask.models.location import Location
@@ -32,6 +37,9 @@ from boxwise_flask.models.user import User
 from boxwise_flask.models.usergroup import Usergroup
 from boxwise_flask.models.usergroup_access_level import UsergroupAccessLevel
 from boxwise_flask.models.usergroup_base_access import UsergroupBaseAccess
+from boxwise_flask.qr_code_cache import qr_code_cache
+from boxwise_flask.reference_data import reference_data
+from boxwise_flask.sql_instrumentation import StatementRecordingMixin
 
 # Imports fixtures into tests
 from data.base import default_base  # noqa: F401
@@ -53,6 +61,7 @@ from data.usergroup import default_usergroup  # noqa: F401
 from data.usergroup_access_level import default_usergroup_access_level  # noqa: F401
 from data.usergroup_base_access import default_usergroup_base_access_list  # noqa: F401
 from patches import authorization_test_patch, requires_auth_patch
+from peewee import SqliteDatabase
 
 requires_auth_patch.start()
 authorization_test_patch.start()
@@ -62,6 +71,7 @@ MODELS = (
     Base,
     BaseModule,
     Box,
+    BoxIdSequence,
     BoxState,
     Language,
     Location,
@@ -79,24 +89,33 @@ MODELS = (
 )
 
 
+class InstrumentedSqliteDatabase(
+    StatementRecordingMixin, CacheInvalidationMixin, SqliteDatabase
+):
+    pass
+
+
 @pytest.fixture()
 def app():
     """Fixture providing a baseline for unit tests that rely on database operations via
     the Flask app. Adapted from
     https://flask.palletsprojects.com/en/1.1.x/testing/#the-testing-skeleton."""
     app = create_app()
+    access_cache.clear()
+    box_id_allocator.clear()
+    qr_code_cache.clear()
+    label_image_cache.clear()
+    reference_data.clear()
 
     db_fd, db_filepath = tempfile.mkstemp(suffix=".sqlite3")
-    app.config["DATABASE"] = {
-        "name": db_filepath,
-        "engine": "peewee.SqliteDatabase",
-    }
+    app.config["DATABASE"] = InstrumentedSqliteDatabase(db_filepath)
 
     db.init_app(app)
 
     with db.database.bind_ctx(MODELS):
         db.database.create_tables(MODELS)
         setup_tables()
+        reference_data.load()
         db.close_db(None)
         with app.app_context():
             yield app
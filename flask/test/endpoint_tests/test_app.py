@@ -6,3 +6,11 @@ def test_private_endpoint(client):
         "Hello from a private endpoint! You need to be authenticated to see this."
         == response_data.json["message"]
     )
+
+
+def test_metrics_endpoint(client):
+    response_data = client.get("/api/metrics")
+    assert response_data.status_code == 200
+    # the test database is not pooled
+    assert response_data.json["database_pool"] is None
+    assert "hits" in response_data.json["caches"]["graphql_documents"]
@@ -1,4 +1,8 @@
+from datetime import datetime
+
 import pytest
+from boxwise_flask.db import db
+from boxwise_flask.models.box import Box
 
 
 @pytest.mark.usefixtures("default_qr_code")
@@ -50,3 +54,92 @@ def test_code_does_not_exist(client):
         in response_data.json["errors"][0]["message"]
     )
     assert queried_box is None
+
+
+def test_get_boxes_from_codes(
+    client, mocker, default_box, default_qr_code, qr_code_without_box
+):
+    execute_sql = mocker.spy(db.database.obj, "execute_sql")
+    graph_ql_query_string = """query Boxes($codes: [String!]!) {
+                boxes(qr_codes: $codes) {
+                    box_id
+                }
+            }"""
+    codes = ["-1", default_qr_code["code"], qr_code_without_box["code"]]
+    data = {"query": graph_ql_query_string, "variables": {"codes": codes}}
+    response_data = client.post("/graphql", json=data)
+    assert response_data.status_code == 200
+    assert response_data.json["data"]["boxes"] == [
+        None,
+        {"box_id": default_box["box_id"]},
+        None,
+    ]
+    assert execute_sql.call_count == 1
+    assert "JOIN" in execute_sql.call_args[0][0]
+
+
+@pytest.fixture()
+def scanning_identity(mocker, default_base):
+    """Identity of the user scanning boxes, who may access the default base"""
+    get_current_identity = mocker.patch("boxwise_flask.routes.get_current_identity")
+    identity = get_current_identity.return_value
+    identity.base_ids = frozenset([default_base["id"]])
+    return identity
+
+
+def test_get_box_by_qr_code(
+    client, mocker, scanning_identity, default_box, default_qr_code
+):
+    execute_sql = mocker.spy(db.database.obj, "execute_sql")
+    response = client.get("/api/boxes/by-qr/{}".format(default_qr_code["code"]))
+    assert response.status_code == 200
+    assert response.json["box_id"] == default_box["box_id"]
+    assert response.json["qr_id"] == default_qr_code["id"]
+    assert response.json["location_id"] == default_box["location"]
+    assert "base_id" not in response.json
+    assert execute_sql.call_count == 1
+    assert "JOIN" in execute_sql.call_args[0][0]
+
+    etag = response.headers["ETag"]
+    response = client.get(
+        "/api/boxes/by-qr/{}".format(default_qr_code["code"]),
+        headers={"If-None-Match": etag},
+    )
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+
+    Box.update(modified=datetime.now()).where(Box.id == default_box["id"]).execute()
+    db.close_db(None)
+    response = client.get(
+        "/api/boxes/by-qr/{}".format(default_qr_code["code"]),
+        headers={"If-None-Match": etag},
+    )
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_get_box_by_qr_code_not_found(
+    client, mocker, scanning_identity, qr_code_without_box
+):
+    response = client.get("/api/boxes/by-qr/{}".format(qr_code_without_box["code"]))
+    assert response.status_code == 404
+
+    execute_sql = mocker.spy(db.database.obj, "execute_sql")
+    assert client.get("/api/boxes/by-qr/unknown").status_code == 404
+    # The unknown code is cached
+    assert client.get("/api/boxes/by-qr/unknown").status_code == 404
+    assert execute_sql.call_count == 1
+
+
+def test_get_box_by_qr_code_of_inaccessible_base(
+    client, scanning_identity, default_box, default_qr_code
+):
+    scanning_identity.base_ids = frozenset()
+    code = default_qr_code["code"]
+    response = client.get("/api/boxes/by-qr/{}".format(code))
+    assert response.status_code == 404
+    # The response is the same as for unknown codes
+    unknown_response = client.get("/api/boxes/by-qr/unknown")
+    assert response.get_data(as_text=True).replace(code, "unknown") == (
+        unknown_response.get_data(as_text=True)
+    )
@@ -0,0 +1,81 @@
+import gzip
+
+import pytest
+from boxwise_flask import compression
+from boxwise_flask.compression import (
+    COMPRESSORS,
+    choose_encoding,
+    compression_stats,
+    get_compression_levels,
+)
+from werkzeug.datastructures import Accept
+
+USERS_QUERY = {"query": "query { allUsers { id name email } }"}
+
+
+@pytest.fixture(autouse=True)
+def clear_compression_stats(monkeypatch):
+    compression_stats.clear()
+    # The test payloads are small
+    monkeypatch.setattr(compression, "COMPRESSION_MIN_SIZE", 100)
+
+
+def test_large_response_is_gzipped(client, default_users):
+    response = client.post(
+        "/graphql", json=USERS_QUERY, headers={"Accept-Encoding": "gzip"}
+    )
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    body = gzip.decompress(response.data)
+    assert body.startswith(b'{"data":{"allUsers":[')
+
+    stats = compression_stats.stats()
+    assert stats["compressed"] == 1
+    assert stats["encodings"] == {"gzip": 1}
+    assert stats["original_bytes"] == len(body)
+    assert stats["compressed_bytes"] == len(response.data)
+    assert 0 < stats["ratio"] < 1
+
+
+def test_response_is_not_compressed_without_accept_encoding(client, default_users):
+    response = client.post(
+        "/graphql", json=USERS_QUERY, headers={"Accept-Encoding": ""}
+    )
+    assert "Content-Encoding" not in response.headers
+    assert response.json["data"]["allUsers"]
+
+
+def test_small_response_is_not_compressed(client, monkeypatch, default_users):
+    monkeypatch.setattr(compression, "COMPRESSION_MIN_SIZE", 100000)
+    response = client.post(
+        "/graphql", json=USERS_QUERY, headers={"Accept-Encoding": "gzip"}
+    )
+    assert "Content-Encoding" not in response.headers
+    assert compression_stats.stats()["skipped"] == 1
+
+
+def test_compressed_get_response_keeps_etag(client, default_users):
+    headers = {"Accept-Encoding": "gzip"}
+    response = client.get("/graphql", query_string=USERS_QUERY, headers=headers)
+    assert response.headers["Content-Encoding"] == "gzip"
+    etag = response.headers["ETag"]
+    assert etag.startswith("W/")
+
+    headers["If-None-Match"] = etag
+    response = client.get("/graphql", query_string=USERS_QUERY, headers=headers)
+    assert response.status_code == 304
+
+
+def test_choose_encoding():
+    assert choose_encoding(Accept([("gzip", 1)])) == "gzip"
+    assert choose_encoding(Accept([("gzip", 0)])) is None
+    assert choose_encoding(Accept([("identity", 1)])) is None
+    assert choose_encoding(Accept([("*", 1)])) in COMPRESSORS
+    if "br" in COMPRESSORS:
+        assert choose_encoding(Accept([("gzip", 1), ("br", 1)])) == "br"
+        assert choose_encoding(Accept([("gzip", 1), ("br", 0.5)])) == "gzip"
+
+
+def test_compression_level_decreases_with_size():
+    assert get_compression_levels(1000) > get_compression_levels(10 ** 7)
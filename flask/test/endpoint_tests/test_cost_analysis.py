@@ -0,0 +1,87 @@
+from boxwise_flask.graph_ql import cost_analysis
+from boxwise_flask.graph_ql.cost_analysis import analyze_cost
+from boxwise_flask.graph_ql.pagination import MAX_PAGE_SIZE
+from boxwise_flask.graph_ql.resolvers import schema
+from graphql import parse
+
+
+def test_cost_of_list_fields():
+    document = parse("query { allBases { id organisation { id } } }")
+    cost, depth = analyze_cost(schema, document)
+    # weight of allBases, plus weight of organisation for each expected list item
+    assert cost == 5 + cost_analysis.DEFAULT_LIST_SIZE * 1
+    assert depth == 3
+
+
+def test_cost_uses_first_argument_and_fragments():
+    document = parse(
+        """query Users($first: Int) {
+            allUsersConnection(first: $first) { edges { ...userEdge } }
+        }
+        fragment userEdge on UserEdge { node { id } }"""
+    )
+    cost, depth = analyze_cost(schema, document, variables={"first": 3})
+    # connection weight, plus edges list of 3 items, each with a node object
+    assert cost == 10 + 1 + 3 * 1
+    assert depth == 4
+
+
+def test_aliased_fields_add_up(client, monkeypatch):
+    monkeypatch.setattr(cost_analysis, "MAX_QUERY_COST", 20)
+    aliases = " ".join(f"b{i}: base(id: 1) {{ id }}" for i in range(21))
+
+    response_data = client.post("/graphql", json={"query": f"query {{ {aliases} }}"})
+    assert response_data.status_code == 400
+    error = response_data.json["errors"][0]
+    assert error["extensions"]["code"] == "OPERATION_TOO_COMPLEX"
+    assert error["extensions"]["cost"] == 21
+    assert "data" not in response_data.json
+
+
+def test_deep_operation_is_rejected(client, monkeypatch, mocker):
+    monkeypatch.setattr(cost_analysis, "MAX_QUERY_DEPTH", 3)
+    execute = mocker.patch("boxwise_flask.graph_ql.execution.execute")
+    graph_ql_query_string = """query {
+                allBases { organisation { id } }
+                box(qr_code: "999") { location { base { id } } }
+            }"""
+
+    response_data = client.post("/graphql", json={"query": graph_ql_query_string})
+    assert response_data.status_code == 400
+    assert response_data.json["errors"][0]["extensions"]["depth"] == 4
+    execute.assert_not_called()
+
+
+def test_first_argument_out_of_range_does_not_lower_cost():
+    document = parse(
+        """query Users($first: Int) {
+            allUsersConnection(first: $first) { edges { node { id } } }
+        }"""
+    )
+    cost, _ = analyze_cost(schema, document, variables={"first": -(10 ** 6)})
+    assert cost == 10 + 1
+    cost, _ = analyze_cost(schema, document, variables={"first": 10 ** 6})
+    assert cost == 10 + 1 + MAX_PAGE_SIZE * 1
+
+
+def test_cost_grows_with_input_list_sizes():
+    document = parse(
+        """query Boxes($codes: [String!]!) {
+            boxes(qr_codes: $codes) { location { id } }
+        }"""
+    )
+    cost, _ = analyze_cost(schema, document, variables={"codes": ["a", "b", "c"]})
+    # weight of boxes, plus per code the item weight and the location object
+    assert cost == 5 + 3 * (1 + 1)
+
+    document = parse(
+        """mutation Boxes($inputs: [CreateBoxInput!]!) {
+            createBoxes(inputs: $inputs) { box { id } error }
+        }"""
+    )
+    cost, _ = analyze_cost(schema, document, variables={"inputs": [{}] * 10})
+    assert cost == 50 + 10 * (2 + 1)
+
+    document = parse("mutation { generateQrCodes(count: 1000) { id code } }")
+    cost, _ = analyze_cost(schema, document)
+    assert cost == 50 + 1000 * 1
@@ -1,4 +1,5 @@
 import pytest
+from boxwise_flask.db import db
 
 
 @pytest.mark.usefixtures("default_qr_code")
@@ -31,3 +32,56 @@ def test_create_box(client, default_qr_code):
 
     assert response_data.status_code == 200
     assert created_box["items"] == 9999
+
+
+def test_create_boxes(
+    client, mocker, default_qr_code, qr_code_without_box, default_product
+):
+    execute_sql = mocker.spy(db.database.obj, "execute_sql")
+
+    def box_input(qr_barcode, items):
+        return {
+            "product_id": default_product["id"],
+            "items": items,
+            "location_id": 1,
+            "comments": "",
+            "qr_barcode": qr_barcode,
+        }
+
+    mutation = """mutation CreateBoxes($inputs: [CreateBoxInput!]!) {
+            createBoxes(inputs: $inputs) {
+                box { box_id items qr_id product { id } }
+                error
+            }
+        }"""
+    inputs = [
+        box_input(default_qr_code["code"], 10),
+        box_input("unknown", 20),
+        box_input(qr_code_without_box["code"], 30),
+        box_input(default_qr_code["code"], 40),
+    ]
+    response_data = client.post(
+        "/graphql", json={"query": mutation, "variables": {"inputs": inputs}}
+    )
+    assert response_data.status_code == 200
+
+    results = response_data.json["data"]["createBoxes"]
+    assert [result["error"] for result in results] == [
+        None,
+        "Unknown QR code",
+        None,
+        "QR code used more than once",
+    ]
+    first, _, second, _ = results
+    assert first["box"]["items"] == 10
+    assert first["box"]["qr_id"] == default_qr_code["id"]
+    assert first["box"]["product"] == {"id": default_product["id"]}
+    assert second["box"]["items"] == 30
+    assert second["box"]["qr_id"] == qr_code_without_box["id"]
+    assert first["box"]["box_id"] != second["box"]["box_id"]
+    assert results[1]["box"] is None
+
+    statements = [call[0][0] for call in execute_sql.call_args_list]
+    assert len([sql for sql in statements if sql.startswith('SELECT "t1"."code"')]) == 1
+    box_inserts = [sql for sql in statements if sql.startswith('INSERT INTO "stock"')]
+    assert len(box_inserts) == 1
@@ -0,0 +1,29 @@
+from boxwise_flask.graph_ql.execution import document_cache
+
+
+def test_repeated_query_is_served_from_document_cache(client):
+    document_cache.clear()
+    data = {"query": "query { hello }"}
+
+    client.post("/graphql", json=data)
+    hits_before = document_cache.stats()["hits"]
+    response = client.post("/graphql", json=data)
+
+    assert response.status_code == 200
+    assert document_cache.stats()["hits"] == hits_before + 1
+
+
+def test_invalid_query_is_not_cached(client):
+    document_cache.clear()
+    data = {"query": "query { unknownField }"}
+
+    response = client.post("/graphql", json=data)
+    assert response.status_code == 400
+    assert "unknownField" in response.json["errors"][0]["message"]
+    assert document_cache.stats()["size"] == 0
+
+
+def test_syntax_error_is_reported(client):
+    response = client.post("/graphql", json={"query": "query {"})
+    assert response.status_code == 400
+    assert "Syntax Error" in response.json["errors"][0]["message"]
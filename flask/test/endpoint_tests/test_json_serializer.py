@@ -0,0 +1,60 @@
+import datetime
+import json
+
+import pytest
+from boxwise_flask import json_serializer
+from boxwise_flask.json_serializer import SERIALIZERS, get_serializer
+from data.box import TIME
+
+DATA = {
+    "data": {
+        "user": {
+            "name": "Grüße",
+            "lastlogin": datetime.datetime(2020, 1, 2, 3, 4, 5, 678),
+            "valid_firstday": datetime.date(2020, 1, 2),
+        }
+    }
+}
+
+
+@pytest.mark.parametrize("name", sorted(SERIALIZERS))
+def test_serializers_write_compact_json_with_dates(name):
+    output = get_serializer(name)(DATA)
+    assert b" " not in output
+    assert json.loads(output) == {
+        "data": {
+            "user": {
+                "name": "Grüße",
+                "lastlogin": "2020-01-02T03:04:05.000678",
+                "valid_firstday": "2020-01-02",
+            }
+        }
+    }
+
+
+def test_unknown_serializer():
+    with pytest.raises(ValueError):
+        get_serializer("unknown")
+
+
+@pytest.mark.parametrize("name", sorted(SERIALIZERS))
+def test_graphql_response_is_serialized(client, monkeypatch, default_bases, name):
+    monkeypatch.setattr(json_serializer, "dumps", get_serializer(name))
+    response = client.post("/graphql", json={"query": "query { allBases { id } }"})
+    assert response.status_code == 200
+    assert response.content_type == "application/json"
+    assert response.data.startswith(b'{"data":{"allBases":[{"id":')
+
+
+def test_graphql_datetimes_are_serializable_by_plain_json(
+    client, monkeypatch, default_box, default_qr_code
+):
+    monkeypatch.setattr(
+        json_serializer, "dumps", lambda data: json.dumps(data).encode()
+    )
+    query = 'query {{ box(qr_code: "{}") {{ created }} }}'.format(
+        default_qr_code["code"]
+    )
+    response = client.post("/graphql", json={"query": query})
+    assert response.status_code == 200
+    assert response.json["data"]["box"] == {"created": TIME.isoformat()}
@@ -0,0 +1,60 @@
+from boxwise_flask.graph_ql.pagination import MAX_PAGE_SIZE
+
+
+def query_all_users_connection(client, arguments):
+    graph_ql_query_string = f"""query {{
+                allUsersConnection({arguments}) {{
+                    edges {{ cursor node {{ id name }} }}
+                    pageInfo {{ hasNextPage endCursor }}
+                }}
+            }}"""
+    return client.post("/graphql", json={"query": graph_ql_query_string})
+
+
+def test_all_users_connection_pages(client, default_users):
+    response_data = query_all_users_connection(client, "first: 2")
+    assert response_data.status_code == 200
+    connection = response_data.json["data"]["allUsersConnection"]
+    first_page_ids = [edge["node"]["id"] for edge in connection["edges"]]
+    assert first_page_ids == sorted(default_users)[:2]
+    assert connection["pageInfo"]["hasNextPage"]
+
+    end_cursor = connection["pageInfo"]["endCursor"]
+    response_data = query_all_users_connection(
+        client, f'first: 2, after: "{end_cursor}"'
+    )
+    connection = response_data.json["data"]["allUsersConnection"]
+    second_page_ids = [edge["node"]["id"] for edge in connection["edges"]]
+    assert second_page_ids == sorted(default_users)[2:]
+    assert not connection["pageInfo"]["hasNextPage"]
+
+
+def test_page_size_is_limited(client):
+    response_data = query_all_users_connection(client, f"first: {MAX_PAGE_SIZE + 1}")
+    error = response_data.json["errors"][0]
+    assert error["extensions"]["code"] == "INVALID_PAGE_SIZE"
+    assert response_data.json["data"]["allUsersConnection"] is None
+
+
+def test_invalid_cursor(client):
+    response_data = query_all_users_connection(client, 'after: "invalid"')
+    error = response_data.json["errors"][0]
+    assert error["extensions"]["code"] == "INVALID_CURSOR"
+
+
+def test_org_bases_connection(client, default_bases):
+    organisation_id = list(default_bases.values())[0]["organisation_id"]
+    graph_ql_query_string = f"""query {{
+                orgBasesConnection(org_id: {organisation_id}, first: 1) {{
+                    edges {{ node {{ id name organisation {{ id }} }} }}
+                    pageInfo {{ hasNextPage }}
+                }}
+            }}"""
+    response_data = client.post("/graphql", json={"query": graph_ql_query_string})
+    assert response_data.status_code == 200
+
+    connection = response_data.json["data"]["orgBasesConnection"]
+    node = connection["edges"][0]["node"]
+    assert node["id"] == min(default_bases)
+    assert node["organisation"]["id"] == organisation_id
+    assert connection["pageInfo"]["hasNextPage"]
@@ -0,0 +1,78 @@
+import hashlib
+import json
+
+from boxwise_flask.graph_ql.persisted_queries import persisted_query_store
+
+QUERY = "query { allBases { id name } }"
+
+
+def persisted_query_extension(query):
+    query_hash = hashlib.sha256(query.encode()).hexdigest()
+    return {"persistedQuery": {"version": 1, "sha256Hash": query_hash}}
+
+
+def test_unknown_hash_is_not_found(client):
+    persisted_query_store.clear()
+    data = {"extensions": persisted_query_extension(QUERY)}
+
+    response = client.post("/graphql", json=data)
+    assert response.status_code == 400
+    error = response.json["errors"][0]
+    assert error["message"] == "PersistedQueryNotFound"
+    assert error["extensions"]["code"] == "PERSISTED_QUERY_NOT_FOUND"
+
+
+def test_query_is_registered_and_executed_by_hash(client, default_bases):
+    persisted_query_store.clear()
+    extensions = persisted_query_extension(QUERY)
+
+    response = client.post("/graphql", json={"query": QUERY, "extensions": extensions})
+    assert response.status_code == 200
+
+    response = client.post("/graphql", json={"extensions": extensions})
+    assert response.status_code == 200
+    assert len(response.json["data"]["allBases"]) == len(default_bases)
+
+
+def test_hash_mismatch_is_rejected(client):
+    extensions = persisted_query_extension("query { allUsers { id } }")
+    response = client.post("/graphql", json={"query": QUERY, "extensions": extensions})
+    assert response.status_code == 400
+    assert (
+        response.json["errors"][0]["extensions"]["code"]
+        == "PERSISTED_QUERY_HASH_MISMATCH"
+    )
+
+
+def test_persisted_query_via_get_is_cacheable(client, default_bases):
+    extensions = persisted_query_extension(QUERY)
+    client.post("/graphql", json={"query": QUERY, "extensions": extensions})
+
+    url = "/graphql?extensions=" + json.dumps(extensions)
+    response = client.get(url)
+    assert response.status_code == 200
+    assert len(response.json["data"]["allBases"]) == len(default_bases)
+    assert "max-age" in response.headers["Cache-Control"]
+    etag = response.headers["ETag"]
+
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+
+def test_mutation_via_get_is_rejected(client):
+    mutation = """mutation { createBox(box_creation_input: {
+        product_id: 1, location_id: 1, comments: "", qr_barcode: "999"}) { id } }"""
+    response = client.get("/graphql", query_string={"query": mutation})
+    assert response.status_code == 400
+    assert response.json["errors"][0]["extensions"]["code"] == "OPERATION_NOT_ALLOWED"
+
+
+def test_get_without_parameters_serves_playground(client):
+    response = client.get("/graphql")
+    assert response.status_code == 200
+    assert b"GraphQL Playground" in response.data
+
+
+def test_get_with_invalid_json_parameter(client):
+    response = client.get("/graphql", query_string={"variables": "{"})
+    assert response.status_code == 400
@@ -0,0 +1,93 @@
+import io
+import zipfile
+
+import pytest
+from boxwise_flask.label_sheets import SHEET_MAX_LABELS
+from boxwise_flask.models.qr_code import QRCode
+
+
+def test_generate_qr_codes(client):
+    gql_mutation_string = """mutation {
+            generateQrCodes(count: 3) {
+                id
+                code
+            }
+        }"""
+    response_data = client.post("/graphql", json={"query": gql_mutation_string})
+    assert response_data.status_code == 200
+
+    qr_codes = response_data.json["data"]["generateQrCodes"]
+    assert len({qr_code["code"] for qr_code in qr_codes}) == 3
+    assert QRCode.get_ids_from_codes(qr_code["code"] for qr_code in qr_codes) == {
+        qr_code["code"]: qr_code["id"] for qr_code in qr_codes
+    }
+
+
+def test_generate_qr_code_labels(client):
+    pytest.importorskip("qrcode")
+    response = client.post("/api/qr-codes", json={"count": 2})
+    assert response.status_code == 200
+    assert response.mimetype == "application/zip"
+    assert response.is_streamed
+
+    with zipfile.ZipFile(io.BytesIO(response.get_data())) as archive:
+        names = archive.namelist()
+        assert len(names) == 2
+        assert all(name.endswith(".png") for name in names)
+    codes = [name[: -len(".png")] for name in names]
+    assert len(QRCode.get_ids_from_codes(codes)) == 2
+
+
+@pytest.mark.parametrize(
+    "data", [{}, {"count": "2"}, {"count": 0}, {"count": 2, "format": "gif"}]
+)
+def test_generate_qr_code_labels_rejects_invalid_parameters(client, data):
+    response = client.post("/api/qr-codes", json=data)
+    assert response.status_code == 400
+    assert QRCode.select().count() == 2
+
+
+def test_qr_code_label_sheets(client, default_qr_code, qr_code_without_box):
+    pytest.importorskip("qrcode")
+    codes = [default_qr_code["code"], qr_code_without_box["code"]]
+    for data in [{"codes": codes}, {"from_id": 1, "to_id": 2, "columns": 1}]:
+        response = client.post("/api/qr-codes/label-sheets", json=data)
+        assert response.status_code == 200
+        assert response.mimetype == "application/pdf"
+        assert response.is_streamed
+
+        pdf = response.get_data()
+        assert pdf.startswith(b"%PDF")
+        assert pdf.count(b"/Subtype /Image") == 2
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        {},
+        {"codes": ["unknown"]},
+        {"codes": "999"},
+        {"codes": []},
+        {"from_id": 3, "to_id": 4},
+        {"from_id": 1, "to_id": 2, "rows": "3"},
+    ],
+)
+def test_qr_code_label_sheets_reject_invalid_parameters(client, data):
+    response = client.post("/api/qr-codes/label-sheets", json=data)
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize(
+    "data",
+    [{"from_id": 1, "to_id": 10 ** 9}, {"codes": ["unknown"] * (SHEET_MAX_LABELS + 1)}],
+)
+def test_qr_code_label_sheets_reject_too_many_labels_before_querying(
+    client, mocker, data
+):
+    get_codes_in_id_range = mocker.spy(QRCode, "get_codes_in_id_range")
+    get_ids_from_codes = mocker.spy(QRCode, "get_ids_from_codes")
+    response = client.post("/api/qr-codes/label-sheets", json=data)
+    assert response.status_code == 400
+    assert b"Number of labels" in response.data
+    get_codes_in_id_range.assert_not_called()
+    get_ids_from_codes.assert_not_called()
@@ -0,0 +1,96 @@
+import pytest
+from boxwise_flask.db import db
+
+
+@pytest.fixture()
+def sql_statements(app, mocker):
+    # db.database is a proxy to the database initialized by the app
+    return mocker.spy(db.database.obj, "execute_sql")
+
+
+@pytest.mark.usefixtures("default_box")
+def test_box_relations(
+    client,
+    sql_statements,
+    default_qr_code,
+    default_product,
+    default_location,
+    default_base,
+    default_organisation,
+    default_box_state,
+):
+    code = '"%s"' % default_qr_code["code"]
+    graph_ql_query_string = f"""query Box {{
+                box(qr_code: {code}) {{
+                    product {{ id name }}
+                    location {{
+                        id
+                        label
+                        base {{ id name organisation {{ label }} }}
+                    }}
+                    size {{ id }}
+                    state {{ label }}
+                }}
+            }}"""
+    response_data = client.post("/graphql", json={"query": graph_ql_query_string})
+    assert response_data.status_code == 200
+
+    queried_box = response_data.json["data"]["box"]
+    assert queried_box["product"] == {
+        "id": default_product["id"],
+        "name": default_product["name"],
+    }
+    assert queried_box["location"]["id"] == default_location["id"]
+    assert queried_box["location"]["base"]["name"] == default_base["name"]
+    assert (
+        queried_box["location"]["base"]["organisation"]["label"]
+        == default_organisation["label"]
+    )
+    assert queried_box["size"] is None
+    assert queried_box["state"]["label"] == default_box_state["label"]
+
+    # Joined QR code and box lookup, and one query for each of product, location,
+    # base, organisation. The box state is served from the reference data registry
+    assert sql_statements.call_count == 5
+
+
+def test_base_organisations_are_joined(
+    client, sql_statements, default_bases, default_organisation
+):
+    graph_ql_query_string = """query {
+                allBases {
+                    id
+                    organisation { id label }
+                }
+            }"""
+    response_data = client.post("/graphql", json={"query": graph_ql_query_string})
+    assert response_data.status_code == 200
+
+    all_bases = response_data.json["data"]["allBases"]
+    assert len(all_bases) == len(default_bases)
+    for queried_base in all_bases:
+        assert queried_base["organisation"] == {
+            "id": default_organisation["id"],
+            "label": default_organisation["label"],
+        }
+    assert sql_statements.call_count == 1
+    sql = sql_statements.call_args[0][0]
+    assert "JOIN" in sql
+    assert "currencyname" not in sql
+
+
+def test_only_requested_columns_are_selected(client, sql_statements, default_users):
+    graph_ql_query_string = """query {
+                allUsers { ...userFields }
+            }
+            fragment userFields on User { id name }"""
+    response_data = client.post("/graphql", json={"query": graph_ql_query_string})
+    assert response_data.status_code == 200
+
+    queried_users = response_data.json["data"]["allUsers"]
+    assert {user["id"]: user["name"] for user in queried_users} == {
+        user["id"]: user["name"] for user in default_users.values()
+    }
+    sql = sql_statements.call_args[0][0]
+    assert '"naam"' in sql
+    assert '"email"' not in sql
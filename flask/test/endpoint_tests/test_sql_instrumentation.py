@@ -0,0 +1,70 @@
+import json
+import logging
+
+from boxwise_flask import sql_instrumentation
+from boxwise_flask.sql_instrumentation import StatementRecording
+
+BASES_QUERY = """query {
+    allBases {
+        id
+        name
+    }
+}"""
+
+
+def test_recording_detects_repeated_statements(monkeypatch):
+    monkeypatch.setattr(sql_instrumentation, "REPEATED_STATEMENT_THRESHOLD", 2)
+    recording = StatementRecording()
+    for seconds in [0.001, 0.003, 0.002]:
+        recording.add('SELECT * FROM "box" WHERE "id" = ?', seconds)
+    recording.add('SELECT * FROM "camps"', 0.01)
+
+    report = recording.report()
+    assert report["count"] == 4
+    assert report["totalMs"] == 16.0
+    assert report["slowest"][0] == {"sql": 'SELECT * FROM "camps"', "ms": 10.0}
+    assert report["repeated"] == [
+        {"sql": 'SELECT * FROM "box" WHERE "id" = ?', "count": 3}
+    ]
+
+
+def test_debug_response_contains_sql_report(client, monkeypatch, default_bases):
+    monkeypatch.setenv("DEBUG_GRAPHQL", "1")
+    response = client.post("/graphql", json={"query": BASES_QUERY})
+    assert response.status_code == 200
+
+    report = response.json["extensions"]["sql"]
+    assert report["count"] == 1
+    assert report["slowest"][0]["sql"].startswith("SELECT")
+    assert report["repeated"] == []
+
+
+def test_sql_report_is_logged(client, caplog, default_bases):
+    with caplog.at_level(logging.INFO, logger=sql_instrumentation.__name__):
+        response = client.post(
+            "/graphql", json={"query": BASES_QUERY, "operationName": None}
+        )
+    assert response.status_code == 200
+    assert "extensions" not in response.json
+
+    [record] = [r for r in caplog.records if r.name == sql_instrumentation.__name__]
+    assert record.levelno == logging.INFO
+    logged = json.loads(record.getMessage())
+    assert logged["event"] == "sql_statements"
+    assert logged["count"] == 1
+
+
+def test_repeated_statements_are_logged_as_warning(
+    client, caplog, monkeypatch, default_bases
+):
+    monkeypatch.setattr(sql_instrumentation, "REPEATED_STATEMENT_THRESHOLD", 1)
+    query = """query {
+        first: base(id: 1) { name }
+        second: base(id: 2) { name }
+    }"""
+    with caplog.at_level(logging.INFO, logger=sql_instrumentation.__name__):
+        client.post("/graphql", json={"query": query})
+
+    [record] = [r for r in caplog.records if r.name == sql_instrumentation.__name__]
+    assert record.levelno == logging.WARNING
+    assert json.loads(record.getMessage())["repeated"][0]["count"] == 2
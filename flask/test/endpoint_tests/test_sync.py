@@ -0,0 +1,145 @@
+from datetime import datetime, timedelta
+
+import pytest
+from boxwise_flask.db import db
+from boxwise_flask.graph_ql import sync
+from boxwise_flask.models.box import Box
+from boxwise_flask.models.location import Location
+
+
+@pytest.fixture(autouse=True)
+def no_sync_lag(monkeypatch):
+    monkeypatch.setattr(sync, "SYNC_LAG", 0)
+
+
+def query_changes_since(client, arguments):
+    graph_ql_query_string = f"""query {{
+                changesSince({arguments}) {{
+                    bases {{ id name }}
+                    locations {{ id base {{ id }} }}
+                    products {{ id name }}
+                    boxes {{ id box_id deleted }}
+                    cursor
+                    hasMore
+                }}
+            }}"""
+    return client.post("/graphql", json={"query": graph_ql_query_string})
+
+
+def test_changes_since_pages_through_changes(
+    client, default_base, default_location, default_product, default_box
+):
+    base_id = default_base["id"]
+    Location.create(**dict(default_location, id=2))
+    db.close_db(None)
+    response_data = query_changes_since(client, f"base_id: {base_id}, first: 1")
+    assert response_data.status_code == 200
+    changes = response_data.json["data"]["changesSince"]
+    assert changes["bases"] == [{"id": base_id, "name": default_base["name"]}]
+    assert changes["locations"] == [
+        {"id": default_location["id"], "base": {"id": base_id}}
+    ]
+    assert [product["id"] for product in changes["products"]] == [default_product["id"]]
+    assert [box["box_id"] for box in changes["boxes"]] == [default_box["box_id"]]
+    assert changes["boxes"][0]["deleted"] is not None
+    assert changes["hasMore"]
+
+    cursor = changes["cursor"]
+    response_data = query_changes_since(
+        client, f'base_id: {base_id}, cursor: "{cursor}"'
+    )
+    changes = response_data.json["data"]["changesSince"]
+    assert changes["locations"] == [{"id": 2, "base": {"id": base_id}}]
+    for name in ("bases", "products", "boxes"):
+        assert changes[name] == []
+    assert not changes["hasMore"]
+
+    # Rows modified after the last sync are returned again
+    Box.update(modified=datetime.now() - timedelta(seconds=1)).execute()
+    db.close_db(None)
+    cursor = changes["cursor"]
+    response_data = query_changes_since(
+        client, f'base_id: {base_id}, cursor: "{cursor}"'
+    )
+    changes = response_data.json["data"]["changesSince"]
+    assert [box["id"] for box in changes["boxes"]] == [default_box["id"]]
+    assert changes["bases"] == []
+
+    cursor = changes["cursor"]
+    response_data = query_changes_since(
+        client, f'base_id: {base_id}, cursor: "{cursor}"'
+    )
+    assert response_data.json["data"]["changesSince"]["boxes"] == []
+
+
+def test_recent_changes_are_left_to_next_sync(
+    client, monkeypatch, default_base, default_box
+):
+    Box.update(modified=datetime.now()).execute()
+    db.close_db(None)
+    monkeypatch.setattr(sync, "SYNC_LAG", 60)
+    response_data = query_changes_since(client, f"base_id: {default_base['id']}")
+    assert response_data.json["data"]["changesSince"]["boxes"] == []
+
+
+def test_changes_since_rejects_invalid_cursor(client, default_bases):
+    base_id, other_base_id = sorted(default_bases)[:2]
+    response_data = query_changes_since(client, f"base_id: {base_id}")
+    cursor = response_data.json["data"]["changesSince"]["cursor"]
+
+    for arguments in (
+        f'base_id: {base_id}, cursor: "invalid"',
+        f'base_id: {other_base_id}, cursor: "{cursor}"',
+    ):
+        response_data = query_changes_since(client, arguments)
+        error = response_data.json["errors"][0]
+        assert error["extensions"]["code"] == "INVALID_CURSOR"
+        assert response_data.json["data"] is None
+
+
+def test_boxes_created_after_sync_are_changes(
+    client,
+    default_base,
+    default_location,
+    default_product,
+    default_box,
+    qr_code_without_box,
+):
+    base_id = default_base["id"]
+    # The cursor of the first sync points past a box with modified timestamp
+    Box.update(modified=datetime.now() - timedelta(seconds=1)).execute()
+    db.close_db(None)
+    response_data = query_changes_since(client, f"base_id: {base_id}")
+    cursor = response_data.json["data"]["changesSince"]["cursor"]
+
+    gql_mutation_string = f"""mutation {{
+            createBox(box_creation_input: {{
+                product_id: {default_product["id"]},
+                items: 10,
+                location_id: {default_location["id"]},
+                comments: "",
+                qr_barcode: "{qr_code_without_box["code"]}"
+            }}) {{
+                box_id
+            }}
+        }}"""
+    response_data = client.post("/graphql", json={"query": gql_mutation_string})
+    box_id = response_data.json["data"]["createBox"]["box_id"]
+
+    response_data = query_changes_since(
+        client, f'base_id: {base_id}, cursor: "{cursor}"'
+    )
+    changes = response_data.json["data"]["changesSince"]
+    assert [box["box_id"] for box in changes["boxes"]] == [box_id]
+
+
+def test_zero_date_is_not_deleted(client, default_base, default_box):
+    # MySQL stores the zero date in `stock.deleted` for boxes that are not deleted
+    Box._meta.database.execute_sql(
+        "UPDATE stock SET deleted = '0000-00-00 00:00:00' WHERE id = ?",
+        (default_box["id"],),
+    )
+    db.close_db(None)
+    response_data = query_changes_since(client, f"base_id: {default_base['id']}")
+    boxes = response_data.json["data"]["changesSince"]["boxes"]
+    assert [box["deleted"] for box in boxes] == [None]
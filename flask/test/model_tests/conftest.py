@@ -10,9 +10,14 @@ https://docs.pytest.org/en/stable/fixture.html#pytest-fixtures-explicit-modular-
 """
 
 import pytest
+from boxwise_flask.access_cache import access_cache
+from boxwise_flask.box_id_allocator import box_id_allocator
+from boxwise_flask.cache import CacheInvalidationMixin
+from boxwise_flask.label_sheets import label_image_cache
 from boxwise_flask.models.base import Base
 from boxwise_flask.models.base_module import BaseModule
 from boxwise_flask.models.box import Box
+from boxwise_flask.models.box_id_sequence import BoxIdSequence
 from boxwise_flask.models.box_state import BoxState
 from boxwise_flask.models.language import Language
 from boxwise_flask.models.location import Location
@@ -27,6 +32,8 @@ from boxwise_flask.models.user import User
 from boxwise_flask.models.usergroup import Usergroup
 from boxwise_flask.models.usergroup_access_level import UsergroupAccessLevel
 from boxwise_flask.models.usergroup_base_access import UsergroupBaseAccess
+from boxwise_flask.qr_code_cache import qr_code_cache
+from boxwise_flask.reference_data import reference_data
 
 # Imports fixtures into tests
 from data.base import default_base  # noqa: F401
@@ -39,6 +46,7 @@ from data.product import default_product  # noqa: F401
 from data.product_category import default_product_category  # noqa: F401
 from data.product_gender import default_product_gender  # noqa: F401
 from data.qr_code import default_qr_code  # noqa: F401
+from data.qr_code import qr_code_without_box  # noqa: F401
 from data.setup_tables import setup_tables
 from data.size_range import default_size_range  # noqa: F401
 from data.user import default_user  # noqa: F401
@@ -53,6 +61,7 @@ MODELS = (
     Base,
     BaseModule,
     Box,
+    BoxIdSequence,
     BoxState,
     Language,
     Location,
@@ -69,10 +78,19 @@ MODELS = (
 )
 
 
+class CacheInvalidatingSqliteDatabase(CacheInvalidationMixin, SqliteDatabase):
+    pass
+
+
 @pytest.fixture(autouse=True)
 def setup_db_before_test():
     """Sets up database automatically before each test"""
-    _db = SqliteDatabase(":memory:")
+    access_cache.clear()
+    box_id_allocator.clear()
+    qr_code_cache.clear()
+    label_image_cache.clear()
+    reference_data.clear()
+    _db = CacheInvalidatingSqliteDatabase(":memory:")
     with _db.bind_ctx(MODELS):
         _db.create_tables(MODELS)
         setup_tables()
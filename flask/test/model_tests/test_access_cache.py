@@ -0,0 +1,66 @@
+import pytest
+from boxwise_flask.access_cache import access_cache
+from boxwise_flask.models.user import (
+    User,
+    UsergroupBaseAccess,
+    get_base_ids_for_usergroup,
+    get_user_access,
+)
+
+
+@pytest.mark.usefixtures("default_user")
+def test_get_user_access_is_cached(default_user):
+    expected_access = (default_user["id"], default_user["usergroup"])
+    assert get_user_access(default_user["email"]) == expected_access
+    assert get_user_access(default_user["email"]) == expected_access
+
+    stats = access_cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+@pytest.mark.usefixtures("default_usergroup_base_access_list")
+def test_base_ids_are_reloaded_after_write(default_usergroup_base_access_list):
+    usergroup_id = list(default_usergroup_base_access_list.values())[0]["usergroup_id"]
+    base_ids = get_base_ids_for_usergroup(usergroup_id)
+    assert base_ids == frozenset(default_usergroup_base_access_list)
+
+    UsergroupBaseAccess.create(base_id=100, usergroup_id=usergroup_id)
+    assert get_base_ids_for_usergroup(usergroup_id) == base_ids | {100}
+
+    UsergroupBaseAccess.delete().where(UsergroupBaseAccess.base_id == 100).execute()
+    assert get_base_ids_for_usergroup(usergroup_id) == base_ids
+    assert access_cache.stats()["hits"] == 0
+
+
+@pytest.mark.usefixtures("default_user")
+def test_user_access_is_reloaded_after_user_update(default_user):
+    get_user_access(default_user["email"])
+    User.update(usergroup=None).where(User.id == default_user["id"]).execute()
+
+    assert get_user_access(default_user["email"]) == (default_user["id"], None)
+    assert get_base_ids_for_usergroup(None) == frozenset()
+
+
+@pytest.mark.usefixtures("default_usergroup_base_access_list")
+def test_revoked_access_is_not_cached_after_transaction(
+    default_usergroup_base_access_list,
+):
+    usergroup_id = list(default_usergroup_base_access_list.values())[0]["usergroup_id"]
+    base_ids = get_base_ids_for_usergroup(usergroup_id)
+    revoked_base_id = min(base_ids)
+
+    with UsergroupBaseAccess._meta.database.atomic() as transaction:
+        UsergroupBaseAccess.delete().where(
+            UsergroupBaseAccess.base_id == revoked_base_id
+        ).execute()
+        assert get_base_ids_for_usergroup(usergroup_id) == base_ids - {revoked_base_id}
+        transaction.rollback()
+    # The rollback restores the access that was cached as revoked meanwhile
+    assert get_base_ids_for_usergroup(usergroup_id) == base_ids
+
+    with UsergroupBaseAccess._meta.database.atomic():
+        UsergroupBaseAccess.delete().where(
+            UsergroupBaseAccess.base_id == revoked_base_id
+        ).execute()
+    assert get_base_ids_for_usergroup(usergroup_id) == base_ids - {revoked_base_id}
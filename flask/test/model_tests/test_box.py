@@ -1,5 +1,7 @@
 import pytest
+from boxwise_flask.models import box
 from boxwise_flask.models.box import Box
+from boxwise_flask.models.qr_code import QRCode
 from playhouse.shortcuts import model_to_dict
 
 
@@ -31,3 +33,35 @@ def test_box_model(
     assert queried_box_dict["product"]["id"] == default_product["id"]
     assert queried_box_dict["product"]["product_gender"] == default_product_gender
     assert queried_box_dict["product"]["product_category"] == default_product_category
+
+
+def test_create_boxes_in_chunks(monkeypatch):
+    monkeypatch.setattr(box, "BOX_INSERT_CHUNK_SIZE", 2)
+    codes = ["code{}".format(i) for i in range(5)]
+    QRCode.insert_many([{"code": code} for code in codes]).execute()
+
+    results = Box.create_boxes(
+        [
+            {
+                "product_id": 1,
+                "items": 1,
+                "location_id": 1,
+                "comments": "",
+                "qr_barcode": code,
+            }
+            for code in codes
+        ]
+    )
+    assert [result["error"] for result in results] == [None] * 5
+    assert [result["box"].qr_code.code for result in results] == codes
+    assert len({result["box"].box_id for result in results}) == 5
+
+
+def test_get_boxes_from_qr_codes(default_box, default_qr_code, qr_code_without_box):
+    boxes = Box.get_boxes_from_qr_codes(
+        [default_qr_code["code"], qr_code_without_box["code"], "unknown"]
+    )
+    assert boxes[default_qr_code["code"]].box_id == default_box["box_id"]
+    assert boxes[qr_code_without_box["code"]] is None
+    assert "unknown" not in boxes
+    assert Box.get_boxes_from_qr_codes([]) == {}
@@ -0,0 +1,109 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+from boxwise_flask.box_id_allocator import (
+    BoxIdAllocator,
+    encode_box_id,
+    is_valid_box_id,
+    reserve_block,
+)
+from boxwise_flask.models.box import Box
+from boxwise_flask.models.box_id_sequence import BoxIdSequence
+from peewee import SqliteDatabase
+
+
+def test_box_ids_are_compact_and_checked():
+    box_id = encode_box_id(12345)
+    assert len(box_id) <= Box.box_id.max_length
+    assert box_id.startswith("X")
+    assert is_valid_box_id(box_id)
+
+    # mistyped and swapped characters are detected
+    assert not is_valid_box_id(box_id[:-2] + "0" + box_id[-1])
+    assert not is_valid_box_id(box_id[:-3] + box_id[-2] + box_id[-3] + box_id[-1])
+    # IDs generated previously
+    assert not is_valid_box_id("12345678")
+    assert not is_valid_box_id("3fa85f64-57")
+
+    with pytest.raises(ValueError):
+        encode_box_id(-1)
+
+
+def test_blocks_are_reserved_from_sequence():
+    assert reserve_block(10) == 1
+    assert reserve_block(5) == 11
+    assert BoxIdSequence.get_by_id(1).next_value == 16
+
+
+def test_allocator_reserves_block_when_exhausted():
+    reservations = []
+
+    def reserve(size):
+        reservations.append(size)
+        return 100 * len(reservations)
+
+    allocator = BoxIdAllocator(block_size=3, reserve=reserve)
+    box_ids = allocator.allocate_many(2) + [allocator.allocate(), allocator.allocate()]
+    assert box_ids == [encode_box_id(n) for n in [100, 101, 102, 200]]
+    assert allocator.allocate_many(5) == [
+        encode_box_id(n) for n in [201, 202, 300, 301, 302]
+    ]
+    assert reservations == [3, 3, 3]
+
+    # Requests larger than a block are served from one larger reservation
+    assert len(allocator.allocate_many(10)) == 10
+    assert reservations[-1] == 10
+
+
+def test_allocator_discards_block_after_fork():
+    pid = [1]
+    starts = iter([1, 11])
+    allocator = BoxIdAllocator(
+        block_size=10, reserve=lambda size: next(starts), getpid=lambda: pid[0]
+    )
+    assert allocator.allocate() == encode_box_id(1)
+    pid[0] = 2
+    assert allocator.allocate() == encode_box_id(11)
+
+
+def allocate_in_process(database_path, thread_count, ids_per_thread):
+    """Allocates box IDs from several threads of a new process that uses its own
+    connection to the shared database file."""
+    database = SqliteDatabase(database_path, pragmas={"busy_timeout": 30000})
+    allocator = BoxIdAllocator(block_size=7)
+
+    def allocate(_):
+        return [allocator.allocate() for _ in range(ids_per_thread)]
+
+    with database.bind_ctx([BoxIdSequence]):
+        with ThreadPoolExecutor(thread_count) as executor:
+            return [
+                box_id
+                for box_ids in executor.map(allocate, range(thread_count))
+                for box_id in box_ids
+            ]
+
+
+def test_no_duplicates_under_concurrent_allocation(tmp_path):
+    database_path = str(tmp_path / "sequence.sqlite3")
+    database = SqliteDatabase(database_path)
+    with database.bind_ctx([BoxIdSequence]):
+        database.create_tables([BoxIdSequence])
+    database.close()
+
+    process_count, thread_count, ids_per_thread = 4, 4, 50
+    with ProcessPoolExecutor(
+        process_count, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        results = executor.map(
+            allocate_in_process,
+            [database_path] * process_count,
+            [thread_count] * process_count,
+            [ids_per_thread] * process_count,
+        )
+        box_ids = [box_id for process_ids in results for box_id in process_ids]
+
+    assert len(box_ids) == process_count * thread_count * ids_per_thread
+    assert len(set(box_ids)) == len(box_ids)
+    assert all(is_valid_box_id(box_id) for box_id in box_ids)
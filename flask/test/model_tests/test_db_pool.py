@@ -0,0 +1,90 @@
+import threading
+import time
+
+import pytest
+from boxwise_flask.db import PoolMetricsMixin
+from playhouse.pool import MaxConnectionsExceeded, PooledSqliteDatabase
+
+
+class InstrumentedPooledSqliteDatabase(PoolMetricsMixin, PooledSqliteDatabase):
+    pass
+
+
+@pytest.fixture()
+def pooled_database(tmp_path):
+    database = InstrumentedPooledSqliteDatabase(
+        str(tmp_path / "pool.sqlite3"), max_connections=1
+    )
+    yield database
+    database.close_all()
+
+
+def test_pool_metrics_count_checkouts(pooled_database):
+    pooled_database.connect()
+    stats = pooled_database.pool_stats()
+    assert stats["in_use"] == 1
+    assert stats["idle"] == 0
+
+    pooled_database.close()
+    pooled_database.connect()
+    pooled_database.close()
+
+    stats = pooled_database.pool_stats()
+    assert stats["checkouts"] == 2
+    assert stats["in_use"] == 0
+    assert stats["idle"] == 1
+    assert stats["exhausted"] == 0
+    assert stats["wait_seconds_max"] == 0
+
+
+def test_pool_metrics_count_exhaustion(pooled_database):
+    pooled_database.connect()
+    errors = []
+
+    def connect_from_other_thread():
+        try:
+            pooled_database.connect()
+        except MaxConnectionsExceeded as error:
+            errors.append(error)
+
+    thread = threading.Thread(target=connect_from_other_thread)
+    thread.start()
+    thread.join()
+    pooled_database.close()
+
+    assert len(errors) == 1
+    stats = pooled_database.pool_stats()
+    assert stats["exhausted"] == 1
+    assert stats["timeouts"] == 1
+    assert stats["checkouts"] == 1
+
+
+def test_pool_metrics_count_waiting_checkout_once(tmp_path):
+    # The pool retries every 0.1 seconds while waiting for a free connection
+    database = InstrumentedPooledSqliteDatabase(
+        str(tmp_path / "pool.sqlite3"),
+        max_connections=1,
+        timeout=5,
+        check_same_thread=False,
+    )
+    connected = threading.Event()
+
+    def hold_connection():
+        database.connect()
+        connected.set()
+        time.sleep(0.35)
+        database.close()
+
+    thread = threading.Thread(target=hold_connection)
+    thread.start()
+    connected.wait()
+    database.connect()
+    database.close()
+    thread.join()
+    database.close_all()
+
+    stats = database.pool_stats()
+    assert stats["checkouts"] == 2
+    assert stats["exhausted"] == 1
+    assert stats["timeouts"] == 0
+    assert 0.2 < stats["wait_seconds_max"] < 1
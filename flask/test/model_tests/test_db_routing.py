@@ -0,0 +1,122 @@
+import pytest
+from boxwise_flask import access_cache, qr_code_cache, reference_data
+from boxwise_flask.access_cache import AccessCache
+from boxwise_flask.db_routing import ReplicaRouter, ReplicaRoutingMixin
+from boxwise_flask.qr_code_cache import QRCodeCache
+from boxwise_flask.reference_data import ReferenceDataRegistry
+from peewee import CharField, Model, SqliteDatabase
+
+
+class Item(Model):
+    label = CharField()
+
+
+@pytest.fixture()
+def router():
+    return ReplicaRouter()
+
+
+@pytest.fixture()
+def databases(tmp_path, router):
+    """Primary and replica SQLite databases holding an item with different labels,
+    with the Item model bound to the primary."""
+
+    class RoutedSqliteDatabase(ReplicaRoutingMixin, SqliteDatabase):
+        pass
+
+    RoutedSqliteDatabase.router = router
+    primary = RoutedSqliteDatabase(str(tmp_path / "primary.sqlite3"))
+    replica = SqliteDatabase(str(tmp_path / "replica.sqlite3"))
+    for database, label in [(primary, "primary"), (replica, "replica")]:
+        with database.bind_ctx([Item]):
+            database.create_tables([Item])
+            Item.create(label=label)
+
+    router.configure([replica], read_your_writes_window=60)
+    with primary.bind_ctx([Item]):
+        yield primary, replica
+    router.close_replicas()
+    primary.close()
+
+
+def read_label():
+    return Item.get_by_id(1).label
+
+
+def test_reads_outside_operations_use_primary(databases):
+    assert read_label() == "primary"
+
+
+def test_query_reads_from_replica(databases, router):
+    with router.route_operation("query"):
+        assert read_label() == "replica"
+    assert read_label() == "primary"
+
+
+def test_mutation_uses_primary(databases, router):
+    with router.route_operation("mutation"):
+        Item.update(label="updated").execute()
+        assert read_label() == "updated"
+
+    with router.route_operation("query"):
+        assert read_label() == "replica"
+
+
+def test_transaction_uses_primary(databases, router):
+    primary, _ = databases
+    with router.route_operation("query"):
+        with primary.atomic():
+            assert read_label() == "primary"
+        assert read_label() == "replica"
+
+
+def test_read_your_writes_window(databases, router):
+    with router.route_operation("mutation", user_key="writer@example.org"):
+        pass
+
+    with router.route_operation("query", user_key="writer@example.org"):
+        assert read_label() == "primary"
+    with router.route_operation("query", user_key="reader@example.org"):
+        assert read_label() == "replica"
+
+    router.configure(router.replicas, read_your_writes_window=60)
+    with router.route_operation("query", user_key="writer@example.org"):
+        assert read_label() == "replica"
+
+
+def test_replicas_are_used_round_robin(tmp_path, router):
+    replicas = [SqliteDatabase(str(tmp_path / "{}.sqlite3".format(i))) for i in "ab"]
+    router.configure(replicas)
+
+    chosen = []
+    for _ in range(4):
+        with router.route_operation("query"):
+            chosen.append(router.get_replica())
+    assert chosen == replicas * 2
+    assert router.get_replica() is None
+
+
+def test_caches_load_from_primary(databases, router, monkeypatch):
+    # The replica lags behind: it still holds the label before the last write
+    for module in (access_cache, qr_code_cache, reference_data):
+        monkeypatch.setattr(module, "db_router", router)
+    monkeypatch.setattr(Item, "reference_group_by", None, raising=False)
+    codes = QRCodeCache()
+
+    with router.route_operation("query"):
+        assert AccessCache().get_user("a@b.com", lambda _: read_label()) == "primary"
+        assert ReferenceDataRegistry().get(Item, 1).label == "primary"
+        assert codes.get_ids(["primary"], lambda _: {read_label(): 1}) == {"primary": 1}
+        assert read_label() == "replica"
+
+
+def test_codes_unknown_on_replica_are_not_cached(databases, router, monkeypatch):
+    monkeypatch.setattr(qr_code_cache, "db_router", router)
+    codes = QRCodeCache()
+
+    with router.route_operation("query"):
+        codes.add(["issued"], {}, codes.version)
+    assert codes.lookup(["issued"]) == ({}, ["issued"])
+
+    codes.add(["unknown"], {}, codes.version)
+    assert codes.lookup(["unknown"]) == ({}, [])
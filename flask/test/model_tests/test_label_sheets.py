@@ -0,0 +1,70 @@
+import re
+import zlib
+
+import pytest
+from boxwise_flask import label_sheets, qr_labels
+
+pytest.importorskip("qrcode")
+
+
+def parse_pdf(data):
+    """Returns the object numbers of the pages and the dict of objects by number,
+    checking the offsets of the cross-reference table"""
+    xref_offset = int(re.search(rb"startxref\n(\d+)\n%%EOF\n$", data).group(1))
+    entries = data[xref_offset:].split(b"\n")[3:]
+    objects = {}
+    for number, entry in enumerate(entries, start=1):
+        if entry == b"trailer":
+            break
+        offset = int(entry[:10])
+        assert data[offset:].startswith(b"%d 0 obj\n" % number)
+        objects[number] = data[offset:].split(b"endobj")[0]
+    kids = re.search(rb"/Kids \[([^]]*)\]", objects[label_sheets.PAGES]).group(1)
+    return [int(kid) for kid in kids.split(b" 0 R")[:-1]], objects
+
+
+def test_label_sheets_have_one_image_per_code():
+    codes = ["code{}".format(i) for i in range(8)]
+    chunks = list(label_sheets.iter_label_sheets(codes, columns=2, rows=3))
+    # header, two pages, trailer
+    assert len(chunks) == 4
+
+    data = b"".join(chunks)
+    assert data.startswith(b"%PDF-1.4")
+    pages, objects = parse_pdf(data)
+    assert [objects[page].count(b"/Im") for page in pages] == [6, 2]
+
+    contents = int(re.search(rb"/Contents (\d+) 0 R", objects[pages[1]]).group(1))
+    stream = objects[contents].partition(b">>\nstream\n")[2]
+    commands = zlib.decompress(stream.rpartition(b"\nendstream")[0])
+    assert b"(code6) Tj" in commands
+    assert b"(code7) Tj" in commands
+
+
+def test_label_images_are_cached(monkeypatch):
+    render = label_sheets.render_label_image
+    rendered_codes = []
+
+    def render_label_image(code, url):
+        rendered_codes.append(code)
+        return render(code, url)
+
+    monkeypatch.setattr(label_sheets, "render_label_image", render_label_image)
+    first = list(label_sheets.get_label_images(["a", "b"]))
+    second = list(label_sheets.get_label_images(["c", "b", "a"]))
+    assert rendered_codes == ["a", "b", "c"]
+    assert second[1:] == first[::-1]
+
+
+def test_label_images_are_rendered_in_parallel(monkeypatch):
+    monkeypatch.setattr(qr_labels, "PARALLEL_RENDER_MIN_COUNT", 2)
+    codes = ["code{}".format(i) for i in range(4)]
+    images = list(label_sheets.get_label_images(codes, processes=2))
+    assert images == [
+        label_sheets.render_label_image(code, qr_labels.QR_CODE_URL) for code in codes
+    ]
+
+
+def test_label_sheets_reject_invalid_layout():
+    with pytest.raises(ValueError):
+        label_sheets.iter_label_sheets(["code"], columns=0)
@@ -1,6 +1,38 @@
+import pytest
+from boxwise_flask.models import qr_code
 from boxwise_flask.models.qr_code import QRCode
+from boxwise_flask.qr_code_cache import qr_code_cache
 
 
 def test_qr_model(default_qr_code):
     id = QRCode.get_id_from_code(default_qr_code["code"])
     assert id == default_qr_code["id"]
+
+
+def test_create_codes(monkeypatch):
+    monkeypatch.setattr(qr_code, "QR_CODE_INSERT_CHUNK_SIZE", 2)
+    qr_codes = QRCode.create_codes(5)
+
+    assert len({qr_code.code for qr_code in qr_codes}) == 5
+    assert [qr_code.id for qr_code in qr_codes] == sorted(
+        qr_code.id for qr_code in qr_codes
+    )
+    codes = [qr_code.code for qr_code in qr_codes]
+    assert all(len(code) == 31 for code in codes)
+
+    # The new codes are cached
+    ids, uncached_codes = qr_code_cache.lookup(codes)
+    assert ids == {qr_code.code: qr_code.id for qr_code in qr_codes}
+    assert uncached_codes == []
+
+
+def test_create_codes_retries_on_collision(monkeypatch, default_qr_code):
+    generated_codes = iter([default_qr_code["code"], "new"])
+    monkeypatch.setattr(qr_code, "generate_code", lambda: next(generated_codes))
+    assert [qr_code.code for qr_code in QRCode.create_codes(1)] == ["new"]
+
+
+@pytest.mark.parametrize("count", [0, qr_code.QR_CODE_MAX_COUNT + 1])
+def test_create_codes_rejects_invalid_count(count):
+    with pytest.raises(ValueError):
+        QRCode.create_codes(count)
@@ -0,0 +1,59 @@
+from boxwise_flask.models.box import Box
+from boxwise_flask.models.qr_code import QRCode
+from boxwise_flask.qr_code_cache import qr_code_cache
+
+
+def test_qr_code_ids_are_cached(default_qr_code):
+    code = default_qr_code["code"]
+    hits = qr_code_cache.stats()["ids"]["hits"]
+    assert QRCode.get_id_from_code(code) == default_qr_code["id"]
+    assert QRCode.get_ids_from_codes([code]) == {code: default_qr_code["id"]}
+
+    stats = qr_code_cache.stats()["ids"]
+    assert stats["hits"] == hits + 1
+    assert stats["size"] == 1
+
+
+def test_unknown_codes_are_cached_until_issued(mocker):
+    execute_sql = mocker.spy(QRCode._meta.database, "execute_sql")
+    assert QRCode.get_ids_from_codes(["new"]) == {}
+    assert QRCode.get_ids_from_codes(["new"]) == {}
+    assert execute_sql.call_count == 1
+
+    qr_code = QRCode.create(code="new")
+    assert QRCode.get_ids_from_codes(["new"]) == {"new": qr_code.id}
+
+
+def test_warm_up_loads_recent_codes():
+    QRCode.insert_many([{"code": "code{}".format(i)} for i in range(5)]).execute()
+    QRCode.warm_up_cache(3)
+
+    ids, uncached_codes = qr_code_cache.lookup(["code1", "code2", "code3", "code4"])
+    assert sorted(ids) == ["code2", "code3", "code4"]
+    assert uncached_codes == ["code1"]
+
+
+def test_boxes_of_cached_codes_are_selected_without_join(
+    mocker, default_box, default_qr_code, qr_code_without_box
+):
+    codes = [default_qr_code["code"], qr_code_without_box["code"], "unknown"]
+    Box.get_boxes_from_qr_codes(codes)
+
+    execute_sql = mocker.spy(Box._meta.database, "execute_sql")
+    boxes = Box.get_boxes_from_qr_codes(codes)
+    assert boxes[default_qr_code["code"]].box_id == default_box["box_id"]
+    assert boxes[qr_code_without_box["code"]] is None
+    assert "unknown" not in boxes
+    assert execute_sql.call_count == 1
+    assert "JOIN" not in execute_sql.call_args[0][0]
+
+
+def test_code_issued_during_lookup_is_not_cached_as_unknown():
+    def load_ids_before_issue(codes):
+        ids = QRCode.load_ids_from_codes(codes)
+        # Another request issues the code after the lookup found it unknown
+        QRCode.create(code="new")
+        return ids
+
+    assert qr_code_cache.get_ids(["new"], load_ids_before_issue) == {}
+    assert "new" in QRCode.get_ids_from_codes(["new"])
@@ -0,0 +1,36 @@
+import io
+import zipfile
+
+import pytest
+from boxwise_flask import qr_labels
+
+pytest.importorskip("qrcode")
+
+PNG_SIGNATURE = b"\x89PNG"
+
+
+def test_render_label_formats():
+    assert qr_labels.render_label("code", "png").startswith(PNG_SIGNATURE)
+    assert b"<svg" in qr_labels.render_label("code", "svg")
+
+    with pytest.raises(ValueError):
+        qr_labels.render_labels(["code"], "gif")
+
+
+def test_labels_are_rendered_in_parallel(monkeypatch):
+    monkeypatch.setattr(qr_labels, "PARALLEL_RENDER_MIN_COUNT", 2)
+    codes = ["code{}".format(i) for i in range(6)]
+
+    labels = list(qr_labels.render_labels(codes, "png", processes=2))
+    assert [code for code, _ in labels] == codes
+    assert labels == [(code, qr_labels.render_label(code, "png")) for code in codes]
+
+
+def test_label_zip_holds_one_image_per_code():
+    codes = ["code1", "code2"]
+    chunks = list(qr_labels.iter_label_zip(codes, "svg"))
+    assert len(chunks) == len(codes) + 1
+
+    with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as archive:
+        assert archive.namelist() == ["code1.svg", "code2.svg"]
+        assert archive.read("code2.svg") == qr_labels.render_label("code2", "svg")
@@ -0,0 +1,111 @@
+import pytest
+from boxwise_flask.models.box_state import BoxState
+from boxwise_flask.models.product_category import ProductCategory
+from boxwise_flask.models.size import Size
+from boxwise_flask.reference_data import ReferenceDataRegistry, reference_data
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+def test_reference_models_are_registered():
+    assert {BoxState, Size, ProductCategory} <= set(reference_data.models)
+
+
+def test_lookup_by_id_and_group(default_box_state, default_size_range):
+    registry = ReferenceDataRegistry()
+    registry.register(BoxState)
+    registry.register(Size)
+    Size.create(id=1, label="S", size_range=default_size_range["id"], seq=1)
+    Size.create(id=2, label="M", size_range=default_size_range["id"], seq=2)
+    Size.create(id=3, label="one size", seq=3)
+    registry.load()
+    assert registry.loads == 2
+
+    assert registry.get(BoxState, default_box_state["id"]).label == "1"
+    assert registry.get(BoxState, None) is None
+    assert [s.label for s in registry.get_group(Size, default_size_range["id"])] == [
+        "S",
+        "M",
+    ]
+    assert [s.label for s in registry.get_group(Size, None)] == ["one size"]
+    assert len(registry.get_all(Size)) == 3
+    assert registry.loads == 2
+
+
+def test_lookup_by_parent(default_product_category):
+    ProductCategory.create(id=2, label="child", seq=2, parent=1)
+    children = reference_data.get_group(ProductCategory, 1)
+    assert [c.label for c in children] == ["child"]
+
+
+def test_write_through_model_invalidates_table(default_box_state):
+    assert len(reference_data.get_all(BoxState)) == 1
+    BoxState.create(id=2, label="2")
+    assert len(reference_data.get_all(BoxState)) == 2
+    BoxState.delete().where(BoxState.id == 2).execute()
+    assert len(reference_data.get_all(BoxState)) == 1
+    assert reference_data.loads == 3
+
+
+def test_write_from_other_process_is_seen_after_ttl(default_box_state):
+    timer = FakeTimer()
+    registry = ReferenceDataRegistry(ttl=300, min_refresh_interval=10, timer=timer)
+    registry.register(BoxState)
+    registry.load()
+
+    # Bypass the invalidation by the model, like a write from another process
+    BoxState._meta.database.execute_sql(
+        "INSERT INTO box_state (id, label) VALUES (3, '3')"
+    )
+    assert len(registry.get_all(BoxState)) == 1
+    timer.now = 301
+    assert len(registry.get_all(BoxState)) == 2
+
+
+def test_unknown_key_reloads_table_rate_limited(default_box_state):
+    timer = FakeTimer()
+    registry = ReferenceDataRegistry(ttl=300, min_refresh_interval=10, timer=timer)
+    registry.register(BoxState)
+    registry.load()
+    BoxState._meta.database.execute_sql(
+        "INSERT INTO box_state (id, label) VALUES (3, '3')"
+    )
+
+    assert registry.get(BoxState, 3) is None
+    timer.now = 11
+    assert registry.get(BoxState, 3).label == "3"
+    assert registry.loads == 2
+
+
+def test_table_is_invalidated_after_write_is_executed(default_box_state):
+    query = BoxState.update(label="updated").where(BoxState.id == 1)
+    # A read between building and executing the query loads the old row
+    assert reference_data.get(BoxState, 1).label == "1"
+    query.execute()
+    assert reference_data.get(BoxState, 1).label == "updated"
+
+
+def test_table_is_invalidated_at_end_of_transaction(default_box_state):
+    database = BoxState._meta.database
+    with pytest.raises(ZeroDivisionError):
+        with database.atomic():
+            BoxState.create(id=2, label="2")
+            # Interleaved read within the transaction, caching the uncommitted row
+            assert len(reference_data.get_all(BoxState)) == 2
+            1 / 0
+    assert len(reference_data.get_all(BoxState)) == 1
+
+    with database.atomic():
+        with database.atomic():
+            BoxState.create(id=2, label="2")
+        assert len(reference_data.get_all(BoxState)) == 2
+        BoxState.delete().where(BoxState.id == 2).execute()
+        loads = reference_data.loads
+    assert len(reference_data.get_all(BoxState)) == 1
+    assert reference_data.loads == loads + 1
@@ -1,5 +1,9 @@
 import pytest
-from boxwise_flask.models.user import User, get_user_from_email_with_base_ids
+from boxwise_flask.models.user import (
+    User,
+    get_user_from_email_with_base_ids,
+    get_user_row_with_base_ids,
+)
 from playhouse.shortcuts import model_to_dict
 
 
@@ -79,3 +83,15 @@ def test_get_user_from_email_with_base_ids(
     # the data is created such that the default usergroup is used for all base_ids
     # therefore all the default base ids should be returned
     assert user_with_base_ids["base_ids"] == [base for base in default_bases]
+
+
+@pytest.mark.usefixtures("default_usergroup_base_access_list")
+def test_get_user_row_with_base_ids(default_user, default_bases):
+    query = User.select(User.id, User.name)
+    user_row = get_user_row_with_base_ids(default_user["email"], query)
+
+    assert user_row == {
+        "id": default_user["id"],
+        "name": default_user["name"],
+        "base_ids": [base for base in default_bases],
+    }